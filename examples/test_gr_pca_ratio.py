@@ -2,19 +2,15 @@
 
 import sys
 from incaffeine.incaf import IncAF
-from incaffeine.runner import TestRunner
+from incaffeine.runner import TallyRunner
 
 
 def check_instance(runner, af, args, arg):
     return af.is_possibly_credulously_acceptable(arg, IncAF.SEMANTICS_AD)
 
 
-def reference_check_instance(runner, af, args, arg):
-    return True
-
-
 def main(argv):
-    runner = TestRunner('AttPCARatio', check_instance, reference_check_instance)
+    runner = TallyRunner('AttPCARatio', check_instance)
 
     # Config
     runner.apply_params(argv)
@@ -23,8 +19,6 @@ def main(argv):
     runner.use_uncertain_args = False
     runner.use_uncertain_attacks = True
 
-    runner.exit_on_failure = False
-
     # Run!
     runner.run()
 
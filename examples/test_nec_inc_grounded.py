@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 
 import sys
-import copy
 from incaffeine.incaf import IncAF
 from incaffeine.runner import TestRunner
 
@@ -9,16 +8,16 @@ from incaffeine.runner import TestRunner
 def ungrounded_completion(af, args):
     grounded = None
     grounded_new = set()
-    ungrounded = copy.deepcopy(af)
+    ungrounded = af.copy()
 
     # pessimistic reduction for possible attacks
     for a in range(ungrounded.n):
         for b in range(ungrounded.n):
             if ungrounded.R[a][b] == IncAF.POSSIBLE_ATTACK:
                 if b in args:
-                    ungrounded.R[a][b] = IncAF.DEFINITE_ATTACK
+                    ungrounded.set_attack(a, b, IncAF.DEFINITE_ATTACK)
                 else:
-                    ungrounded.R[a][b] = IncAF.NO_ATTACK
+                    ungrounded.set_attack(a, b, IncAF.NO_ATTACK)
 
     while grounded_new != grounded:
         grounded = grounded_new
@@ -27,23 +26,23 @@ def ungrounded_completion(af, args):
         for a in args:
             if maxi.is_defended_by(a, grounded):
                 if ungrounded.A[a] == IncAF.POSSIBLE_ARGUMENT:
-                    ungrounded.A[a] = IncAF.NO_ARGUMENT
+                    ungrounded.set_argument(a, IncAF.NO_ARGUMENT)
                 elif ungrounded.A[a] == IncAF.DEFINITE_ARGUMENT:
                     grounded_new.add(a)
     return ungrounded.maximal_completion()
 
 
 def ungrounded_simple_completion(af, args):
-    ungrounded = copy.deepcopy(af)
+    ungrounded = af.copy()
 
     # pessimistic reduction for possible attacks
     for a in range(ungrounded.n):
         for b in range(ungrounded.n):
             if ungrounded.R[a][b] == IncAF.POSSIBLE_ATTACK:
                 if b in args:
-                    ungrounded.R[a][b] = IncAF.DEFINITE_ATTACK
+                    ungrounded.set_attack(a, b, IncAF.DEFINITE_ATTACK)
                 else:
-                    ungrounded.R[a][b] = IncAF.NO_ATTACK
+                    ungrounded.set_attack(a, b, IncAF.NO_ATTACK)
 
     # determine G
     # temp = ungrounded.maximal_completion() # variant 1
@@ -53,9 +52,9 @@ def ungrounded_simple_completion(af, args):
     for a in range(ungrounded.n):
         if ungrounded.A[a] == IncAF.POSSIBLE_ARGUMENT:
             if a in grounded:
-                ungrounded.A[a] = IncAF.NO_ARGUMENT
+                ungrounded.set_argument(a, IncAF.NO_ARGUMENT)
             else:
-                ungrounded.A[a] = IncAF.DEFINITE_ARGUMENT
+                ungrounded.set_argument(a, IncAF.DEFINITE_ARGUMENT)
 
     return ungrounded
 
@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 
 import sys
-import copy
 from incaffeine.incaf import IncAF
 from incaffeine.runner import TestRunner
 
 
 def optimistic_completion(af, args):
-    opt = copy.deepcopy(af)
+    opt = af.copy()
     for attacker in range(af.n):
         for target in range(af.n):
             att = af.R[attacker][target]
@@ -28,7 +27,7 @@ def unfixed_completion(af, args):  # for complete/grounded semantics
     #    - do not use attacks from args that defend it against attackers
     # 3: Try to make elements outside of args acceptable w.r.t. args, i.e.:
 
-    pess = copy.deepcopy(af)
+    pess = af.copy()
     for attacker in range(af.n):
         for target in range(af.n):
             att = af.R[attacker][target]
@@ -57,7 +56,7 @@ def unfixed_completion(af, args):  # for complete/grounded semantics
         for target in range(pess.n):
             mini = pess.minimal_completion()
             if target not in args:
-                new_args = copy.deepcopy(args)
+                new_args = set(args)
                 new_args.add(target)
                 opt = optimistic_completion(pess, new_args)
                 if (not mini.is_possibly_acceptable(args, target)) and opt.is_possibly_acceptable(args, target):
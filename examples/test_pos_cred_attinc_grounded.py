@@ -1,18 +1,17 @@
 #!/usr/bin/env python3
 
 import sys
-import copy
 from incaffeine.incaf import IncAF
-from incaffeine.runner import TestRunner
+from incaffeine.runner import DifferentialRunner
 
 
 def version1(af, arg):
-    grounded = copy.deepcopy(af)
+    grounded = af.copy()
 
     # Exclude all possible attacks against arg
     for attacker in range(grounded.n):
         if grounded.R[attacker][arg] == IncAF.POSSIBLE_ATTACK:
-            grounded.R[attacker][arg] = IncAF.NO_ATTACK
+            grounded.set_attack(attacker, arg, IncAF.NO_ATTACK)
 
     # Include all possible attacks against definite attackers of arg
     definite_attackers_1 = []
@@ -22,7 +21,7 @@ def version1(af, arg):
             definite_attackers_1.append(attacker)
             for defender in range(grounded.n):
                 if grounded.R[defender][attacker] == IncAF.POSSIBLE_ATTACK:
-                    grounded.R[defender][attacker] = IncAF.DEFINITE_ATTACK
+                    grounded.set_attack(defender, attacker, IncAF.DEFINITE_ATTACK)
                 if grounded.R[defender][attacker] == IncAF.DEFINITE_ATTACK:
                     definite_defenders_1.append(defender)
 
@@ -30,7 +29,7 @@ def version1(af, arg):
     for defender in definite_defenders_1:
         for attacker in range(grounded.n):
             if grounded.R[attacker][defender] == IncAF.POSSIBLE_ATTACK:
-                grounded.R[attacker][defender] = IncAF.NO_ATTACK
+                grounded.set_attack(attacker, defender, IncAF.NO_ATTACK)
 
     # Include all possible attacks against level-2 attackers of arg
     definite_attackers_2 = []
@@ -41,7 +40,7 @@ def version1(af, arg):
                 definite_attackers_2.append(attacker)
                 for defender2 in range(grounded.n):
                     if grounded.R[defender2][attacker] == IncAF.POSSIBLE_ATTACK:
-                        grounded.R[defender2][attacker] = IncAF.DEFINITE_ATTACK
+                        grounded.set_attack(defender2, attacker, IncAF.DEFINITE_ATTACK)
                     if grounded.R[defender2][attacker] == IncAF.DEFINITE_ATTACK:
                         definite_defenders_2.append(defender2)
 
@@ -52,7 +51,7 @@ def version1(af, arg):
 
 
 def version2(af, arg):
-    grounded = copy.deepcopy(af)
+    grounded = af.copy()
 
     attackers = set([])
     defenders = {arg}
@@ -65,7 +64,7 @@ def version2(af, arg):
         for defender in defenders:
             for attacker in range(grounded.n):
                 if grounded.R[attacker][defender] == IncAF.POSSIBLE_ATTACK:
-                    grounded.R[attacker][defender] = IncAF.NO_ATTACK
+                    grounded.set_attack(attacker, defender, IncAF.NO_ATTACK)
                     changes = True
                 elif grounded.R[attacker][defender] == IncAF.DEFINITE_ATTACK:
                     attackers.add(attacker)
@@ -74,7 +73,7 @@ def version2(af, arg):
         for attacker in attackers:
             for defender in range(grounded.n):
                 if grounded.R[defender][attacker] == IncAF.POSSIBLE_ATTACK:
-                    grounded.R[defender][attacker] = IncAF.DEFINITE_ATTACK
+                    grounded.set_attack(defender, attacker, IncAF.DEFINITE_ATTACK)
                     changes = True
                 if grounded.R[defender][attacker] == IncAF.DEFINITE_ATTACK:
                     defenders.add(defender)
@@ -82,8 +81,11 @@ def version2(af, arg):
     return grounded.is_possibly_credulously_acceptable(arg, IncAF.SEMANTICS_GR)
 
 
-def check_instance(runner, af, args, arg):
-    # return version1(af, arg)
+def check_version1(runner, af, args, arg):
+    return version1(af, arg)
+
+
+def check_version2(runner, af, args, arg):
     return version2(af, arg)
 
 
@@ -92,7 +94,9 @@ def reference_check_instance(runner, af, args, arg):
 
 
 def main(argv):
-    runner = TestRunner('PosCredAttincGR', check_instance, reference_check_instance)
+    # Compare both versions against the reference in a single pass
+    runner = DifferentialRunner('PosCredAttincGR', [('version1', check_version1), ('version2', check_version2)],
+                                reference_check_instance)
 
     # Config
     runner.apply_params(argv)
@@ -101,7 +105,8 @@ def main(argv):
     runner.use_uncertain_args = False
     runner.use_uncertain_attacks = True
 
-    runner.exit_on_failure = True
+    # run all instances, so that the summaries of both candidates cover the same instances
+    runner.exit_on_failure = False
 
     # Run!
     runner.run()
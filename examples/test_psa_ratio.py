@@ -2,19 +2,15 @@
 
 import sys
 from incaffeine.incaf import IncAF
-from incaffeine.runner import TestRunner
+from incaffeine.runner import TallyRunner
 
 
 def check_instance(runner, af, args, arg):
     return af.is_possibly_skeptically_acceptable(arg, IncAF.SEMANTICS_ST)
 
 
-def reference_check_instance(runner, af, args, arg):
-    return True
-
-
 def main(argv):
-    runner = TestRunner('PSARatioST', check_instance, reference_check_instance)
+    runner = TallyRunner('PSARatioST', check_instance)
 
     # Config
     runner.apply_params(argv)
@@ -23,8 +19,6 @@ def main(argv):
     runner.use_uncertain_args = True
     runner.use_uncertain_attacks = True
 
-    runner.exit_on_failure = False
-
     # Run!
     runner.run()
 
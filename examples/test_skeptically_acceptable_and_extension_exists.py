@@ -2,9 +2,13 @@
 
 import sys
 from incaffeine.af import AF
+from incaffeine.helpers import powerset
 from incaffeine.runner import TestRunner
 """
-Check if the implementation of ExSA provides the same answers as the conjunction of SA and CA
+Check if the implementation of ExSA provides the same answers as its definition, evaluated on all sets of arguments.
+
+AF.is_skeptically_acceptable_and_extension_exists is implemented as the conjunction of SA and CA, so this also checks
+that ExSA and SA && CA coincide.
 """
 
 
@@ -14,8 +18,16 @@ def check_instance(runner, af, args, arg):
 
 
 def reference_check_instance(runner, af, args, arg):
-    """Compute SA && CA"""
-    return af.is_skeptically_acceptable(arg, AF.SEMANTICS_ST) and af.is_credulously_acceptable(arg, AF.SEMANTICS_ST)
+    """Compute ExSA by definition: no extension excludes arg, and at least one extension exists"""
+    if af.A[arg] != AF.DEFINITE_ARGUMENT:
+        return False
+    extension_found = False
+    for extension in powerset([a for a in range(af.n) if af.A[a] == AF.DEFINITE_ARGUMENT]):
+        if af.verification(set(extension), AF.SEMANTICS_ST):
+            if arg not in extension:
+                return False
+            extension_found = True
+    return extension_found
 
 
 def main(argv):
@@ -1,13 +1,99 @@
-import copy
 import sys
+import collections
 from random import randrange
 
-from incaffeine.helpers import powerset
+from incaffeine.helpers import iter_mask, from_mask, to_mask
+
+
+class ArgumentStates(list):
+    """
+    Argument states of an AF (AF.A). Writing an item calls AF.set_argument, so the bitmasks stay up to date.
+    """
+
+    def __init__(self, af, states):
+        """
+        :param af: AF the states belong to
+        :param states: iterable of argument states
+        """
+        super(ArgumentStates, self).__init__(states)
+        self.af = af
+        """(AF) AF the states belong to"""
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            list.__setitem__(self, index, value)
+            self.af.update_masks()
+        else:
+            self.af.set_argument(index, value)
+
+    def __reduce__(self):
+        return self.__class__, (self.af, list(self))
+
+
+class AttackStates(list):
+    """
+    Attack states of an AF (AF.R), one AttackStatesRow per attacking argument. Assigning a row overwrites the states
+    of the existing row.
+    """
+
+    def __init__(self, af, rows):
+        """
+        :param af: AF the states belong to
+        :param rows: iterable of iterables of attack states, one per attacking argument
+        """
+        super(AttackStates, self).__init__([AttackStatesRow(af, attacker, row) for attacker, row in enumerate(rows)])
+        self.af = af
+        """(AF) AF the states belong to"""
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            for attacker, row in zip(range(*index.indices(len(self))), value):
+                list.__setitem__(self[attacker], slice(None), row)
+        else:
+            list.__setitem__(self[index], slice(None), value)
+        self.af.update_masks()
+
+    def __reduce__(self):
+        return self.__class__, (self.af, [list(row) for row in self])
+
+
+class AttackStatesRow(list):
+    """
+    Attack states of one attacking argument of an AF (AF.R[attacker]). Writing an item calls AF.set_attack, so the
+    bitmasks stay up to date.
+    """
+
+    def __init__(self, af, attacker, states):
+        """
+        :param af: AF the states belong to
+        :param attacker: attacking argument
+        :param states: iterable of attack states, one per target argument
+        """
+        super(AttackStatesRow, self).__init__(states)
+        self.af = af
+        """(AF) AF the states belong to"""
+        self.attacker = attacker
+        """(int) attacking argument"""
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            list.__setitem__(self, index, value)
+            self.af.update_masks()
+        else:
+            self.af.set_attack(self.attacker, index, value)
+
+    def __reduce__(self):
+        return self.__class__, (self.af, self.attacker, list(self))
 
 
 class AF(object):
     """
     Argumentation Framework.
+
+    The argument and attack states are stored in A and R, and mirrored in bitmasks (args_mask, attack_masks and
+    attacked_by_masks) that all semantics are computed on. A and R stay authoritative: writing an item (e.g.
+    af.R[0][1] = AF.DEFINITE_ATTACK) is the same as calling set_argument or set_attack, and assigning whole lists
+    rebuilds the bitmasks (see ArgumentStates and AttackStates). The number of arguments is fixed.
     """
 
     NO_ATTACK = 0
@@ -37,13 +123,43 @@ class AF(object):
     SEMANTICS_NEAD = 8
     """preferred semantics."""
 
+    SEMANTICS_NAMES = {SEMANTICS_CF: 'CF', SEMANTICS_AD: 'AD', SEMANTICS_CP: 'CP', SEMANTICS_GR: 'GR',
+                       SEMANTICS_ST: 'ST', SEMANTICS_PR: 'PR', SEMANTICS_NECF: 'NECF', SEMANTICS_NEAD: 'NEAD'}
+    """short names of the semantics, e.g. used in operation counter keys."""
+
+    counters = None
+    """(collections.Counter) counts of operations of all AFs and IncAFs, e.g. 'verify.ST' (verifications per
+    semantics), 'iter_extensions.subsets' (scanned subsets) or 'completions' (visited completions), or None to disable
+    counting (default). See count_operations."""
+
+
     def __init__(self, n):
         self.n = n
         """(int) number of arguments. The set of arguments is [0,...,n-1] implicitly."""
-        self.A = [AF.DEFINITE_ARGUMENT for _ in range(n)]
+        self.A = ArgumentStates(self, [AF.DEFINITE_ARGUMENT for _ in range(n)])
         """(list) argument statuses for each argument"""
-        self.R = [[AF.NO_ATTACK for _ in range(n)] for _ in range(n)]
+        self.R = AttackStates(self, [[AF.NO_ATTACK for _ in range(n)] for _ in range(n)])
         """(list) attack statuses for each pair of arguments"""
+        self.args_mask = (1 << n) - 1
+        """(int) bitmask of all arguments with status DEFINITE_ARGUMENT"""
+        self.attack_masks = [0 for _ in range(n)]
+        """(list) bitmask of the targets of DEFINITE_ATTACKs for each attacking argument"""
+        self.attacked_by_masks = [0 for _ in range(n)]
+        """(list) bitmask of the sources of DEFINITE_ATTACKs for each target argument"""
+        self.cache = None
+        """(AFCache) precomputed semantics information, None if caching is disabled (see enable_cache)"""
+
+    def __setattr__(self, name, value):
+        if name != 'A' and name != 'R':
+            object.__setattr__(self, name, value)
+            return
+        # wrap assigned states, so that A and R stay authoritative (see ArgumentStates and AttackStates)
+        if getattr(value, 'af', None) is not self:
+            value = ArgumentStates(self, value) if name == 'A' else AttackStates(self, value)
+        object.__setattr__(self, name, value)
+        if 'cache' in self.__dict__ and len(self.A) == len(self.R) == self.n:
+            # not called from __init__, which builds the bitmasks itself
+            self.update_masks()
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -63,6 +179,36 @@ class AF(object):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def copy(self):
+        """
+        Create a copy of this AF (of the same class), including its bitmask representation.
+
+        If caching is enabled, the copy starts with an empty cache.
+
+        :return: new AF with the same argument and attack states
+        """
+        af = self.__class__(self.n)
+        self.clone_into(af)
+        return af
+
+    def clone_into(self, target):
+        """
+        Overwrite the given AF with the state of this AF, reusing its preallocated lists.
+
+        :param target: AF to be overwritten, resized if it does not have the same number of arguments
+        :type target: AF
+        """
+        if target.n != self.n:
+            AF.__init__(target, self.n)
+        # the bitmasks are copied below, so the states are written without updating them
+        list.__setitem__(target.A, slice(None), self.A)
+        for row, target_row in zip(self.R, target.R):
+            list.__setitem__(target_row, slice(None), row)
+        target.args_mask = self.args_mask
+        target.attack_masks[:] = self.attack_masks
+        target.attacked_by_masks[:] = self.attacked_by_masks
+        target.cache = AFCache() if self.cache is not None else None
+
     def restricted_extension(self, args):
         """
         Create a copy of the given set of arguments without those arguments that
@@ -80,7 +226,7 @@ class AF(object):
         """
         for attacker in range(self.n):
             for target in range(self.n):
-                self.R[attacker][target] = randrange(AF.NO_ATTACK, AF.DEFINITE_ATTACK + 1)
+                self.set_attack(attacker, target, randrange(AF.NO_ATTACK, AF.DEFINITE_ATTACK + 1))
 
     def set_attack(self, attacker, target, value):
         """
@@ -93,7 +239,21 @@ class AF(object):
         :param value: attack state to be set
         :type value: int
         """
-        self.R[attacker][target] = value
+        definite = value == AF.DEFINITE_ATTACK
+        row = self.R[attacker]
+        if (row[target] == AF.DEFINITE_ATTACK) == definite:
+            # the definite attacks, and thus all semantics, remain unchanged
+            list.__setitem__(row, target, value)
+            return
+        list.__setitem__(row, target, value)
+        if definite:
+            self.attack_masks[attacker] |= 1 << target
+            self.attacked_by_masks[target] |= 1 << attacker
+        else:
+            self.attack_masks[attacker] &= ~(1 << target)
+            self.attacked_by_masks[target] &= ~(1 << attacker)
+        if self.cache is not None:
+            self.update_cache(attacker, target, definite)
 
     def set_argument(self, argument, value):
         """
@@ -104,7 +264,105 @@ class AF(object):
         :param value: argument state to be set
         :type value: int
         """
-        self.A[argument] = value
+        definite = value == AF.DEFINITE_ARGUMENT
+        if (self.A[argument] == AF.DEFINITE_ARGUMENT) == definite:
+            # the definite arguments, and thus all semantics, remain unchanged
+            list.__setitem__(self.A, argument, value)
+            return
+        list.__setitem__(self.A, argument, value)
+        if definite:
+            self.args_mask |= 1 << argument
+        else:
+            self.args_mask &= ~(1 << argument)
+        if self.cache is not None:
+            self.cache = AFCache()
+
+    def update_cache(self, attacker, target, definite):
+        """
+        Update the cache after a definite attack has been added or removed, keeping the information that stays valid.
+
+        Attacks from or onto arguments that are not DEFINITE_ARGUMENTs are ignored by all semantics, so the cache is
+        kept. Otherwise only the grounded extension G is carried over: adding an attack onto an argument outside G, or
+        removing an attack of an argument outside G, leaves every argument of G defended in the same order, so G can
+        only grow. G is kept as long as it is still a fixed point of the characteristic function, which is decided
+        from the changed attack alone, otherwise the new grounded extension is the least fixed point above G. In all
+        other cases the grounded extension may change arbitrarily and is recomputed on demand.
+
+        :param attacker: attacking argument of the changed attack
+        :param target: target argument of the changed attack
+        :param definite: True if the attack has been added, False if it has been removed
+        """
+        pair = (1 << attacker) | (1 << target)
+        if self.args_mask & pair != pair:
+            return
+        grounded = self.cache.grounded
+        self.cache = AFCache()
+        if grounded is None:
+            return
+        if (grounded >> (target if definite else attacker)) & 1:
+            return
+        if (grounded >> attacker) & 1:
+            fixed_point = False  # an added attack of G may defend further arguments
+        elif definite or (grounded >> target) & 1:
+            fixed_point = True
+        else:
+            # a removed attack only matters if G now defends its target
+            fixed_point = self.attacked_by_masks[target] & self.args_mask & ~self.attacks_of(grounded) != 0
+        if not fixed_point:
+            defended = self.defended_mask(grounded)
+            while defended != grounded:
+                grounded = defended
+                defended = self.defended_mask(grounded)
+        if AF.counters is not None:
+            AF.counters['grounded.updates'] += 1
+        self.cache.grounded = grounded
+
+    def update_masks(self):
+        """
+        Rebuild the bitmask representation from A and R.
+
+        Called automatically when lists or slices are assigned to A, R or a row of R, while item writes update the
+        bitmasks incrementally (see set_argument and set_attack).
+        """
+        self.args_mask = 0
+        self.attack_masks = [0 for _ in range(self.n)]
+        self.attacked_by_masks = [0 for _ in range(self.n)]
+        for attacker in range(self.n):
+            if self.A[attacker] == AF.DEFINITE_ARGUMENT:
+                self.args_mask |= 1 << attacker
+            for target in range(self.n):
+                if self.R[attacker][target] == AF.DEFINITE_ATTACK:
+                    self.attack_masks[attacker] |= 1 << target
+                    self.attacked_by_masks[target] |= 1 << attacker
+        if self.cache is not None:
+            self.cache = AFCache()
+
+    def enable_cache(self):
+        """
+        Enable caching of semantics information (attacks, attackers and defended arguments of argument sets, and
+        the grounded extension) for repeated queries on this AF.
+
+        The cache is reset automatically whenever set_attack, set_argument or randomize_attacks change a definite
+        argument or attack, except for the grounded extension where set_attack can update it (see update_cache).
+        """
+        self.cache = AFCache()
+
+    def disable_cache(self):
+        """
+        Disable caching of semantics information and drop all cached entries.
+        """
+        self.cache = None
+
+    def state_key(self):
+        """
+        Canonical encoding of the definite arguments and the definite attacks between them, which determine all
+        semantics information of this AF. Two AFs with equal keys have the same extensions for every semantics.
+
+        :return: hashable tuple of args_mask and the attack mask of each argument restricted to definite arguments
+        """
+        args_mask = self.args_mask
+        return args_mask, tuple(mask & args_mask if (args_mask >> attacker) & 1 else 0
+                                for attacker, mask in enumerate(self.attack_masks))
 
     def pretty_print(self, output_handle=sys.stdout):
         """
@@ -117,6 +375,68 @@ class AF(object):
             output_handle.write(str(self.R[attacker]))
             output_handle.write('\n')
 
+    def attacks_of(self, mask):
+        """
+        Determine the bitmask of all arguments definitely attacked by the arguments in the given bitmask.
+
+        Only arguments with status DEFINITE_ARGUMENT are considered, both as attackers and as targets.
+
+        :param mask: bitmask of attacking arguments
+        :type mask: int
+        :return: bitmask of attacked arguments
+        """
+        cache = self.cache
+        if cache is not None and mask in cache.attacks:
+            return cache.attacks[mask]
+        attacked = 0
+        for attacker in iter_mask(mask & self.args_mask):
+            attacked |= self.attack_masks[attacker]
+        attacked &= self.args_mask
+        if cache is not None:
+            cache.attacks[mask] = attacked
+        return attacked
+
+    def attackers_of(self, mask):
+        """
+        Determine the bitmask of all arguments definitely attacking at least one argument in the given bitmask.
+
+        Only arguments with status DEFINITE_ARGUMENT are considered, both as attackers and as targets.
+
+        :param mask: bitmask of target arguments
+        :type mask: int
+        :return: bitmask of attacking arguments
+        """
+        cache = self.cache
+        if cache is not None and mask in cache.attackers:
+            return cache.attackers[mask]
+        attackers = 0
+        for target in iter_mask(mask & self.args_mask):
+            attackers |= self.attacked_by_masks[target]
+        attackers &= self.args_mask
+        if cache is not None:
+            cache.attackers[mask] = attackers
+        return attackers
+
+    def defended_mask(self, mask):
+        """
+        Characteristic function: determine the bitmask of all arguments defended by the given bitmask.
+
+        :param mask: bitmask of defending arguments
+        :type mask: int
+        :return: bitmask of all arguments with status DEFINITE_ARGUMENT that are acceptable with respect to mask
+        """
+        cache = self.cache
+        if cache is not None and mask in cache.defended:
+            return cache.defended[mask]
+        attacked = self.attacks_of(mask)
+        defended = 0
+        for a in iter_mask(self.args_mask):
+            if not (self.attacked_by_masks[a] & self.args_mask & ~attacked):
+                defended |= 1 << a
+        if cache is not None:
+            cache.defended[mask] = defended
+        return defended
+
     def attacks(self, attacker, target):
         """
         Indicates whether whether there is a definite attack from attacker to target in this AF.
@@ -129,34 +449,46 @@ class AF(object):
         :type target: int or iterable
         :return: true if at least one attacker attacks at least one target, False otherwise
         """
-        if type(attacker) is int:
-            if self.A[attacker] != AF.DEFINITE_ARGUMENT:
-                return False
-            if type(target) is int:
-                if self.A[target] != AF.DEFINITE_ARGUMENT:
-                    return False
-                return self.R[attacker][target] == AF.DEFINITE_ATTACK
-            else:
-                for b in target:
-                    if (self.A[b] == AF.DEFINITE_ARGUMENT) \
-                            and (self.R[attacker][b] == AF.DEFINITE_ATTACK):
-                        return True
-                return False
-        else:
-            if type(target) is int:
-                for a in attacker:
-                    if (self.A[a] == AF.DEFINITE_ARGUMENT) \
-                            and (self.R[a][target] == AF.DEFINITE_ATTACK):
-                        return True
-                return False
-            else:
-                for a in attacker:
-                    for b in target:
-                        if (self.A[a] == AF.DEFINITE_ARGUMENT) \
-                                and (self.A[b] == AF.DEFINITE_ARGUMENT) \
-                                and (self.R[a][b] == AF.DEFINITE_ATTACK):
-                            return True
-                return False
+        attacker_mask = (1 << attacker) if type(attacker) is int else to_mask(attacker)
+        target_mask = (1 << target) if type(target) is int else to_mask(target)
+        return (self.attacks_of(attacker_mask) & target_mask) != 0
+
+    def grounded_mask(self):
+        """
+        Determine the grounded extension of this AF as a bitmask.
+
+        Labels arguments IN/OUT by propagation: each argument keeps a counter of its attackers that are not yet
+        labelled OUT, and enters the worklist of IN arguments once its counter drops to zero. Every argument and
+        attack is processed at most once.
+
+        :return: bitmask of arguments representing the grounded extension
+        """
+        cache = self.cache
+        if cache is not None and cache.grounded is not None:
+            return cache.grounded
+        if AF.counters is not None:
+            AF.counters['grounded'] += 1
+        args_mask = self.args_mask
+        counters = [0] * self.n
+        worklist = []
+        for a in iter_mask(args_mask):
+            counters[a] = bin(self.attacked_by_masks[a] & args_mask).count('1')
+            if counters[a] == 0:
+                worklist.append(a)
+        in_mask = 0
+        out_mask = 0
+        while worklist:
+            a = worklist.pop()
+            in_mask |= 1 << a
+            for target in iter_mask(self.attack_masks[a] & args_mask & ~out_mask):
+                out_mask |= 1 << target
+                for defeated_target in iter_mask(self.attack_masks[target] & args_mask & ~out_mask):
+                    counters[defeated_target] -= 1
+                    if counters[defeated_target] == 0:
+                        worklist.append(defeated_target)
+        if cache is not None:
+            cache.grounded = in_mask
+        return in_mask
 
     def grounded_extension(self):
         """
@@ -164,20 +496,7 @@ class AF(object):
 
         :return: set of arguments representing the grounded extension
         """
-        args = set()
-        args_next = set()
-        for a in range(self.n):
-            if self.A[a] == AF.DEFINITE_ARGUMENT:
-                if self.is_defended_by(a, args):
-                    args_next.add(a)
-        while args != args_next:
-            args = args_next
-            args_next = set()
-            for a in range(self.n):
-                if self.A[a] == AF.DEFINITE_ARGUMENT:
-                    if self.is_defended_by(a, args):
-                        args_next.add(a)
-        return args
+        return from_mask(self.grounded_mask())
 
     def is_conflict_free(self, args):
         """
@@ -187,12 +506,13 @@ class AF(object):
         :type args: iterable
         :return: True if args is conflict-free, False otherwise
         """
-        args = self.restricted_extension(args)
-        for attacker in args:
-            for target in args:
-                if self.R[attacker][target] == AF.DEFINITE_ATTACK:
-                    return False
-        return True
+        return self.is_conflict_free_mask(to_mask(args) & self.args_mask)
+
+    def is_conflict_free_mask(self, mask):
+        """
+        Bitmask variant of is_conflict_free for a bitmask of arguments with status DEFINITE_ARGUMENT.
+        """
+        return not (self.attacks_of(mask) & mask)
 
     def is_defended_by(self, a, args):
         """
@@ -206,13 +526,10 @@ class AF(object):
         :type args: iterable
         :return: True if a is acceptable with respect to args in self, False otherwise
         """
-        args = self.restricted_extension(args)
-        if self.A[a] == AF.DEFINITE_ARGUMENT:
-            for attacker in range(self.n):
-                if (self.A[attacker] == AF.DEFINITE_ARGUMENT) and (self.R[attacker][a] == AF.DEFINITE_ATTACK):
-                    if not self.attacks(args, attacker):
-                        return False
-        return True
+        if not (self.args_mask >> a) & 1:
+            return True
+        attackers = self.attacked_by_masks[a] & self.args_mask
+        return not (attackers & ~self.attacks_of(to_mask(args)))
 
     def is_admissible(self, args):
         """
@@ -222,13 +539,16 @@ class AF(object):
         :type args: iterable
         :return: True if args is admissible, False otherwise
         """
-        args = self.restricted_extension(args)
-        if not self.is_conflict_free(args):
+        return self.is_admissible_mask(to_mask(args) & self.args_mask)
+
+    def is_admissible_mask(self, mask):
+        """
+        Bitmask variant of is_admissible for a bitmask of arguments with status DEFINITE_ARGUMENT.
+        """
+        attacked = self.attacks_of(mask)
+        if attacked & mask:
             return False
-        for a in args:
-            if not self.is_defended_by(a, args):
-                return False
-        return True
+        return not (self.attackers_of(mask) & ~attacked)
 
     def is_stable(self, args):
         """
@@ -238,14 +558,16 @@ class AF(object):
         :type args: iterable
         :return: True if args is stable, False otherwise
         """
-        args_restricted = self.restricted_extension(args)
-        if not self.is_conflict_free(args_restricted):
+        return self.is_stable_mask(to_mask(args) & self.args_mask)
+
+    def is_stable_mask(self, mask):
+        """
+        Bitmask variant of is_stable for a bitmask of arguments with status DEFINITE_ARGUMENT.
+        """
+        attacked = self.attacks_of(mask)
+        if attacked & mask:
             return False
-        for target in range(self.n):
-            if target not in args:
-                if (self.A[target] == AF.DEFINITE_ARGUMENT) and not self.attacks(args_restricted, target):
-                    return False
-        return True
+        return not (self.args_mask & ~mask & ~attacked)
 
     def is_grounded(self, args):
         """
@@ -255,8 +577,13 @@ class AF(object):
         :type args: iterable
         :return: True if args is grounded, False otherwise
         """
-        args = self.restricted_extension(args)
-        return self.grounded_extension() == args
+        return self.is_grounded_mask(to_mask(args) & self.args_mask)
+
+    def is_grounded_mask(self, mask):
+        """
+        Bitmask variant of is_grounded for a bitmask of arguments with status DEFINITE_ARGUMENT.
+        """
+        return self.grounded_mask() == mask
 
     def is_complete(self, args):
         """
@@ -266,13 +593,13 @@ class AF(object):
         :type args: iterable
         :return: True if args is complete, False otherwise
         """
-        args = self.restricted_extension(args)
-        if not self.is_admissible(args):
-            return False
-        for a in range(self.n):
-            if (self.A[a] == AF.DEFINITE_ARGUMENT) and (a not in args) and (self.is_defended_by(a, args)):
-                return False
-        return True
+        return self.is_complete_mask(to_mask(args) & self.args_mask)
+
+    def is_complete_mask(self, mask):
+        """
+        Bitmask variant of is_complete for a bitmask of arguments with status DEFINITE_ARGUMENT.
+        """
+        return self.is_admissible_mask(mask) and self.defended_mask(mask) == mask
 
     def is_preferred(self, args):
         """
@@ -282,49 +609,25 @@ class AF(object):
         :type args: iterable
         :return: True if args is preferred, False otherwise
         """
-        args = self.restricted_extension(args)
-        if not self.is_admissible(args):
+        return self.is_preferred_mask(to_mask(args) & self.args_mask)
+
+    def is_preferred_mask(self, mask):
+        """
+        Bitmask variant of is_preferred for a bitmask of arguments with status DEFINITE_ARGUMENT.
+
+        An admissible set is preferred iff no argument compatible with it can be added on the way to a strict
+        admissible superset, which is decided by admissible_superset for one candidate argument at a time.
+        """
+        if not self.is_admissible_mask(mask):
             return False
-        args2 = copy.deepcopy(args)
-        possible_args = []
-        for argument in range(self.n):
-            if self.A[argument] == AF.DEFINITE_ARGUMENT \
-                    and argument not in args \
-                    and not self.attacks(argument, args) \
-                    and not self.attacks(args, argument):
-                possible_args.append(argument)
-        return not self.is_dominated(args, args2, possible_args, len(possible_args))
-
-    def is_dominated(self, args1, args2, possible_args, k):
-        """
-        Indicates whether the first set of arguments is dominated by the second set of arguments in this AF.
-
-        A set args1 is dominated by a set args2 if args2 is a strict admissible superset of args1.
-        Intended for internal use in AF.is_preferred!
-
-        :param args1: first set
-        :type args1: iterable
-        :param args2: second set
-        :type args2: iterable
-        :param possible_args: candidates to be added to args2
-        :type possible_args: iterable
-        :param k: length of possible_args
-        :type k: int
-        :return: True if the first set is dominated by the second set in self, False otherwise
-        """
-        if k == 0:
-            if args1 == args2:
+        conflicting = mask | self.attacks_of(mask) | self.attackers_of(mask)
+        forbidden = 0
+        memo = {}
+        for candidate in iter_mask(self.args_mask & ~conflicting):
+            if self.admissible_superset(mask | (1 << candidate), forbidden, memo) is not None:
                 return False
-            return self.is_admissible(args2)
-        k -= 1
-        possible_arg = possible_args[k]
-        if self.is_dominated(args1, args2, possible_args, k):
-            return True
-        args2.add(possible_arg)
-        if self.is_dominated(args1, args2, possible_args, k):
-            return True
-        args2.remove(possible_arg)
-        return False
+            forbidden |= 1 << candidate
+        return True
 
     def verification(self, args, semantics):
         """
@@ -334,22 +637,41 @@ class AF(object):
         :param semantics: one of the semantics defined in the AF class.
         :return: True if args satisfies the semantics, False otherwise
         """
+        if semantics == self.SEMANTICS_NECF:
+            return len(args) > 0 and self.verify_mask(to_mask(args) & self.args_mask, self.SEMANTICS_CF)
+        elif semantics == self.SEMANTICS_NEAD:
+            return len(args) > 0 and self.verify_mask(to_mask(args) & self.args_mask, self.SEMANTICS_AD)
+        return self.verify_mask(to_mask(args) & self.args_mask, semantics)
+
+    def verify_mask(self, mask, semantics):
+        """
+        Bitmask variant of verification for a bitmask of arguments with status DEFINITE_ARGUMENT.
+
+        For the non-empty semantics, the bitmask itself has to be non-empty.
+
+        :param mask: bitmask of arguments in this AF.
+        :param semantics: one of the semantics defined in the AF class.
+        :return: True if mask satisfies the semantics, False otherwise
+        """
+        counters = AF.counters
+        if counters is not None:
+            counters['verify.' + AF.SEMANTICS_NAMES.get(semantics, str(semantics))] += 1
         if semantics == self.SEMANTICS_CF:
-            return self.is_conflict_free(args)
+            return self.is_conflict_free_mask(mask)
         elif semantics == self.SEMANTICS_NECF:
-            return len(args) > 0 and self.is_conflict_free(args)
+            return mask != 0 and self.is_conflict_free_mask(mask)
         elif semantics == self.SEMANTICS_AD:
-            return self.is_admissible(args)
+            return self.is_admissible_mask(mask)
         elif semantics == self.SEMANTICS_NEAD:
-            return len(args) > 0 and self.is_admissible(args)
+            return mask != 0 and self.is_admissible_mask(mask)
         elif semantics == self.SEMANTICS_CP:
-            return self.is_complete(args)
+            return self.is_complete_mask(mask)
         elif semantics == self.SEMANTICS_GR:
-            return self.is_grounded(args)
+            return self.is_grounded_mask(mask)
         elif semantics == self.SEMANTICS_ST:
-            return self.is_stable(args)
+            return self.is_stable_mask(mask)
         elif semantics == self.SEMANTICS_PR:
-            return self.is_preferred(args)
+            return self.is_preferred_mask(mask)
         print('warning: unknown semantics used for verification: %d', int(semantics))
         return False
 
@@ -360,7 +682,7 @@ class AF(object):
         :param condition: callback function that takes this af and a set of arguments as input
         :return: True if the condition returns a truthy value for at least one set of arguments, False otherwise
         """
-        af = copy.deepcopy(self)
+        af = self.copy()
         args = set()
         n_current = 0
         n_max = self.n
@@ -394,7 +716,7 @@ class AF(object):
         :param condition: callback function that takes this af and a set of arguments as input
         :return: False if the condition returns a falsy value for at least one set of arguments, True otherwise
         """
-        af = copy.deepcopy(self)
+        af = self.copy()
         args = set()
         n_current = 0
         n_max = self.n
@@ -421,6 +743,112 @@ class AF(object):
         args.remove(n_current)
         return True
 
+    def admissible_superset(self, mask, forbidden=0, memo=None):
+        """
+        Search for an admissible superset of the given bitmask that contains none of the forbidden arguments.
+
+        Starting from mask, the search repeatedly picks an attacker that is not yet counter-attacked and
+        branches over its conflict-free defenders, backtracking on conflicts. Only arguments around mask are
+        ever visited. Once a defender has been explored without success, it is forbidden in its sibling branches.
+
+        :param mask: bitmask of arguments with status DEFINITE_ARGUMENT that must be contained
+        :type mask: int
+        :param forbidden: bitmask of arguments that must not be contained
+        :type forbidden: int
+        :param memo: optional dict shared between searches on this unchanged AF, maps sets to forbidden arguments
+          for which the search failed
+        :type memo: dict
+        :return: bitmask of an admissible superset of mask, or None if there is none
+        """
+        if memo is None:
+            memo = {}
+        frame = self.admissible_superset_frame(mask, forbidden, memo)
+        if frame is None or frame[2] == 0:
+            return mask if frame is not None else None
+        stack = [frame]
+        while stack:
+            frame = stack[-1]
+            mask, forbidden, defenders, entry_forbidden = frame
+            if not defenders:
+                memo[mask] = entry_forbidden
+                stack.pop()
+                continue
+            defender = defenders & -defenders
+            frame[2] = defenders ^ defender
+            # no admissible superset of mask contains the defender once its branch is exhausted
+            frame[1] = forbidden | defender
+            child = self.admissible_superset_frame(mask | defender, forbidden, memo)
+            if child is None:
+                continue
+            if child[2] == 0:
+                return child[0]
+            stack.append(child)
+        return None
+
+    def admissible_superset_frame(self, mask, forbidden, memo):
+        """
+        Internal use only! Expand one node of the search in admissible_superset.
+
+        :return: None if mask cannot be extended, otherwise a frame [mask, forbidden, defenders, forbidden] where
+          defenders is the bitmask of branches to be explored (0 if mask is admissible)
+        """
+        if AF.counters is not None:
+            AF.counters['admissible_superset.frames'] += 1
+        if mask & forbidden:
+            return None
+        failed_forbidden = memo.get(mask)
+        if failed_forbidden is not None and not (failed_forbidden & ~forbidden):
+            return None
+        attacked = self.attacks_of(mask)
+        if attacked & mask:
+            return None
+        attackers = self.attackers_of(mask)
+        undefended = attackers & ~attacked
+        if not undefended:
+            return [mask, forbidden, 0, forbidden]
+        attacker = (undefended & -undefended).bit_length() - 1
+        defenders = self.attacked_by_masks[attacker] & self.args_mask & ~forbidden & ~attacked & ~attackers
+        if not defenders:
+            memo[mask] = forbidden
+            return None
+        return [mask, forbidden, defenders, forbidden]
+
+    def iter_extensions(self, semantics, include=0, exclude=0):
+        """
+        Iterate over all extensions of this AF for the given semantics that contain all arguments of include
+        and no argument of exclude.
+
+        Arguments are decided one at a time; branches that are not conflict-free are cut immediately and, for
+        stable semantics, so are branches in which an excluded argument can no longer be attacked.
+
+        :param semantics: one of the semantics defined in the AF class.
+        :param include: bitmask of arguments that must be contained
+        :type include: int
+        :param exclude: bitmask of arguments that must not be contained
+        :type exclude: int
+        :return: generator over bitmasks of extensions
+        """
+        if include & ~self.args_mask or include & exclude or not self.is_conflict_free_mask(include):
+            return
+        stack = [(include, self.args_mask & ~include & ~exclude, self.args_mask & exclude)]
+        counters = AF.counters
+        while stack:
+            mask, undecided, excluded = stack.pop()
+            if counters is not None:
+                counters['iter_extensions.subsets'] += 1
+            if semantics == AF.SEMANTICS_ST and excluded & ~self.attacks_of(mask | undecided):
+                continue
+            if not undecided:
+                if self.verify_mask(mask, semantics):
+                    yield mask
+                continue
+            candidate = undecided & -undecided
+            a = candidate.bit_length() - 1
+            undecided ^= candidate
+            stack.append((mask, undecided, excluded | candidate))
+            if not (self.attack_masks[a] & (mask | candidate)) and not (self.attacked_by_masks[a] & mask):
+                stack.append((mask | candidate, undecided, excluded))
+
     def is_credulously_acceptable(self, arg, semantics):
         """
         Solves the Credulous-Acceptance problem for this AF, the given argument, and the given semantics.
@@ -429,16 +857,20 @@ class AF(object):
         :param semantics: one of the semantics defined in the AF class.
         :return: True if at least one set of arguments that satisfies the semantics contains arg, False otherwise
         """
+        if AF.counters is not None:
+            AF.counters['credulous.' + AF.SEMANTICS_NAMES.get(semantics, str(semantics))] += 1
         if self.A[arg] != AF.DEFINITE_ARGUMENT:
             return False
-        # check all arg sets INCLUDING arg: if one of them is an extension, return True
-        arg_range = [i for i in range(self.n)
-                     if self.A[i] == AF.DEFINITE_ARGUMENT and i != arg]
-        for base_tuple in powerset(arg_range):
-            args = set(base_tuple)
-            args.add(arg)
-            if self.verification(args, semantics):
-                return True
+        arg_bit = 1 << arg
+        if semantics in (AF.SEMANTICS_CF, AF.SEMANTICS_NECF):
+            return self.is_conflict_free_mask(arg_bit)
+        elif semantics in (AF.SEMANTICS_AD, AF.SEMANTICS_NEAD, AF.SEMANTICS_CP, AF.SEMANTICS_PR):
+            # every admissible set is contained in a preferred (and thus complete) extension
+            return self.admissible_superset(arg_bit) is not None
+        elif semantics == AF.SEMANTICS_GR:
+            return (self.grounded_mask() & arg_bit) != 0
+        for _ in self.iter_extensions(semantics, include=arg_bit):
+            return True
         return False
 
     def is_skeptically_acceptable(self, arg, semantics):
@@ -449,15 +881,33 @@ class AF(object):
         :param semantics: one of the semantics defined in the AF class.
         :return: False if at least one set of arguments satisfying the semantics does not contain arg, True otherwise
         """
+        if AF.counters is not None:
+            AF.counters['skeptical.' + AF.SEMANTICS_NAMES.get(semantics, str(semantics))] += 1
         if self.A[arg] != AF.DEFINITE_ARGUMENT:
             return False
-        # check all arg sets EXCLUDING arg: if one of them is an extension, return False
-        arg_range = [i for i in range(self.n)
-                     if self.A[i] == AF.DEFINITE_ARGUMENT and i != arg]
-        for base_tuple in powerset(arg_range):
-            args = set(base_tuple)
-            if self.verification(args, semantics):
+        arg_bit = 1 << arg
+        if self.verify_mask(0, semantics):
+            # the empty set is an extension that excludes arg
+            return False
+        if semantics == AF.SEMANTICS_NECF:
+            return not any(self.is_conflict_free_mask(1 << a) for a in iter_mask(self.args_mask & ~arg_bit))
+        elif semantics == AF.SEMANTICS_NEAD:
+            memo = {}
+            return all(self.admissible_superset(1 << a, arg_bit, memo) is None
+                       for a in iter_mask(self.args_mask & ~arg_bit))
+        elif semantics in (AF.SEMANTICS_CP, AF.SEMANTICS_GR):
+            # the grounded extension is the least complete extension
+            return (self.grounded_mask() & arg_bit) != 0
+        elif semantics == AF.SEMANTICS_PR:
+            # an admissible set without arg or with an attacker of arg extends to a preferred extension without arg
+            memo = {}
+            if self.admissible_superset(arg_bit, 0, memo) is None:
                 return False
+            for attacker in iter_mask(self.attacked_by_masks[arg] & self.args_mask):
+                if self.admissible_superset(1 << attacker, 0, memo) is not None:
+                    return False
+        for _ in self.iter_extensions(semantics, exclude=arg_bit):
+            return False
         return True
 
     def is_skeptically_acceptable_and_extension_exists(self, arg, semantics):
@@ -469,19 +919,111 @@ class AF(object):
         :return: False if this AF has no extension for the semantics or if at least one set of arguments satisfying
           the semantics does not contain arg, True otherwise
         """
-        if self.A[arg] != AF.DEFINITE_ARGUMENT:
-            return False
-        # check all arg sets EXCLUDING arg: if one of them is an extension, return False
-        # Also check all arg sets INCLUDING arg: if none of them is an extension, return False
-        # arg_range = [i for i in range(self.n)]
-        arg_range = [i for i in range(self.n)
-                     if self.A[i] == AF.DEFINITE_ARGUMENT and i != arg]
-        extension_found = False
-        for base_tuple in powerset(arg_range):
-            args = set(base_tuple)
-            if self.verification(args, semantics):
-                return False
-            args.add(arg)
-            if self.verification(args, semantics):
-                extension_found = True
-        return extension_found
+        # if no extension excludes arg, an extension exists iff one contains arg
+        return self.is_skeptically_acceptable(arg, semantics) and self.is_credulously_acceptable(arg, semantics)
+
+    def acceptance_table(self, semantics, memo=None):
+        """
+        Determine all extensions of this AF for the given semantics in a single pass, and derive credulous and
+        skeptical acceptance of every argument as well as existence of an extension.
+
+        The table is stored in the cache (if caching is enabled) and in the given memo, so repeated queries for
+        different arguments of the same framework are answered from the table.
+
+        :param semantics: one of the semantics defined in the AF class.
+        :param memo: optional dict shared between calls, maps semantics and definite arguments and attacks to tables
+        :return: AcceptanceTable of this AF for the semantics
+        """
+        cache = self.cache
+        if cache is not None and semantics in cache.acceptance_tables:
+            return cache.acceptance_tables[semantics]
+        key = None
+        if memo is not None:
+            key = (self.state_key(), semantics)
+            if key in memo:
+                return memo[key]
+
+        if semantics == AF.SEMANTICS_GR:
+            extensions = [self.grounded_mask()]
+        else:
+            extensions = list(self.iter_extensions(semantics))
+        table = AcceptanceTable(extensions, self.args_mask)
+
+        if cache is not None:
+            cache.acceptance_tables[semantics] = table
+        if key is not None:
+            memo[key] = table
+        return table
+
+
+def count_operations(function, *args, **kwargs):
+    """
+    Call the given function with operation counting enabled (see AF.counters), e.g. to count the operations of a
+    single query. Counts are also added to the enclosing counters, if counting was already enabled.
+
+    :param function: function to be called
+    :param args: positional parameters of the function
+    :param kwargs: keyword parameters of the function
+    :return: tuple of the return value and a collections.Counter of the operations counted during the call
+    """
+    previous = AF.counters
+    counters = collections.Counter()
+    AF.counters = counters
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        AF.counters = previous
+        if previous is not None:
+            previous.update(counters)
+    return result, counters
+
+
+class AFCache(object):
+    """
+    Semantics information of an AF that stays valid as long as its definite arguments and attacks do not change.
+    """
+
+    def __init__(self):
+        self.attacks = {}
+        """(dict) bitmask of definitely attacked arguments for each queried bitmask of arguments"""
+        self.attackers = {}
+        """(dict) bitmask of definite attackers for each queried bitmask of arguments"""
+        self.defended = {}
+        """(dict) result of the characteristic function (bitmask of defended arguments) for each queried bitmask"""
+        self.grounded = None
+        """(int) bitmask of the grounded extension, None if not computed yet"""
+        self.acceptance_tables = {}
+        """(dict) AcceptanceTable for each queried semantics"""
+
+
+class AcceptanceTable(object):
+    """
+    All extensions of an AF for a semantics, together with the acceptance status of every argument (see
+    AF.acceptance_table).
+    """
+
+    def __init__(self, extensions, args_mask):
+        """
+        :param extensions: list of bitmasks of all extensions
+        :param args_mask: bitmask of all arguments with status DEFINITE_ARGUMENT
+        """
+        self.extensions = extensions
+        """(list) bitmasks of all extensions"""
+        self.exists = len(extensions) > 0
+        """(bool) True if there is at least one extension"""
+        self.credulous = 0
+        """(int) bitmask of all credulously acceptable arguments"""
+        self.skeptical = args_mask
+        """(int) bitmask of all skeptically acceptable arguments"""
+        for extension in extensions:
+            self.credulous |= extension
+            self.skeptical &= extension
+
+    def is_credulously_acceptable(self, arg):
+        return (self.credulous >> arg) & 1 == 1
+
+    def is_skeptically_acceptable(self, arg):
+        return (self.skeptical >> arg) & 1 == 1
+
+    def is_skeptically_acceptable_and_extension_exists(self, arg):
+        return self.exists and self.is_skeptically_acceptable(arg)
@@ -0,0 +1,181 @@
+import numpy
+from incaffeine.af import AF
+
+
+class BatchAF(object):
+    """
+    Stack of AFs with the same number of arguments, represented as boolean NumPy arrays, to evaluate semantics for all
+    AFs at once.
+
+    Like in AF, only arguments with status DEFINITE_ARGUMENT and attacks with status DEFINITE_ATTACK are considered.
+    Sets of arguments are given as boolean arrays of shape [batch, n] (one set per AF) or [n] (same set for all AFs).
+    """
+
+    def __init__(self, attacks, args):
+        """
+        :param attacks: boolean array of shape [batch, n, n], attacks[b, attacker, target] is True for definite attacks
+        :param args: boolean array of shape [batch, n], args[b, a] is True for definite arguments
+        """
+        self.args = numpy.asarray(args, dtype=bool)
+        """(numpy.ndarray) definite arguments of each AF, shape [batch, n]"""
+        self.attacks = numpy.asarray(attacks, dtype=bool) & self.args[:, :, None] & self.args[:, None, :]
+        """(numpy.ndarray) definite attacks between definite arguments of each AF, shape [batch, n, n]"""
+        self.batch_size, self.n = self.args.shape
+
+    def to_sets(self, sets):
+        """
+        Broadcast the given sets of arguments to shape [batch, n], restricted to definite arguments.
+
+        :param sets: boolean array of shape [batch, n] or [n]
+        :return: boolean array of shape [batch, n]
+        """
+        return numpy.broadcast_to(numpy.asarray(sets, dtype=bool), self.args.shape) & self.args
+
+    def attacks_of(self, sets):
+        """
+        Batch variant of AF.attacks_of.
+
+        :param sets: boolean array of shape [batch, n], restricted to definite arguments
+        :return: boolean array of shape [batch, n] of all arguments attacked by the given sets
+        """
+        return numpy.any(sets[:, :, None] & self.attacks, axis=1)
+
+    def attackers_of(self, sets):
+        """
+        Batch variant of AF.attackers_of.
+
+        :param sets: boolean array of shape [batch, n], restricted to definite arguments
+        :return: boolean array of shape [batch, n] of all arguments attacking the given sets
+        """
+        return numpy.any(self.attacks & sets[:, None, :], axis=2)
+
+    def defended(self, sets):
+        """
+        Batch variant of AF.defended_mask (characteristic function).
+
+        :param sets: boolean array of shape [batch, n], restricted to definite arguments
+        :return: boolean array of shape [batch, n] of all arguments defended by the given sets
+        """
+        attacked = self.attacks_of(sets)
+        return self.args & ~numpy.any(self.attacks & ~attacked[:, :, None], axis=1)
+
+    def grounded(self):
+        """
+        Batch variant of AF.grounded_mask, computed as least fixed point of the characteristic function.
+
+        :return: boolean array of shape [batch, n] of the grounded extension of each AF
+        """
+        grounded = numpy.zeros(self.args.shape, dtype=bool)
+        while True:
+            defended = self.defended(grounded)
+            if numpy.array_equal(defended, grounded):
+                return grounded
+            grounded = defended
+
+    def select(self, indices):
+        """
+        Create a BatchAF of some of the AFs of this batch.
+
+        :param indices: list of indices of AFs in this batch
+        :return: BatchAF of the selected AFs, in the given order
+        """
+        return BatchAF(self.attacks[indices], self.args[indices])
+
+    def is_conflict_free(self, sets):
+        sets = self.to_sets(sets)
+        return ~numpy.any(self.attacks_of(sets) & sets, axis=1)
+
+    def is_admissible(self, sets):
+        sets = self.to_sets(sets)
+        attacked = self.attacks_of(sets)
+        return ~numpy.any(attacked & sets, axis=1) & ~numpy.any(self.attackers_of(sets) & ~attacked, axis=1)
+
+    def is_stable(self, sets):
+        sets = self.to_sets(sets)
+        attacked = self.attacks_of(sets)
+        return ~numpy.any(attacked & sets, axis=1) & ~numpy.any(self.args & ~sets & ~attacked, axis=1)
+
+    def is_complete(self, sets):
+        sets = self.to_sets(sets)
+        return self.is_admissible(sets) & numpy.all(self.defended(sets) == sets, axis=1)
+
+    def is_grounded(self, sets):
+        sets = self.to_sets(sets)
+        return numpy.all(self.grounded() == sets, axis=1)
+
+    def verification(self, sets, semantics):
+        """
+        Batch variant of AF.verification.
+
+        :param sets: boolean array of shape [batch, n] or [n]
+        :param semantics: one of the semantics defined in the AF class, except SEMANTICS_PR
+        :return: boolean array of shape [batch], True for each AF in which its set satisfies the semantics
+        """
+        if semantics == AF.SEMANTICS_CF:
+            return self.is_conflict_free(sets)
+        elif semantics == AF.SEMANTICS_NECF:
+            return self.is_nonempty(sets) & self.is_conflict_free(sets)
+        elif semantics == AF.SEMANTICS_AD:
+            return self.is_admissible(sets)
+        elif semantics == AF.SEMANTICS_NEAD:
+            return self.is_nonempty(sets) & self.is_admissible(sets)
+        elif semantics == AF.SEMANTICS_CP:
+            return self.is_complete(sets)
+        elif semantics == AF.SEMANTICS_GR:
+            return self.is_grounded(sets)
+        elif semantics == AF.SEMANTICS_ST:
+            return self.is_stable(sets)
+        raise ValueError('semantics not supported for batch verification: %d' % int(semantics))
+
+    def is_nonempty(self, sets):
+        """
+        Indicates for each AF whether its set contains any argument, including arguments that are not definite.
+
+        :param sets: boolean array of shape [batch, n] or [n]
+        :return: boolean array of shape [batch]
+        """
+        sets = numpy.broadcast_to(numpy.asarray(sets, dtype=bool), self.args.shape)
+        return numpy.any(sets, axis=1)
+
+
+def stack(afs):
+    """
+    Stack the given AFs into a BatchAF.
+
+    :param afs: non-empty list of AFs with the same number of arguments
+    :return: BatchAF of the given AFs
+    """
+    return stack_masks([af.args_mask for af in afs], [af.attack_masks for af in afs], afs[0].n)
+
+
+def stack_masks(args_masks, attack_masks, n):
+    """
+    Stack AFs given by their bitmasks (see AF.args_mask and AF.attack_masks) into a BatchAF, e.g. straight from the
+    instances of a generator without copying them.
+
+    :param args_masks: list of the bitmasks of definite arguments of each AF
+    :param attack_masks: list of the lists of bitmasks of definite attacks of each AF
+    :param n: number of arguments of the AFs
+    :return: BatchAF of the given AFs
+    """
+    bits = numpy.arange(n)
+    attack_masks = numpy.array(attack_masks, dtype=numpy.int64).reshape(len(args_masks), n)
+    args_masks = numpy.array(args_masks, dtype=numpy.int64)
+    attacks = (attack_masks[:, :, None] >> bits) & 1
+    args = (args_masks[:, None] >> bits) & 1
+    return BatchAF(attacks, args)
+
+
+def stack_sets(sets, n):
+    """
+    Stack the given sets of arguments into a boolean array.
+
+    :param sets: list of iterables of arguments
+    :param n: number of arguments
+    :return: boolean array of shape [len(sets), n]
+    """
+    stacked = numpy.zeros((len(sets), n), dtype=bool)
+    for i in range(len(sets)):
+        for arg in sets[i]:
+            stacked[i, arg] = True
+    return stacked
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for AF and IncAF semantics, the instance generator and the test runner.
+
+All workloads are built from a fixed seed, so timings of different revisions are comparable. Run with
+
+    python3 -m incaffeine.benchmark --output=baseline.json
+    python3 -m incaffeine.benchmark --baseline=baseline.json
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import getopt
+import platform
+import datetime
+from incaffeine.af import AF
+from incaffeine.incaf import IncAF
+from incaffeine.instance_generator import InstanceGenerator
+from incaffeine.runner import TestRunner
+
+try:
+    from incaffeine.batch import stack_sets
+except ImportError:
+    stack_sets = None  # numpy is not installed, skip the batch benchmarks
+
+SEMANTICS = [('CF', AF.SEMANTICS_CF), ('AD', AF.SEMANTICS_AD), ('ST', AF.SEMANTICS_ST), ('CP', AF.SEMANTICS_CP),
+             ('GR', AF.SEMANTICS_GR), ('PR', AF.SEMANTICS_PR), ('NECF', AF.SEMANTICS_NECF),
+             ('NEAD', AF.SEMANTICS_NEAD)]
+"""names and values of all semantics defined in the AF class"""
+
+N_AF = 6
+"""number of arguments of the AFs in the AF benchmarks"""
+N_INCAF = 4
+"""number of arguments of the IncAFs in the IncAF benchmarks"""
+N_GENERATOR = 3
+"""AF size of the instance generator benchmarks"""
+N_RUNNER = 2
+"""AF size of the test runner benchmark"""
+N_RUNNER_VERIFICATION = 3
+"""AF size of the test runner verification benchmarks"""
+INSTANCES = 100
+"""number of random AFs or IncAFs per benchmark"""
+MIN_TIME = 0.02
+"""minimum duration of a timed run in seconds, short workloads are looped to reach it"""
+
+
+def random_af(rng, n, attack_probability=0.3):
+    """
+    Create a random AF.
+
+    :param rng: random.Random instance
+    :param n: number of arguments
+    :param attack_probability: probability of each attack
+    :return: AF with n definite arguments
+    """
+    af = AF(n)
+    for attacker in range(n):
+        for target in range(n):
+            if rng.random() < attack_probability:
+                af.set_attack(attacker, target, AF.DEFINITE_ATTACK)
+    return af
+
+
+def random_incaf(rng, n, attack_probability=0.3, possible_attack_probability=0.15, possible_argument_probability=0.2):
+    """
+    Create a random IncAF.
+
+    :param rng: random.Random instance
+    :param n: number of arguments
+    :param attack_probability: probability of each definite attack
+    :param possible_attack_probability: probability of each possible attack
+    :param possible_argument_probability: probability of each possible argument
+    :return: IncAF with n definite or possible arguments
+    """
+    af = IncAF(n)
+    for attacker in range(n):
+        for target in range(n):
+            value = rng.random()
+            if value < attack_probability:
+                af.set_attack(attacker, target, IncAF.DEFINITE_ATTACK)
+            elif value < attack_probability + possible_attack_probability:
+                af.set_attack(attacker, target, IncAF.POSSIBLE_ATTACK)
+    for arg in range(n):
+        if rng.random() < possible_argument_probability:
+            af.set_argument(arg, IncAF.POSSIBLE_ARGUMENT)
+    return af
+
+
+def random_args(rng, n):
+    """
+    :param rng: random.Random instance
+    :param n: number of arguments
+    :return: random subset of the arguments, as list
+    """
+    return [arg for arg in range(n) if rng.random() < 0.5]
+
+
+def verification_workload(semantics):
+    def create(rng):
+        instances = [(random_af(rng, N_AF), random_args(rng, N_AF)) for _ in range(INSTANCES)]
+
+        def run():
+            for af, args in instances:
+                af.verification(args, semantics)
+        return run
+    return create
+
+
+def acceptance_workload(method, semantics):
+    def create(rng):
+        afs = [random_af(rng, N_AF) for _ in range(INSTANCES)]
+
+        def run():
+            for af in afs:
+                query = getattr(af, method)
+                for arg in range(N_AF):
+                    query(arg, semantics)
+        return run
+    return create
+
+
+def grounded_workload(rng):
+    afs = [random_af(rng, N_AF) for _ in range(INSTANCES)]
+
+    def run():
+        for af in afs:
+            af.grounded_extension()
+    return run
+
+
+def preferred_workload(rng):
+    instances = [(random_af(rng, N_AF), random_args(rng, N_AF)) for _ in range(INSTANCES)]
+
+    def run():
+        for af, args in instances:
+            af.is_preferred(args)
+    return run
+
+
+def incaf_verification_workload(method, semantics):
+    def create(rng):
+        instances = [(random_incaf(rng, N_INCAF), random_args(rng, N_INCAF)) for _ in range(INSTANCES)]
+
+        def run():
+            for af, args in instances:
+                getattr(af, method)(args, semantics)
+        return run
+    return create
+
+
+def incaf_acceptance_workload(method, semantics):
+    def create(rng):
+        afs = [random_incaf(rng, N_INCAF) for _ in range(INSTANCES)]
+
+        def run():
+            for af in afs:
+                query = getattr(af, method)
+                for arg in range(N_INCAF):
+                    query(arg, semantics)
+        return run
+    return create
+
+
+def generator_generate_workload(rng):
+    generator = InstanceGenerator(N_GENERATOR, False, True, True, True, True)
+    seeds = [generator.decode_index(rng.randrange(generator.total_count)) for _ in range(100 * INSTANCES)]
+    seeds = [{'argument': digits[0], 'extension': digits[1],
+              'attacks_state': sum([digits[2 + i] * generator.number_of_attack_states ** i
+                                    for i in range(generator.number_of_attacks)]),
+              'args_state': sum([digits[2 + generator.number_of_attacks + i] * generator.number_of_argument_states ** i
+                                 for i in range(generator.number_of_arguments)])}
+             for digits in seeds]
+
+    def run():
+        for seed in seeds:
+            generator.generate(**seed)
+    return run
+
+
+def generator_next_workload(rng):
+    generator = InstanceGenerator(N_GENERATOR, False, True, True, True, True)
+    start = rng.randrange(generator.total_count - 100 * INSTANCES)
+
+    def run():
+        for _ in generator.next_range(start, start + 100 * INSTANCES):
+            pass
+    return run
+
+
+def grounded_credulous(runner, af, extension, arg):
+    return af.is_credulously_acceptable(arg, AF.SEMANTICS_GR)
+
+
+def complete_credulous(runner, af, extension, arg):
+    return af.is_credulously_acceptable(arg, AF.SEMANTICS_CP)
+
+
+def runner_workload(rng):
+    def run():
+        runner = TestRunner('benchmark', grounded_credulous, complete_credulous)
+        runner.n_min = N_RUNNER
+        runner.n_max = N_RUNNER
+        runner.use_extension = True
+        runner.use_argument = True
+        runner.use_uncertain_args = True
+        runner.use_uncertain_attacks = True
+        runner.log_stream = io.StringIO()
+        runner.log_status_interval = 0.1
+        runner.run()
+    return run
+
+
+def grounded_verification(runner, af, extension, arg):
+    return af.verification(extension, AF.SEMANTICS_GR)
+
+
+def grounded_extension_equal(runner, af, extension, arg):
+    return set(extension) == set(af.grounded_extension())
+
+
+def batch_grounded_verification(runner, batch_af, extensions, args):
+    return batch_af.verification(stack_sets(extensions, batch_af.n), AF.SEMANTICS_GR).tolist()
+
+
+def batch_grounded_extension_equal(runner, batch_af, extensions, args):
+    sets = stack_sets(extensions, batch_af.n)
+    return (batch_af.grounded() == sets).all(axis=1).tolist()
+
+
+def runner_verification_workload(batch):
+    """
+    Test runner verifying the grounded extension of all complete AFs, with per-instance or batch tester functions.
+
+    :param batch: True to use the batch tester functions (see BatchAF)
+    :return: workload
+    """
+    def create(rng):
+        def run():
+            runner = TestRunner('benchmark', grounded_verification, grounded_extension_equal)
+            if batch:
+                runner.test_instance = None
+                runner.reference_test_instance = None
+                runner.batch_test_instance = batch_grounded_verification
+                runner.batch_reference_test_instance = batch_grounded_extension_equal
+            runner.n_min = N_RUNNER_VERIFICATION
+            runner.n_max = N_RUNNER_VERIFICATION
+            runner.use_extension = True
+            runner.log_stream = io.StringIO()
+            runner.log_status_interval = 0.1
+            runner.run()
+        return run
+    return create
+
+
+def create_benchmarks():
+    """
+    Create the list of all benchmarks.
+
+    :return: list of tuples (name, workload), where workload takes a random.Random instance and returns a function
+      without parameters that performs one run of the benchmark
+    """
+    benchmarks = []
+    for name, semantics in SEMANTICS:
+        benchmarks.append(('af.verification.' + name, verification_workload(semantics)))
+    for name, semantics in SEMANTICS:
+        benchmarks.append(('af.credulous.' + name, acceptance_workload('is_credulously_acceptable', semantics)))
+        benchmarks.append(('af.skeptical.' + name, acceptance_workload('is_skeptically_acceptable', semantics)))
+    benchmarks.append(('af.grounded_extension', grounded_workload))
+    benchmarks.append(('af.is_preferred', preferred_workload))
+    for name, semantics in SEMANTICS:
+        for method in ['possible_verification', 'necessary_verification']:
+            benchmarks.append(('incaf.' + method + '.' + name, incaf_verification_workload(method, semantics)))
+    for name, semantics in SEMANTICS:
+        for method in ['is_possibly_credulously_acceptable', 'is_necessarily_credulously_acceptable',
+                       'is_possibly_skeptically_acceptable', 'is_necessarily_skeptically_acceptable']:
+            benchmarks.append(('incaf.' + method + '.' + name, incaf_acceptance_workload(method, semantics)))
+    benchmarks.append(('generator.generate', generator_generate_workload))
+    benchmarks.append(('generator.next_range', generator_next_workload))
+    benchmarks.append(('runner.run', runner_workload))
+    benchmarks.append(('runner.verification', runner_verification_workload(False)))
+    if stack_sets is not None:
+        benchmarks.append(('runner.verification.batch', runner_verification_workload(True)))
+    return benchmarks
+
+
+def measure(run, loops):
+    """
+    :param run: function without parameters
+    :param loops: number of calls
+    :return: duration of the given number of calls of run in seconds
+    """
+    start = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return time.perf_counter() - start
+
+
+def run_benchmarks(seed=0, repeat=5, name_filter=None, output_handle=None):
+    """
+    Run all benchmarks whose name contains the filter.
+
+    Each workload is built from its own random.Random(seed) instance, so the workload of a benchmark does not depend on
+    the selection of other benchmarks.
+
+    :param seed: seed of the workloads
+    :param repeat: number of timed runs per benchmark
+    :param name_filter: optional substring of the benchmark names to run
+    :param output_handle: optional stream for progress messages
+    :return: dict mapping benchmark names to dicts of the best and median run time in seconds and the number of runs
+      per timing (loops)
+    """
+    results = {}
+    for name, workload in create_benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+        run = workload(random.Random(seed))
+        loops = 1
+        while measure(run, loops) < MIN_TIME:
+            loops *= 2
+        times = sorted([measure(run, loops) / loops for _ in range(repeat)])
+        results[name] = {'best': times[0], 'median': times[len(times) // 2], 'loops': loops}
+        if output_handle is not None:
+            output_handle.write('{:60s} {:10.6f} s\n'.format(name, times[0]))
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare the best run times of benchmarks to a baseline.
+
+    :param results: dict of benchmark results (see run_benchmarks)
+    :param baseline: dict of benchmark results of the baseline
+    :param tolerance: relative slowdown that is not considered a regression
+    :return: list of tuples (name, baseline time, time, ratio) of all benchmarks in both results, and list of the
+      names of regressed benchmarks
+    """
+    comparison = []
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        reference = baseline[name]['best']
+        current = results[name]['best']
+        ratio = current / reference if reference > 0 else float('inf')
+        comparison.append((name, reference, current, ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return comparison, regressions
+
+
+def main(argv):
+    try:
+        opts, args = getopt.getopt(argv, "", ["seed=", "repeat=", "filter=", "output=", "baseline=", "tolerance="])
+    except getopt.GetoptError:
+        print('available options:')
+        print('\t--seed=int\t\tseed of the random workloads (default: 0)')
+        print('\t--repeat=int\t\tnumber of timed runs per benchmark (default: 5)')
+        print('\t--filter=<substring>\tonly run benchmarks whose name contains the substring')
+        print('\t--output=<filename>\twrite results as JSON to file with specified name')
+        print('\t--baseline=<filename>\tcompare to results in JSON file with specified name')
+        print('\t--tolerance=float\trelative slowdown that is not reported as regression (default: 0.2)')
+        sys.exit(0)
+    seed = 0
+    repeat = 5
+    name_filter = None
+    output_name = None
+    baseline_name = None
+    tolerance = 0.2
+    for opt, arg in opts:
+        if opt == '--seed':
+            seed = int(arg)
+        elif opt == '--repeat':
+            repeat = int(arg)
+        elif opt == '--filter':
+            name_filter = arg
+        elif opt == '--output':
+            output_name = arg
+        elif opt == '--baseline':
+            baseline_name = arg
+        elif opt == '--tolerance':
+            tolerance = float(arg)
+
+    results = run_benchmarks(seed, repeat, name_filter, sys.stdout)
+    if output_name:
+        report = {'timestamp': datetime.datetime.now().isoformat(), 'python': platform.python_version(),
+                  'platform': platform.platform(), 'seed': seed, 'repeat': repeat, 'results': results}
+        with open(output_name, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    if baseline_name:
+        with open(baseline_name) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        comparison, regressions = compare(results, baseline, tolerance)
+        print('')
+        print('{:60s} {:>10s} {:>10s} {:>7s}'.format('benchmark', 'baseline', 'current', 'ratio'))
+        for name, reference, current, ratio in comparison:
+            marker = ' !' if name in regressions else ''
+            print('{:60s} {:10.6f} {:10.6f} {:7.2f}{}'.format(name, reference, current, ratio, marker))
+        if regressions:
+            print('')
+            print(str(len(regressions)) + ' regression(s) above tolerance ' + str(tolerance))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,108 @@
 import itertools
+import collections
 
 
 def powerset(iterable):
     s = list(iterable)
     return itertools.chain.from_iterable(itertools.combinations(s, r) for r in range(len(s) + 1))
+
+
+def to_mask(args):
+    """
+    Convert the given set of arguments into an integer bitmask (bit i is set iff argument i is contained).
+
+    :param args: set of arguments
+    :type args: iterable
+    :return: bitmask representing args
+    """
+    mask = 0
+    for a in args:
+        mask |= 1 << a
+    return mask
+
+
+def from_mask(mask):
+    """
+    Convert the given integer bitmask into the set of arguments whose bits are set.
+
+    :param mask: bitmask of arguments
+    :type mask: int
+    :return: set of arguments
+    """
+    args = set()
+    while mask:
+        low = mask & -mask
+        args.add(low.bit_length() - 1)
+        mask ^= low
+    return args
+
+
+def iter_mask(mask):
+    """
+    Iterate over the arguments whose bits are set in the given bitmask, in ascending order.
+
+    :param mask: bitmask of arguments
+    :type mask: int
+    :return: generator over arguments
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def submasks(mask):
+    """
+    Iterate over all subsets of the given bitmask, including mask itself and the empty set.
+
+    :param mask: bitmask of arguments
+    :type mask: int
+    :return: generator over bitmasks
+    """
+    sub = mask
+    while True:
+        yield sub
+        if sub == 0:
+            return
+        sub = (sub - 1) & mask
+
+
+class LRUCache(object):
+    """
+    Bounded mapping that evicts the least recently used entry when it is full. Supports the dict operations used by
+    memos (in, [] and []=), and counts lookup hits and misses.
+    """
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        """(int) maximum number of entries"""
+        self.entries = collections.OrderedDict()
+        """(OrderedDict) entries in order of their last use, least recently used first"""
+        self.hits = 0
+        """(int) number of lookups of existing keys"""
+        self.misses = 0
+        """(int) number of lookups of missing keys"""
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        if key in self.entries:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def __getitem__(self, key):
+        value = self.entries[key]
+        self.entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
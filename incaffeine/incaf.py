@@ -1,5 +1,5 @@
-import copy
 from incaffeine.af import AF
+from incaffeine.helpers import iter_mask, to_mask
 
 
 class IncAF(AF):
@@ -12,6 +12,16 @@ class IncAF(AF):
     POSSIBLE_ATTACK = -1
     """constant that represents attack state 'possible attack' of an attack."""
 
+    completion_cache = None
+    """(LRUCache) results of queries on completions, shared by all IncAFs and keyed by AF.state_key of the
+    completion and the query, or None to disable caching (default). Completions of different IncAFs often coincide,
+    e.g. when a runner enumerates many similar instances, so enable it with IncAF.completion_cache = LRUCache()."""
+
+    def __init__(self, n):
+        super(IncAF, self).__init__(n)
+        self.completion_buffer = None
+        """(IncAF) preallocated IncAF to enumerate completions in, None while in use or not yet allocated"""
+
     def maximal_completion(self):
         maxi = IncAF(self.n)
         for i in range(self.n):
@@ -121,18 +131,317 @@ class IncAF(AF):
                     return False
         return True
 
+    def has_possible_arguments(self):
+        """
+        Indicates whether this IncAF contains at least one argument with status POSSIBLE_ARGUMENT.
+
+        :return: True if argument-incomplete, False if only attacks may be incomplete
+        """
+        return IncAF.POSSIBLE_ARGUMENT in self.A
+
+    def is_necessarily_admissible(self, args):
+        """
+        Indicates whether the given set of arguments is admissible in every completion.
+
+        For each member x and each (possible) attacker y of x, the worst completion contains x and y, the attack
+        from y to x, no other possible argument and no possible attack, so some definite member or x itself must
+        definitely attack y.
+        """
+        if not self.is_necessarily_conflict_free(args):
+            return False
+        members = [a for a in args if self.A[a] != IncAF.NO_ARGUMENT]
+        definite_members = [a for a in members if self.A[a] == IncAF.DEFINITE_ARGUMENT]
+        for x in members:
+            for y in range(self.n):
+                if self.A[y] == IncAF.NO_ARGUMENT or self.R[y][x] == IncAF.NO_ATTACK:
+                    continue
+                if self.R[x][y] != IncAF.DEFINITE_ATTACK \
+                        and not any(self.R[z][y] == IncAF.DEFINITE_ATTACK for z in definite_members):
+                    return False
+        return True
+
+    def is_possibly_admissible(self, args):
+        """
+        Indicates whether the given set of arguments is admissible in at least one completion.
+
+        Only for IncAFs without possible arguments: the best completion contains all possible attacks from args
+        to other arguments and no other possible attack on or within args.
+        """
+        mask = to_mask(args) & self.args_mask
+        if not self.is_conflict_free_mask(mask):
+            return False
+        counter_attacked = 0
+        for a in iter_mask(mask):
+            for target in iter_mask(self.args_mask & ~mask):
+                if self.R[a][target] != IncAF.NO_ATTACK:
+                    counter_attacked |= 1 << target
+        return not (self.attackers_of(mask) & ~counter_attacked)
+
+    def is_necessarily_stable(self, args):
+        """
+        Indicates whether the given set of arguments is stable in every completion.
+
+        Every argument outside of args that is present in some completion has to be definitely attacked by a
+        definite member of args.
+        """
+        if not self.is_necessarily_conflict_free(args):
+            return False
+        mask = to_mask(args)
+        for target in range(self.n):
+            if self.A[target] != IncAF.NO_ARGUMENT and not (mask >> target) & 1 \
+                    and not self.attacked_by_masks[target] & self.args_mask & mask:
+                return False
+        return True
+
+    def is_possibly_stable(self, args):
+        """
+        Indicates whether the given set of arguments is stable in at least one completion.
+
+        Only for IncAFs without possible arguments: the best completion contains all possible attacks from args
+        to other arguments and no possible attack within args.
+        """
+        mask = to_mask(args) & self.args_mask
+        if not self.is_conflict_free_mask(mask):
+            return False
+        for target in iter_mask(self.args_mask & ~mask):
+            if not any(self.R[a][target] != IncAF.NO_ATTACK for a in iter_mask(mask)):
+                return False
+        return True
+
+    def is_possibly_credulously_conflict_free(self, arg):
+        """
+        Indicates whether the given argument is credulously acceptable under conflict-free semantics in at least
+        one completion, i.e., whether it may exist without attacking itself.
+        """
+        return self.A[arg] != IncAF.NO_ARGUMENT and self.R[arg][arg] != IncAF.DEFINITE_ATTACK
+
+    def is_necessarily_credulously_conflict_free(self, arg):
+        """
+        Indicates whether the given argument is credulously acceptable under conflict-free semantics in every
+        completion, i.e., whether it definitely exists and never attacks itself.
+        """
+        return self.A[arg] == IncAF.DEFINITE_ARGUMENT and self.R[arg][arg] == IncAF.NO_ATTACK
+
+    def is_never_skeptically_acceptable(self, arg):
+        """
+        The empty set is a conflict-free and admissible set of every completion, so no argument is skeptically
+        acceptable under these semantics.
+        """
+        return False
+
+    def is_possibly_credulously_grounded(self, arg):
+        """
+        Indicates whether the given argument is in the grounded extension of at least one completion.
+
+        Only for IncAFs without possible arguments. The problem is NP-complete even then (possible attacks between
+        pairs of mutually attacking arguments can encode truth assignments), so the completions are searched, but
+        polynomially: possible attacks with an endpoint outside of the candidates (see possible_grounded_candidates)
+        are decided beforehand, and partial completions are decided by possible_grounded_bound. Leaving out attacks
+        by arguments outside of a grounded extension and adding attacks on them never shrinks the grounded extension,
+        so both preserve a completion in which arg is grounded.
+        """
+        decided = self.possible_grounded_bound(arg)
+        if decided is not None:
+            return decided
+
+        candidates = self.possible_grounded_candidates(arg)[0]
+        af = self.copy()
+        for attacker, target in self.possible_elements()[0]:
+            if not (candidates >> attacker) & 1:
+                af.set_attack(attacker, target, IncAF.NO_ATTACK)
+            elif not (candidates >> target) & 1:
+                af.set_attack(attacker, target, IncAF.DEFINITE_ATTACK)
+
+        def condition(completion):
+            return completion.is_credulously_acceptable(arg, AF.SEMANTICS_GR)
+        condition = self.cached_condition(condition, ('is_credulously_acceptable', AF.SEMANTICS_GR, arg))
+
+        def bound(partial):
+            return partial.possible_grounded_bound(arg)
+        return af.possibly_satisfied(condition, bound=bound)
+
+    def possible_grounded_candidates(self, arg):
+        """
+        Over-approximate the grounded extensions that contain the given argument, over all completions of this IncAF
+        without possible arguments.
+
+        Such a grounded extension contains no definite attacker or target of arg, and each member is defended against
+        its definite attackers by members added before it, via definite or possible attacks. The least set that is
+        closed under this defense contains all of them.
+
+        :param arg: argument
+        :return: tuple of the bitmask of candidates, and the list of bitmasks of the definite or possible attackers
+          of each argument
+        """
+        present = self.args_mask
+        potential_attackers = [0 for _ in range(self.n)]
+        for attacker in iter_mask(present):
+            for target in iter_mask(present):
+                if self.R[attacker][target] != IncAF.NO_ATTACK:
+                    potential_attackers[target] |= 1 << attacker
+        excluded = self.attacked_by_masks[arg] | self.attack_masks[arg]
+        candidates = 0
+        changed = True
+        while changed:
+            changed = False
+            for a in iter_mask(present & ~excluded & ~candidates):
+                if all(potential_attackers[b] & candidates for b in iter_mask(self.attacked_by_masks[a] & present)):
+                    candidates |= 1 << a
+                    changed = True
+        return candidates, potential_attackers
+
+    def possible_grounded_bound(self, arg):
+        """
+        Decide Possible-Credulous-Acceptance under grounded semantics on this (partial) IncAF without possible
+        arguments, without enumerating completions if possible.
+
+        Intended for internal use as bound in is_possibly_credulously_grounded! arg is rejected if it is no candidate
+        (see possible_grounded_candidates), and accepted if it is grounded in the completion that contains all
+        possible attacks except those on candidates.
+
+        :return: True or False if decided, None otherwise
+        """
+        candidates, potential_attackers = self.possible_grounded_candidates(arg)
+        if not (candidates >> arg) & 1:
+            return False
+        present = self.args_mask
+        attackers = [(self.attacked_by_masks[a] if (candidates >> a) & 1 else potential_attackers[a]) & present
+                     for a in range(self.n)]
+        grounded = 0
+        defeated = 0
+        while True:
+            unattacked = 0
+            for a in iter_mask(present & ~grounded):
+                if not attackers[a] & ~defeated:
+                    unattacked |= 1 << a
+            if not unattacked:
+                break
+            grounded |= unattacked
+            for a in iter_mask(present & ~defeated):
+                if attackers[a] & grounded:
+                    defeated |= 1 << a
+        if (grounded >> arg) & 1:
+            return True
+        return None
+
+    POLYNOMIAL_SOLVERS = {
+        ('possible_verification', AF.SEMANTICS_CF): ('is_possibly_conflict_free', False),
+        ('necessary_verification', AF.SEMANTICS_CF): ('is_necessarily_conflict_free', False),
+        ('possible_verification', AF.SEMANTICS_AD): ('is_possibly_admissible', True),
+        ('necessary_verification', AF.SEMANTICS_AD): ('is_necessarily_admissible', False),
+        ('possible_verification', AF.SEMANTICS_ST): ('is_possibly_stable', True),
+        ('necessary_verification', AF.SEMANTICS_ST): ('is_necessarily_stable', False),
+        ('possible_credulous_acceptance', AF.SEMANTICS_CF): ('is_possibly_credulously_conflict_free', False),
+        ('possible_credulous_acceptance', AF.SEMANTICS_NECF): ('is_possibly_credulously_conflict_free', False),
+        ('possible_credulous_acceptance', AF.SEMANTICS_GR): ('is_possibly_credulously_grounded', True),
+        ('necessary_credulous_acceptance', AF.SEMANTICS_CF): ('is_necessarily_credulously_conflict_free', False),
+        ('necessary_credulous_acceptance', AF.SEMANTICS_NECF): ('is_necessarily_credulously_conflict_free', False),
+        ('possible_skeptical_acceptance', AF.SEMANTICS_CF): ('is_never_skeptically_acceptable', False),
+        ('possible_skeptical_acceptance', AF.SEMANTICS_AD): ('is_never_skeptically_acceptable', False),
+        ('necessary_skeptical_acceptance', AF.SEMANTICS_CF): ('is_never_skeptically_acceptable', False),
+        ('necessary_skeptical_acceptance', AF.SEMANTICS_AD): ('is_never_skeptically_acceptable', False),
+    }
+    """maps (problem, semantics) to (name of a polynomial solver, whether it requires that there are no possible
+    arguments). is_possibly_credulously_grounded only decides most IncAFs in polynomial time, see there."""
+
+    def polynomial_solver(self, problem, semantics):
+        """
+        Look up a polynomial solver for the given problem and semantics that is applicable to this IncAF.
+
+        :param problem: name of the problem, e.g. 'possible_verification' or 'necessary_credulous_acceptance'
+        :param semantics: one of the semantics defined in the AF class.
+        :return: bound solver method, or None if the problem has to be solved by enumerating completions
+        """
+        entry = IncAF.POLYNOMIAL_SOLVERS.get((problem, semantics))
+        if entry is None:
+            return None
+        name, requires_complete_arguments = entry
+        if requires_complete_arguments and self.has_possible_arguments():
+            return None
+        return getattr(self, name)
+
     # ------------------------------------------------------------------------------------------------
-    # Naive, exponential solutions to possible/necessary problems variants.
+    # Naive, exponential solutions to possible/necessary problems variants, unless a polynomial solver applies.
 
     def possible_verification(self, args, semantics):
+        if semantics in (AF.SEMANTICS_NECF, AF.SEMANTICS_NEAD):
+            if len(args) == 0:
+                return False
+            semantics = AF.SEMANTICS_CF if semantics == AF.SEMANTICS_NECF else AF.SEMANTICS_AD
+        solver = self.polynomial_solver('possible_verification', semantics)
+        if solver is not None:
+            return solver(args)
+
         def condition(af):
             return af.verification(args, semantics)
-        return self.possibly_satisfied(condition)
+        condition = self.cached_condition(condition, ('verification', semantics, to_mask(args)))
+
+        def bound(af):
+            return af.possible_verification_bound(args, semantics)
+        return self.possibly_satisfied(condition, bound=bound)
 
     def necessary_verification(self, args, semantics):
+        if semantics in (AF.SEMANTICS_NECF, AF.SEMANTICS_NEAD):
+            if len(args) == 0:
+                return False
+            semantics = AF.SEMANTICS_CF if semantics == AF.SEMANTICS_NECF else AF.SEMANTICS_AD
+        solver = self.polynomial_solver('necessary_verification', semantics)
+        if solver is not None:
+            return solver(args)
+
         def condition(af):
             return af.verification(args, semantics)
-        return self.necessarily_satisfied(condition)
+        condition = self.cached_condition(condition, ('verification', semantics, to_mask(args)))
+
+        def bound(af):
+            return af.necessary_verification_bound(args, semantics)
+        return self.necessarily_satisfied(condition, bound=bound)
+
+    def possible_verification_bound(self, args, semantics):
+        """
+        Decide Possible-Verification on this (partial) IncAF without enumerating completions, if possible.
+
+        Intended for internal use as bound in possible_verification! All remaining semantics imply conflict-freeness
+        and complete, grounded and preferred extensions are admissible, so the polynomial solvers for these
+        semantics yield lower and upper bounds, e.g. via the minimal completion for conflict-freeness.
+
+        :return: True or False if decided, None otherwise
+        """
+        if not self.is_possibly_conflict_free(args):
+            return False
+        if semantics in (AF.SEMANTICS_CP, AF.SEMANTICS_GR, AF.SEMANTICS_PR):
+            solver = self.polynomial_solver('possible_verification', AF.SEMANTICS_AD)
+            if solver is not None and not solver(args):
+                return False
+            return None
+        solver = self.polynomial_solver('possible_verification', semantics)
+        if solver is not None:
+            return solver(args)
+        solver = self.polynomial_solver('necessary_verification', semantics)
+        if solver is not None and solver(args):
+            return True
+        return None
+
+    def necessary_verification_bound(self, args, semantics):
+        """
+        Decide Necessary-Verification on this (partial) IncAF without enumerating completions, if possible.
+
+        Intended for internal use as bound in necessary_verification! A single completion in which args is not
+        conflict-free (e.g. the maximal completion) or, for complete, grounded and preferred semantics, not
+        admissible decides the problem negatively.
+
+        :return: True or False if decided, None otherwise
+        """
+        if not self.is_necessarily_conflict_free(args):
+            return False
+        if semantics in (AF.SEMANTICS_CP, AF.SEMANTICS_GR, AF.SEMANTICS_PR):
+            if not self.is_necessarily_admissible(args):
+                return False
+            return None
+        solver = self.polynomial_solver('necessary_verification', semantics)
+        if solver is not None:
+            return solver(args)
+        return None
 
     def is_possibly_acceptable(self, args, arg):
         if self.A[arg] == IncAF.NO_ARGUMENT:
@@ -141,7 +450,7 @@ class IncAF(AF):
 
         def condition(af):
             return af.is_defended_by(arg, args)
-        return self.possibly_satisfied(condition)
+        return self.possibly_satisfied(condition, incremental=True)
 
     def is_necessarily_acceptable(self, args, arg):
         if self.A[arg] != IncAF.DEFINITE_ARGUMENT:
@@ -150,34 +459,49 @@ class IncAF(AF):
 
         def condition(af):
             return af.is_defended_by(arg, args)
-        return self.necessarily_satisfied(condition)
+        return self.necessarily_satisfied(condition, incremental=True)
 
     def is_possibly_credulously_acceptable(self, arg, semantics):
         if self.A[arg] == IncAF.NO_ARGUMENT:
             # Excluded arguments cannot be possibly acceptable
             return False
 
+        solver = self.polynomial_solver('possible_credulous_acceptance', semantics)
+        if solver is not None:
+            return solver(arg)
+
         def condition(af):
             return af.is_credulously_acceptable(arg, semantics)
-        return self.possibly_satisfied(condition)
+        condition = self.cached_condition(condition, ('is_credulously_acceptable', semantics, arg))
+        return self.possibly_satisfied(condition, incremental=True)
 
     def is_necessarily_credulously_acceptable(self, arg, semantics):
         if self.A[arg] != IncAF.DEFINITE_ARGUMENT:
             # Only definite arguments can be necessarily acceptable
             return False
 
+        solver = self.polynomial_solver('necessary_credulous_acceptance', semantics)
+        if solver is not None:
+            return solver(arg)
+
         def condition(af):
             return af.is_credulously_acceptable(arg, semantics)
-        return self.necessarily_satisfied(condition)
+        condition = self.cached_condition(condition, ('is_credulously_acceptable', semantics, arg))
+        return self.necessarily_satisfied(condition, incremental=True)
 
     def is_possibly_skeptically_acceptable(self, arg, semantics):
         if self.A[arg] == IncAF.NO_ARGUMENT:
             # Excluded arguments cannot be possibly acceptable
             return False
 
+        solver = self.polynomial_solver('possible_skeptical_acceptance', semantics)
+        if solver is not None:
+            return solver(arg)
+
         def condition(af):
             return af.is_skeptically_acceptable(arg, semantics)
-        return self.possibly_satisfied(condition)
+        condition = self.cached_condition(condition, ('is_skeptically_acceptable', semantics, arg))
+        return self.possibly_satisfied(condition, incremental=True)
 
     def is_possibly_skeptically_acceptable_and_extension_exists(self, arg, semantics):
         if self.A[arg] == IncAF.NO_ARGUMENT:
@@ -186,16 +510,22 @@ class IncAF(AF):
 
         def condition(af):
             return af.is_skeptically_acceptable_and_extension_exists(arg, semantics)
-        return self.possibly_satisfied(condition)
+        condition = self.cached_condition(condition, ('is_skeptically_acceptable_and_extension_exists', semantics, arg))
+        return self.possibly_satisfied(condition, incremental=True)
 
     def is_necessarily_skeptically_acceptable(self, arg, semantics):
         if self.A[arg] != IncAF.DEFINITE_ARGUMENT:
             # Only definite arguments can be necessarily acceptable
             return False
 
+        solver = self.polynomial_solver('necessary_skeptical_acceptance', semantics)
+        if solver is not None:
+            return solver(arg)
+
         def condition(af):
             return af.is_skeptically_acceptable(arg, semantics)
-        return self.necessarily_satisfied(condition)
+        condition = self.cached_condition(condition, ('is_skeptically_acceptable', semantics, arg))
+        return self.necessarily_satisfied(condition, incremental=True)
 
     def is_necessarily_skeptically_acceptable_and_extension_exists(self, arg, semantics):
         if self.A[arg] != IncAF.DEFINITE_ARGUMENT:
@@ -204,34 +534,207 @@ class IncAF(AF):
 
         def condition(af):
             return af.is_skeptically_acceptable_and_extension_exists(arg, semantics)
-        return self.necessarily_satisfied(condition)
-
-    def possibly_satisfied(self, condition):
-        af = copy.deepcopy(self)
+        condition = self.cached_condition(condition, ('is_skeptically_acceptable_and_extension_exists', semantics, arg))
+        return self.necessarily_satisfied(condition, incremental=True)
+
+    def acceptance_statuses(self, semantics, memo=None, required=None):
+        """
+        Determine for every argument whether it is possibly or necessarily credulously acceptable, skeptically
+        acceptable, and skeptically acceptable with an existing extension, in a single enumeration of the completions
+        of this IncAF. Only arguments whose statuses are still undecided are evaluated in each completion (see
+        AcceptanceStatuses.update), and the enumeration stops as soon as the required statuses of all arguments are
+        decided.
+
+        :param semantics: one of the semantics defined in the AF class.
+        :param memo: optional dict shared between calls, maps semantics, required statuses and argument and attack
+          states to results
+        :param required: optional iterable of the names of the required statuses (see AcceptanceStatuses.STATUSES),
+          all statuses are required by default. Statuses that are not required may be left undecided.
+        :return: AcceptanceStatuses of all arguments
+        """
+        required = AcceptanceStatuses.STATUSES if required is None else tuple(required)
+        key = None
+        if memo is not None:
+            key = (semantics, required, tuple(self.A), tuple([tuple(row) for row in self.R]))
+            if key in memo:
+                return memo[key]
+
+        statuses = AcceptanceStatuses(self, required)
+        af = self.acquire_completion_buffer()
+        try:
+            possible_attacks, possible_arguments = af.possible_elements()
+            for changed in af.iter_completions(possible_attacks, possible_arguments):
+                if changed and statuses.update(af, semantics):
+                    break
+        finally:
+            self.completion_buffer = af
+
+        if key is not None:
+            memo[key] = statuses
+        return statuses
+
+    def cached_condition(self, condition, query):
+        """
+        Wrap a condition on completions so that its results are looked up in and stored to IncAF.completion_cache.
+
+        :param condition: callback function that takes a completion as input and solely depends on its definite
+          arguments and attacks
+        :param query: hashable description of the condition, e.g. the name of an AF method and its parameters
+        :return: the cached condition, or the given condition if caching is disabled
+        """
+        cache = IncAF.completion_cache
+        if cache is None:
+            return condition
+
+        def cached(af):
+            key = (af.state_key(), query)
+            if key in cache:
+                if AF.counters is not None:
+                    AF.counters['completion_cache.hits'] += 1
+                return cache[key]
+            result = condition(af)
+            cache[key] = result
+            return result
+        return cached
+
+    def possibly_satisfied(self, condition, incremental=False, bound=None):
+        """
+        Tests if the given condition is satisfied for at least one completion of this IncAF.
+
+        :param condition: callback function that takes a completion as input
+        :param incremental: if True, completions are visited in Gray-code order and the condition is only
+          re-evaluated when the definite arguments or attacks changed. Only valid for conditions that solely
+          depend on definite arguments and attacks (like all semantics of AF).
+        :param bound: optional callback function that takes a partial completion (an IncAF in which some possible
+          elements are decided) and returns True if the condition is satisfied for at least one of its
+          completions, False if it is satisfied for none of them, or None if this is unknown. Decided subtrees
+          of the search are cut. Takes precedence over incremental.
+        :return: True if the condition returns a truthy value for at least one completion, False otherwise
+        """
+        af = self.acquire_completion_buffer()
+        try:
+            possible_attacks, possible_arguments = af.possible_elements()
+            if bound is not None:
+                satisfied = af.possibly_satisfied_rec(condition, possible_attacks, len(possible_attacks),
+                                                      possible_arguments, len(possible_arguments), bound)
+            elif incremental:
+                satisfied = False
+                for changed in af.iter_completions(possible_attacks, possible_arguments):
+                    if changed and condition(af):
+                        satisfied = True
+                        break
+            else:
+                satisfied = af.possibly_satisfied_rec(condition, possible_attacks, len(possible_attacks),
+                                                      possible_arguments, len(possible_arguments))
+        finally:
+            self.completion_buffer = af
+        if AF.counters is not None:
+            AF.counters['possibly_satisfied'] += 1
+            if satisfied:
+                # a satisfying completion ends the enumeration
+                AF.counters['possibly_satisfied.early_exits'] += 1
+        return satisfied
+
+    def acquire_completion_buffer(self):
+        """
+        Internal use only! Provide a copy of this IncAF to enumerate completions in.
+
+        Reuses the preallocated completion_buffer unless it is already in use by an enclosing enumeration. The
+        caller has to hand it back by assigning it to completion_buffer.
+
+        :return: IncAF with the same state as self
+        """
+        af = self.completion_buffer
+        if af is None:
+            return self.copy()
+        self.completion_buffer = None
+        self.clone_into(af)
+        return af
+
+    def possible_elements(self):
+        """
+        Determine the possible attacks and possible arguments of this IncAF.
+
+        :return: tuple of the list of possible attacks (as (attacker, target) tuples) and the list of possible
+          arguments
+        """
         possible_attacks = []
-        for attacker in range(af.n):
-            for target in range(af.n):
-                if af.R[attacker][target] == IncAF.POSSIBLE_ATTACK:
+        for attacker in range(self.n):
+            for target in range(self.n):
+                if self.R[attacker][target] == IncAF.POSSIBLE_ATTACK:
                     possible_attacks.append((attacker, target))
         possible_arguments = []
-        for arg in range(af.n):
-            if af.A[arg] == IncAF.POSSIBLE_ARGUMENT:
+        for arg in range(self.n):
+            if self.A[arg] == IncAF.POSSIBLE_ARGUMENT:
                 possible_arguments.append(arg)
-        return af.possibly_satisfied_rec(condition, possible_attacks, len(possible_attacks),
-                                         possible_arguments, len(possible_arguments))
-
-    def possibly_satisfied_rec(self, condition, possible_attacks, k_att, possible_arguments, k_arg):
-        if k_att == 0:
-            if k_arg == 0:
-                return condition(self)
-
+        return possible_attacks, possible_arguments
+
+    def iter_completions(self, possible_attacks, possible_arguments):
+        """
+        Internal use only! Turn this IncAF into each of its completions in Gray-code order.
+
+        Consecutive completions differ in exactly one possible attack or argument, so the bitmasks are updated in
+        constant time per step, and flips that do not change a definite attack or argument are reported as unchanged.
+        Caching is enabled on this IncAF, so the grounded extension is updated by delta on attack flips where this is
+        sound (see AF.update_cache). All other cached semantics information is recomputed after every change.
+        Possible arguments occupy the most significant positions, so they are flipped rarely. This IncAF is left in
+        the last completion.
+
+        :param possible_attacks: list of possible attacks as (attacker, target) tuples
+        :param possible_arguments: list of possible arguments
+        :return: generator that yields, for each completion, whether its definite arguments or attacks differ
+          from the previous completion
+        """
+        for attacker, target in possible_attacks:
+            self.set_attack(attacker, target, IncAF.NO_ATTACK)
+        for arg in possible_arguments:
+            self.set_argument(arg, IncAF.NO_ARGUMENT)
+        if self.cache is None:
+            self.enable_cache()
+        counters = AF.counters
+        if counters is not None:
+            counters['completions'] += 1
+        yield True
+        k_att = len(possible_attacks)
+        states = [False] * (k_att + len(possible_arguments))
+        for step in range(1, 1 << len(states)):
+            if counters is not None:
+                counters['completions'] += 1
+            item = (step & -step).bit_length() - 1
+            states[item] = not states[item]
+            if item < k_att:
+                attacker, target = possible_attacks[item]
+                self.set_attack(attacker, target, IncAF.DEFINITE_ATTACK if states[item] else IncAF.NO_ATTACK)
+                yield self.A[attacker] == IncAF.DEFINITE_ARGUMENT and self.A[target] == IncAF.DEFINITE_ARGUMENT
+            else:
+                arg = possible_arguments[item - k_att]
+                self.set_argument(arg, IncAF.DEFINITE_ARGUMENT if states[item] else IncAF.NO_ARGUMENT)
+                yield True
+
+    def possibly_satisfied_rec(self, condition, possible_attacks, k_att, possible_arguments, k_arg, bound=None):
+        counters = AF.counters
+        if k_att == 0 and k_arg == 0:
+            if counters is not None:
+                counters['completions'] += 1
+            return condition(self)
+        if bound is not None:
+            decided = bound(self)
+            if counters is not None:
+                counters['bound.calls'] += 1
+                if decided is not None:
+                    counters['bound.cuts'] += 1
+            if decided is not None:
+                return decided
+
+        if k_arg > 0:
+            # decide possible arguments first, so that bounds for attack-incomplete IncAFs apply early
             k_arg -= 1
             possible_argument = possible_arguments[k_arg]
             self.set_argument(possible_argument, IncAF.DEFINITE_ARGUMENT)
-            if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+            if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg, bound):
                 return True
             self.set_argument(possible_argument, IncAF.NO_ARGUMENT)
-            if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+            if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg, bound):
                 return True
             self.set_argument(possible_argument, IncAF.POSSIBLE_ARGUMENT)
             return False
@@ -239,40 +742,76 @@ class IncAF(AF):
         k_att -= 1
         possible_attack = possible_attacks[k_att]
         self.set_attack(possible_attack[0], possible_attack[1], IncAF.DEFINITE_ATTACK)
-        if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+        if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg, bound):
             return True
         self.set_attack(possible_attack[0], possible_attack[1], IncAF.NO_ATTACK)
-        if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+        if self.possibly_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg, bound):
             return True
         self.set_attack(possible_attack[0], possible_attack[1], IncAF.POSSIBLE_ATTACK)
         return False
 
-    def necessarily_satisfied(self, condition):
-        af = copy.deepcopy(self)
-        possible_attacks = []
-        for attacker in range(af.n):
-            for target in range(af.n):
-                if af.R[attacker][target] == IncAF.POSSIBLE_ATTACK:
-                    possible_attacks.append((attacker, target))
-        possible_arguments = []
-        for arg in range(af.n):
-            if af.A[arg] == IncAF.POSSIBLE_ARGUMENT:
-                possible_arguments.append(arg)
-        return af.necessarily_satisfied_rec(condition, possible_attacks, len(possible_attacks),
-                                            possible_arguments, len(possible_arguments))
-
-    def necessarily_satisfied_rec(self, condition, possible_attacks, k_att, possible_arguments, k_arg):
-        if k_att == 0:
-            if k_arg == 0:
-                return condition(self)
-
+    def necessarily_satisfied(self, condition, incremental=False, bound=None):
+        """
+        Tests if the given condition is satisfied for all completions of this IncAF.
+
+        :param condition: callback function that takes a completion as input
+        :param incremental: if True, completions are visited in Gray-code order and the condition is only
+          re-evaluated when the definite arguments or attacks changed (see possibly_satisfied)
+        :param bound: optional callback function that takes a partial completion and returns True if the
+          condition is satisfied for all of its completions, False if it is violated for at least one of them, or
+          None if this is unknown. Decided subtrees of the search are cut. Takes precedence over incremental.
+        :return: False if the condition returns a falsy value for at least one completion, True otherwise
+        """
+        af = self.acquire_completion_buffer()
+        try:
+            possible_attacks, possible_arguments = af.possible_elements()
+            if bound is not None:
+                satisfied = af.necessarily_satisfied_rec(condition, possible_attacks, len(possible_attacks),
+                                                         possible_arguments, len(possible_arguments), bound)
+            elif incremental:
+                satisfied = True
+                for changed in af.iter_completions(possible_attacks, possible_arguments):
+                    if changed and not condition(af):
+                        satisfied = False
+                        break
+            else:
+                satisfied = af.necessarily_satisfied_rec(condition, possible_attacks, len(possible_attacks),
+                                                         possible_arguments, len(possible_arguments))
+        finally:
+            self.completion_buffer = af
+        if AF.counters is not None:
+            AF.counters['necessarily_satisfied'] += 1
+            if not satisfied:
+                # a violating completion ends the enumeration
+                AF.counters['necessarily_satisfied.early_exits'] += 1
+        return satisfied
+
+    def necessarily_satisfied_rec(self, condition, possible_attacks, k_att, possible_arguments, k_arg, bound=None):
+        counters = AF.counters
+        if k_att == 0 and k_arg == 0:
+            if counters is not None:
+                counters['completions'] += 1
+            return condition(self)
+        if bound is not None:
+            decided = bound(self)
+            if counters is not None:
+                counters['bound.calls'] += 1
+                if decided is not None:
+                    counters['bound.cuts'] += 1
+            if decided is not None:
+                return decided
+
+        if k_arg > 0:
+            # decide possible arguments first, so that bounds for attack-incomplete IncAFs apply early
             k_arg -= 1
             possible_argument = possible_arguments[k_arg]
             self.set_argument(possible_argument, IncAF.DEFINITE_ARGUMENT)
-            if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+            if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg,
+                                                  bound):
                 return False
             self.set_argument(possible_argument, IncAF.NO_ARGUMENT)
-            if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+            if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg,
+                                                  bound):
                 return False
             self.set_argument(possible_argument, IncAF.POSSIBLE_ARGUMENT)
             return True
@@ -280,10 +819,130 @@ class IncAF(AF):
         k_att -= 1
         possible_attack = possible_attacks[k_att]
         self.set_attack(possible_attack[0], possible_attack[1], IncAF.DEFINITE_ATTACK)
-        if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+        if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg, bound):
             return False
         self.set_attack(possible_attack[0], possible_attack[1], IncAF.NO_ATTACK)
-        if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg):
+        if not self.necessarily_satisfied_rec(condition, possible_attacks, k_att, possible_arguments, k_arg, bound):
             return False
         self.set_attack(possible_attack[0], possible_attack[1], IncAF.POSSIBLE_ATTACK)
         return True
+
+
+class AcceptanceStatuses(object):
+    """
+    Possible and necessary acceptance statuses of all arguments of an IncAF (see IncAF.acceptance_statuses), as
+    bitmasks of arguments.
+    """
+
+    STATUSES = ('possibly_credulous', 'necessarily_credulous', 'possibly_skeptical', 'necessarily_skeptical',
+                'possibly_skeptical_and_exists', 'necessarily_skeptical_and_exists')
+    """names of all statuses"""
+
+    QUERIES = {'credulous': 'is_credulously_acceptable',
+               'skeptical': 'is_skeptically_acceptable',
+               'skeptical_and_exists': 'is_skeptically_acceptable_and_extension_exists'}
+    """maps the acceptance problem of a status to the AF method that solves it for a single argument"""
+
+    def __init__(self, incaf, required=STATUSES):
+        """
+        Start with the statuses of an IncAF without any completion: possible statuses are not satisfied for any
+        argument, necessary statuses are satisfied for all definite arguments.
+
+        :param incaf: IncAF whose completions are enumerated
+        :param required: names of the statuses that have to be decided
+        """
+        self.required = required
+        """(tuple) names of the statuses that have to be decided"""
+        self.queries = [(status, status.startswith('possibly'), AcceptanceStatuses.QUERIES[status.split('_', 1)[1]])
+                        for status in required]
+        """(list) for each required status: its name, whether it is a possible status, and the name of the AF method
+        that solves it for a single argument"""
+        self.candidates = 0
+        """(int) bitmask of all arguments that are not excluded, i.e. that can be possibly acceptable"""
+        for arg in range(incaf.n):
+            if incaf.A[arg] != IncAF.NO_ARGUMENT:
+                self.candidates |= 1 << arg
+        self.possibly_credulous = 0
+        self.necessarily_credulous = incaf.args_mask
+        self.possibly_skeptical = 0
+        self.necessarily_skeptical = incaf.args_mask
+        self.possibly_skeptical_and_exists = 0
+        self.necessarily_skeptical_and_exists = incaf.args_mask
+
+    def active_args(self, status):
+        """
+        Determine the arguments whose given status is not decided yet.
+
+        :param status: name of a status
+        :return: bitmask of arguments
+        """
+        if status.startswith('possibly'):
+            return self.candidates & ~getattr(self, status)
+        return getattr(self, status)
+
+    def update(self, af, semantics):
+        """
+        Account for a completion. Undecided statuses are evaluated argument by argument if this requires at most one
+        query per argument, and by a single AF.acceptance_table otherwise (and always for grounded semantics). Results
+        are shared via IncAF.completion_cache if it is enabled.
+
+        :param af: completion
+        :param semantics: one of the semantics defined in the AF class.
+        :return: True if the required statuses of all arguments are decided, False otherwise
+        """
+        if semantics == AF.SEMANTICS_GR or (len(self.required) > 1 and
+                                            sum([bin(self.active_args(status)).count('1')
+                                                 for status in self.required]) > af.n):
+            table = af.acceptance_table(semantics, IncAF.completion_cache)
+            skeptical_and_exists = table.skeptical if table.exists else 0
+            self.possibly_credulous |= table.credulous
+            self.necessarily_credulous &= table.credulous
+            self.possibly_skeptical |= table.skeptical
+            self.necessarily_skeptical &= table.skeptical
+            self.possibly_skeptical_and_exists |= skeptical_and_exists
+            self.necessarily_skeptical_and_exists &= skeptical_and_exists
+            return not any([self.active_args(status) for status in self.required])
+
+        decided = True
+        cache = IncAF.completion_cache
+        state = af.state_key() if cache is not None else None
+        for status, possibly, query_name in self.queries:
+            value = getattr(self, status)
+            args = self.candidates & ~value if possibly else value
+            if not args:
+                continue
+            query = getattr(af, query_name)
+            for arg in iter_mask(args):
+                if cache is None:
+                    result = query(arg, semantics)
+                else:
+                    key = (state, (query_name, semantics, arg))
+                    if key in cache:
+                        result = cache[key]
+                    else:
+                        result = query(arg, semantics)
+                        cache[key] = result
+                if result == possibly:
+                    value ^= 1 << arg
+            setattr(self, status, value)
+            if self.candidates & ~value if possibly else value:
+                decided = False
+        return decided
+
+    def is_possibly_credulously_acceptable(self, arg):
+        return (self.possibly_credulous >> arg) & 1 == 1
+
+    def is_necessarily_credulously_acceptable(self, arg):
+        return (self.necessarily_credulous >> arg) & 1 == 1
+
+    def is_possibly_skeptically_acceptable(self, arg):
+        return (self.possibly_skeptical >> arg) & 1 == 1
+
+    def is_necessarily_skeptically_acceptable(self, arg):
+        return (self.necessarily_skeptical >> arg) & 1 == 1
+
+    def is_possibly_skeptically_acceptable_and_extension_exists(self, arg):
+        return (self.possibly_skeptical_and_exists >> arg) & 1 == 1
+
+    def is_necessarily_skeptically_acceptable_and_extension_exists(self, arg):
+        return (self.necessarily_skeptical_and_exists >> arg) & 1 == 1
@@ -1,4 +1,6 @@
-from random import randrange
+import random
+import hashlib
+import itertools
 from incaffeine.incaf import IncAF
 
 
@@ -31,6 +33,8 @@ class InstanceGenerator:
 
     randomize = False  # Default: Exhaustive generation, do not randomize
     randomize_sample_size = 1000  # Default: If randomizing, generate 1000 samples
+    random_seed = None  # Default: If randomizing, pick a random seed on first use (see get_random_seed)
+    sample_unique = False  # Default: If randomizing, sample with replacement (samples may repeat)
 
     use_extension = False  # Default: Do not generate an extension
     use_argument = False  # Default: Do not generate a single argument
@@ -41,6 +45,7 @@ class InstanceGenerator:
     af = None
     extension = None
     arg = None
+    weight = 1  # number of instances of the full seed space represented by the current instance
 
     def __init__(self, n, randomize, use_extension, use_argument, use_uncertain_args, use_uncertain_attacks):
         self.n = n
@@ -64,6 +69,13 @@ class InstanceGenerator:
                             self.get_single_arg_state_space_size())
         self.current_count = 0
 
+        # Radices of the flattened seed space, least significant digit first (order of next()):
+        # distinguished arg, extension, attack states (n * attacker + target), argument states
+        self.radices = ([self.number_of_single_args, self.number_of_extensions] +
+                        [self.number_of_attack_states] * self.number_of_attacks +
+                        [self.number_of_argument_states] * self.number_of_arguments)
+        self.digits = [0] * len(self.radices)  # digits of the current instance
+
     def get_argument_state_space_size(self):
         """
         Returns the size of the possibility space for argument states (definite, possible) for this generator.
@@ -96,32 +108,381 @@ class InstanceGenerator:
         """
         return self.number_of_single_args
 
-    def next(self):
-        for args_state in range(0, self.get_argument_state_space_size()):
-            for attacks_state in range(0, self.get_attack_state_space_size()):
-                for extension_code in range(0, self.get_extension_state_space_size()):
-                    for arg_code in range(0, self.get_single_arg_state_space_size()):
-                        self.generate(args_state=args_state,
-                                      attacks_state=attacks_state,
-                                      extension=extension_code,
-                                      argument=arg_code)
-                        self.current_count += 1
-                        yield self
-                        # print('DEBUG: args_state=' + str(args_state) + ' attacks_state=' + str(attacks_state) +
-                        #       ' extension=' + str(extension_code) + ' argument=' + str(arg_code))
-
-    def next_randomized(self):
-        while self.current_count < self.randomize_sample_size:  # TODO
-            args_state = randrange(0, self.get_argument_state_space_size())
-            attacks_state = randrange(0, self.get_attack_state_space_size())
-            extension_code = randrange(0, self.get_extension_state_space_size())
-            arg_code = randrange(0, self.get_single_arg_state_space_size())
-            self.generate(args_state=args_state,
-                          attacks_state=attacks_state,
-                          extension=extension_code,
-                          argument=arg_code)
-            self.current_count += 1
+    def decode_index(self, index):
+        """
+        Decode a position of the flattened seed space into its mixed-radix digits (see radices).
+
+        :param index: position in [0 ... total_count - 1]
+        :type index: int
+        :return: list of digits, least significant digit first
+        """
+        digits = []
+        for radix in self.radices:
+            index, digit = divmod(index, radix)
+            digits.append(digit)
+        return digits
+
+    def get_index(self, digits=None):
+        """
+        Returns the position of the current instance in the flattened seed space (inverse of decode_index).
+
+        :param digits: optional digits of another instance (see radices) to be encoded instead of the current one
+        :return: position in [0 ... total_count - 1]
+        """
+        if digits is None:
+            digits = self.digits
+        index = 0
+        for position in range(len(self.radices) - 1, -1, -1):
+            index = index * self.radices[position] + digits[position]
+        return index
+
+    def get_seed(self):
+        """
+        Returns the seed of the current instance, as accepted by generate.
+
+        :return: dict with keys args_state, attacks_state, extension and argument
+        """
+        args_state = 0
+        for position in range(len(self.radices) - 1, 1 + self.number_of_attacks, -1):
+            args_state = args_state * self.number_of_argument_states + self.digits[position]
+        attacks_state = 0
+        for position in range(1 + self.number_of_attacks, 1, -1):
+            attacks_state = attacks_state * self.number_of_attack_states + self.digits[position]
+        return {'args_state': args_state,
+                'attacks_state': attacks_state,
+                'extension': self.digits[1],
+                'argument': self.digits[0]}
+
+    def get_instance_id(self):
+        """
+        Returns a compact identifier of the current instance, from which generate_instance rebuilds it.
+        Format: n:flags:args_state:attacks_state:extension:argument, where flags are the four digits (0 or 1) of
+        use_extension, use_argument, use_uncertain_args and use_uncertain_attacks.
+
+        :return: instance identifier
+        """
+        seed = self.get_seed()
+        flags = [self.use_extension, self.use_argument, self.use_uncertain_args, self.use_uncertain_attacks]
+        return ':'.join([str(self.n),
+                         ''.join(['1' if flag else '0' for flag in flags]),
+                         str(seed['args_state']),
+                         str(seed['attacks_state']),
+                         str(seed['extension']),
+                         str(seed['argument'])])
+
+    def apply_digit(self, position, digit):
+        """
+        Set the instance feature belonging to the given digit of the flattened seed space.
+
+        :param position: digit position (see radices)
+        :param digit: value of the digit
+        """
+        self.digits[position] = digit
+        if position == 0:
+            self.arg = digit
+        elif position == 1:
+            if self.use_extension:
+                # Does NOT generate all possible subsets of args, assumes that symmetry from AF generation can be
+                # exploited
+                self.extension = set([i for i in range(digit)])
+        elif position < 2 + self.number_of_attacks:
+            attacker, target = divmod(position - 2, self.n)
+            if digit == 0:
+                self.af.set_attack(attacker, target, IncAF.NO_ATTACK)
+            elif digit == 1:
+                self.af.set_attack(attacker, target, IncAF.DEFINITE_ATTACK)
+            elif digit == 2:
+                self.af.set_attack(attacker, target, IncAF.POSSIBLE_ATTACK)
+        else:
+            arg = position - 2 - self.number_of_attacks
+            if digit == 0:
+                self.af.set_argument(arg, IncAF.DEFINITE_ARGUMENT)
+            else:
+                self.af.set_argument(arg, IncAF.POSSIBLE_ARGUMENT)
+
+    def generate_index(self, index):
+        """
+        Generate the instance at the given position of the flattened seed space, in the order of next().
+
+        :param index: position in [0 ... total_count - 1]
+        :type index: int
+        """
+        for position, digit in enumerate(self.decode_index(index)):
+            self.apply_digit(position, digit)
+
+    def next_range(self, start, stop, step=1):
+        """
+        Generate the instances at positions start, start + step, ... (below stop) of the flattened seed space.
+
+        Only the start position is decoded by division. Further positions are reached by adding the digits of step
+        with carry, and only the instance features of changed digits are updated.
+
+        :param start: first position
+        :param stop: position after the last generated instance (capped at total_count)
+        :param step: distance between consecutive positions
+        :return: this generator, holding the current instance, for each position
+        """
+        stop = min(stop, self.total_count)
+        if start >= stop:
+            return
+        digits = self.decode_index(start)
+        for position, digit in enumerate(digits):
+            self.apply_digit(position, digit)
+        step_digits = self.decode_index(step)
+        top = max([position for position, digit in enumerate(step_digits) if digit > 0] + [0])
+        radices = self.radices
+        index = start
+        while True:
+            self.current_count = index + 1
             yield self
+            index += step
+            if index >= stop:
+                return
+            carry = 0
+            position = 0
+            while position <= top or carry:
+                digit = digits[position] + step_digits[position] + carry
+                carry = 0
+                if digit >= radices[position]:
+                    digit -= radices[position]
+                    carry = 1
+                if digit != digits[position]:
+                    digits[position] = digit
+                    self.apply_digit(position, digit)
+                position += 1
+
+    def next(self):
+        return self.next_range(0, self.total_count)
+
+    def next_randomized(self, start=0, stop=None):
+        """
+        Generate the random samples start, start + 1, ... (below stop) of this generator.
+
+        The position of each sample in the flattened seed space only depends on random_seed, n and the sample number
+        (see get_sample_index), so samples are reproducible and disjoint ranges of samples can be generated
+        independently, e.g. by different worker processes.
+
+        :param start: first sample number
+        :param stop: sample number after the last generated sample (default and upper bound: get_instance_count())
+        :return: this generator, holding the current instance, for each sample
+        """
+        stop = self.get_instance_count() if stop is None else min(stop, self.get_instance_count())
+        batch_size = 1000
+        for batch_start in range(start, stop, batch_size):
+            for sample, index in enumerate(self.get_sample_indices(batch_start, min(batch_start + batch_size, stop)),
+                                           batch_start):
+                self.generate_index(index)
+                self.current_count = sample + 1
+                yield self
+
+    def next_slice(self, start, stop):
+        """
+        Generate the instances start, start + 1, ... (below stop) in generation order: random samples if randomize is
+        set (see next_randomized), positions of the flattened seed space otherwise (see next_range).
+
+        :param start: first instance number
+        :param stop: instance number after the last generated instance
+        :return: this generator, holding the current instance, for each instance
+        """
+        if self.randomize:
+            return self.next_randomized(start, stop)
+        return self.next_range(start, stop)
+
+    def get_instance_count(self):
+        """
+        Returns the number of generated instances: randomize_sample_size if randomize is set (at most total_count
+        when sampling without replacement), total_count otherwise.
+
+        :return: number of instances
+        """
+        if not self.randomize:
+            return self.total_count
+        if self.sample_unique:
+            return min(self.randomize_sample_size, self.total_count)
+        return self.randomize_sample_size
+
+    def get_random_seed(self):
+        """
+        Returns random_seed, after picking a random one if it is not set.
+
+        :return: seed of the random samples
+        """
+        if self.random_seed is None:
+            self.random_seed = random.SystemRandom().randrange(2 ** 63)
+        return self.random_seed
+
+    def get_random_hasher(self):
+        """
+        Returns a hash object that has already consumed random_seed and n, the common prefix of all hashed keys (see
+        random_bits). Copying it is cheaper than hashing the prefix again for every random number.
+
+        :return: hashlib.blake2b object
+        """
+        prefix = str(self.get_random_seed()) + ':' + str(self.n)
+        return hashlib.blake2b(prefix.encode('ascii'), digest_size=64)
+
+    def random_bits(self, bits, *key, hasher=None):
+        """
+        Derive pseudo-random bits from random_seed, n and the given key by hashing (counter-based random numbers).
+
+        :param bits: number of bits
+        :param key: integers identifying the random number
+        :param hasher: result of get_random_hasher, to be reused for several random numbers (optional)
+        :return: integer in [0 ... 2^bits - 1]
+        """
+        if hasher is None:
+            hasher = self.get_random_hasher()
+        suffix = ''.join([':' + str(part) for part in key])
+        value = 0
+        block = 0
+        while block * 512 < bits:
+            block_hasher = hasher.copy()
+            block_hasher.update((suffix + ':' + str(block)).encode('ascii'))
+            value = (value << 512) | int.from_bytes(block_hasher.digest(), 'big')
+            block += 1
+        return value >> (block * 512 - bits)
+
+    def get_sample_index(self, sample, hasher=None):
+        """
+        Returns the position of the given sample in the flattened seed space. Samples are uniformly distributed; if
+        sample_unique is set, samples 0 ... total_count - 1 are a random permutation of all positions (sampling without
+        replacement), via a keyed Feistel network with cycle walking.
+
+        :param sample: sample number
+        :param hasher: result of get_random_hasher, to be reused for several samples (optional)
+        :return: position in [0 ... total_count - 1]
+        """
+        if hasher is None:
+            hasher = self.get_random_hasher()
+        if not self.sample_unique:
+            return self.random_bits(self.total_count.bit_length() + 64, sample, hasher=hasher) % self.total_count
+        half = (max(2, self.total_count.bit_length()) + 1) // 2
+        mask = (1 << half) - 1
+        index = sample
+        while True:
+            left, right = index >> half, index & mask
+            for feistel_round in range(4):
+                left, right = right, left ^ self.random_bits(half, feistel_round, right, hasher=hasher)
+            index = (left << half) | right
+            if index < self.total_count:
+                return index
+
+    def get_sample_indices(self, start, stop):
+        """
+        Batch variant of get_sample_index. Samples are still hashed one at a time, but random_seed and n are hashed
+        only once for the whole range (see get_random_hasher).
+
+        :param start: first sample number
+        :param stop: sample number after the last sample
+        :return: list of positions in the flattened seed space
+        """
+        hasher = self.get_random_hasher()
+        return [self.get_sample_index(sample, hasher) for sample in range(start, stop)]
+
+    def next_canonical(self):
+        """
+        Generate one canonical representative per isomorphism class of instances, i.e. per orbit under permutation
+        of the arguments (restricted to permutations mapping the extension onto itself). The representative is the
+        orbit element with the smallest position in the flattened seed space, weight is set to the orbit size.
+
+        Only suitable for permutation-invariant tests! Weighted counts then equal those of next().
+        Instances are generated in order of extensions first, then by position.
+
+        :return: this generator, holding the current instance and its weight, for each canonical instance
+        """
+        self.current_count = 0
+        digits = [0] * len(self.radices)
+        self.apply_digit(0, 0)
+        for extension_code in range(self.number_of_extensions):
+            digits[1] = extension_code
+            self.apply_digit(1, extension_code)
+            group = self.get_permutation_group(extension_code)
+            candidates = [(permutation, self.get_source_positions(permutation), len(self.radices) - 1)
+                          for permutation in group]
+            for instance in self.next_canonical_rec(digits, len(self.radices) - 1, candidates, len(group)):
+                yield instance
+
+    def next_canonical_rec(self, digits, position, candidates, group_size):
+        """
+        Assign the digits from the given position downwards (attack and argument states), skipping every partial
+        assignment for which some permutation already yields a smaller instance.
+
+        Intended for internal use in next_canonical!
+
+        :param digits: current digits, assigned above position
+        :param position: next digit position to assign
+        :param candidates: list of (permutation, source positions, resume position) of all permutations whose
+                           permuted instance equals the current instance on all digits above resume position
+        :param group_size: size of the permutation group
+        :return: this generator for each canonical instance
+        """
+        if position < 2:
+            # all permutations left over map the AF onto itself
+            stabilizer = [permutation for permutation, _, _ in candidates]
+            if not self.use_argument:
+                self.weight = group_size // len(stabilizer)
+                self.current_count += self.weight
+                yield self
+                return
+            for arg in range(self.n):
+                orbit = set([permutation[arg] for permutation in stabilizer])
+                if min(orbit) == arg:
+                    self.apply_digit(0, arg)
+                    self.weight = (group_size // len(stabilizer)) * len(orbit)
+                    self.current_count += self.weight
+                    yield self
+            return
+
+        for digit in range(self.radices[position]):
+            digits[position] = digit
+            self.apply_digit(position, digit)
+            remaining = []
+            for permutation, sources, resume in candidates:
+                comparison = 0
+                while resume >= position:
+                    source = sources[resume]
+                    if source < position:
+                        break  # compared digit is not assigned yet
+                    if digits[source] != digits[resume]:
+                        comparison = -1 if digits[source] < digits[resume] else 1
+                        break
+                    resume -= 1
+                if comparison < 0:
+                    break  # permuted instance is smaller
+                if comparison == 0:
+                    remaining.append((permutation, sources, resume))
+            else:
+                for instance in self.next_canonical_rec(digits, position - 1, remaining, group_size):
+                    yield instance
+
+    def get_permutation_group(self, extension_code):
+        """
+        Returns all permutations of the arguments that map the extension of the given code onto itself.
+
+        :param extension_code: code of the extension
+        :return: list of permutations (tuples mapping each argument to its image)
+        """
+        if not self.use_extension:
+            return list(itertools.permutations(range(self.n)))
+        return [inside + outside
+                for inside in itertools.permutations(range(extension_code))
+                for outside in itertools.permutations(range(extension_code, self.n))]
+
+    def get_source_positions(self, permutation):
+        """
+        Returns for each digit position of attack and argument states the position it is taken from when the instance
+        is permuted, i.e. digit p of the permuted instance equals digit sources[p] of the original one.
+
+        :param permutation: permutation (tuple mapping each argument to its image)
+        :return: list of source positions
+        """
+        sources = list(range(len(self.radices)))
+        for attacker in range(self.n):
+            for target in range(self.n):
+                sources[2 + self.n * permutation[attacker] + permutation[target]] = 2 + self.n * attacker + target
+        for arg in range(self.n):
+            sources[2 + self.number_of_attacks + permutation[arg]] = 2 + self.number_of_attacks + arg
+        return sources
 
     def generate(self, **seed):
         """
@@ -138,31 +499,29 @@ class InstanceGenerator:
         extension_code = seed['extension']
         argument_code = seed['argument']
 
-        # arg state
-        base = self.number_of_argument_states  # number of possible values for argument statuses
-        for arg in range(self.n):
-            self.af.set_argument(arg, IncAF.DEFINITE_ARGUMENT)
-            if self.use_uncertain_args:
-                state = (args_state_code // (base ** arg)) % base
-                if state == 1:
-                    self.af.set_argument(arg, IncAF.POSSIBLE_ARGUMENT)
-
-        # attack state
-        base = self.number_of_attack_states  # number of possible values for attack statuses
-        for attacker in range(self.n):
-            for target in range(self.n):
-                state = (attacks_state_code // (base ** ((self.n * attacker) + target))) % base
-                if state == 0:
-                    self.af.set_attack(attacker, target, IncAF.NO_ATTACK)
-                elif state == 1:
-                    self.af.set_attack(attacker, target, IncAF.DEFINITE_ATTACK)
-                elif state == 2:
-                    self.af.set_attack(attacker, target, IncAF.POSSIBLE_ATTACK)
-
-        # extension
-        if self.use_extension:
-            # Does NOT generate all possible subsets of args, assumes that symmetry from AF generation can be exploited
-            self.extension = set([i for i in range(extension_code)])
-
-        # argument
-        self.arg = argument_code
+        self.apply_digit(0, argument_code)
+        self.apply_digit(1, extension_code)
+        for position in range(2, 2 + self.number_of_attacks):
+            attacks_state_code, digit = divmod(attacks_state_code, self.number_of_attack_states)
+            self.apply_digit(position, digit)
+        for position in range(2 + self.number_of_attacks, len(self.radices)):
+            args_state_code, digit = divmod(args_state_code, self.number_of_argument_states)
+            self.apply_digit(position, digit)
+
+
+def generate_instance(instance_id):
+    """
+    Rebuild an instance from its identifier (see InstanceGenerator.get_instance_id).
+
+    :param instance_id: instance identifier
+    :return: InstanceGenerator holding the identified instance
+    """
+    n, flags, args_state, attacks_state, extension, argument = instance_id.split(':')
+    if len(flags) != 4 or not set(flags) <= set('01'):
+        raise ValueError('invalid instance id: ' + instance_id)
+    generator = InstanceGenerator(int(n), False, *[flag == '1' for flag in flags])
+    generator.generate(args_state=int(args_state),
+                       attacks_state=int(attacks_state),
+                       extension=int(extension),
+                       argument=int(argument))
+    return generator
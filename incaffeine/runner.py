@@ -1,8 +1,63 @@
+import os
 import sys
+import json
+import collections
+import time
 import getopt
+import itertools
 import datetime
 import threading
-from incaffeine.instance_generator import InstanceGenerator
+import multiprocessing
+from incaffeine.af import AF
+from incaffeine.instance_generator import InstanceGenerator, generate_instance
+from incaffeine.sink import ResultSink, JsonLinesSink
+from incaffeine.store import ReferenceStore
+
+worker_runner = None
+"""TestRunner whose configuration is inherited by forked worker processes (see TestRunner.run_parallel)"""
+
+
+def run_chunk(task):
+    """
+    Evaluate a contiguous range of instances in a worker process.
+
+    Intended for internal use in TestRunner.run_parallel!
+
+    :param task: tuple (n, start, stop) of the AF size and the range [start, stop) of instance numbers (see
+                 InstanceGenerator.next_slice)
+    :return: tuple of the number of evaluated instances, the number of successful instances, the list of indices of
+             failed instances, the result log (list of result dumps, or list of result records if a sink is used),
+             the additional statistics of the runner (see TestRunner.get_chunk_statistics) and the operation counts
+             (dict, None if operations are not counted)
+    """
+    n, start, stop = task
+    runner = worker_runner
+    runner.current_count = 0
+    runner.success_count = 0
+    runner.reset_chunk_statistics()
+    if runner.operation_counters is not None:
+        runner.operation_counters = collections.Counter()
+        AF.counters = runner.operation_counters
+    runner.result_buffer = []
+    if runner.result_sink is not None:
+        runner.result_sink = ResultSink()
+    runner.failures = []
+    runner.checkpoint_file = None
+    runner.reported_count = 0
+    runner.reported_success_count = 0
+    runner.next_report_time = time.time() + runner.log_status_interval
+    generator = runner.create_generator(n)
+    runner.run_instances(generator, generator.next_slice(start, stop), start)
+    runner.report_progress()
+    failures = [position for _, position in runner.failures]
+    if runner.reference_store is not None:
+        runner.reference_store.flush()
+    if runner.result_sink is not None:
+        runner.result_sink.flush()
+        runner.result_buffer = runner.result_sink.records
+    operation_counts = dict(runner.operation_counters) if runner.operation_counters is not None else None
+    return (runner.current_count, runner.success_count, failures, runner.result_buffer, runner.get_chunk_statistics(),
+            operation_counts)
 
 
 class TestRunner(object):
@@ -15,24 +70,47 @@ class TestRunner(object):
     - logging of status messages: to stream (stdout or other) and/or to log file
     - logging of result dumps: to stream (stdout or other) and/or to log file
     - when to log result dumps: on failed instances and/or on successful instances
+    - number of worker processes for exhaustive generation (without isomorphism reduction)
+    - isomorphism reduction: test one weighted representative per isomorphism class (permutation-invariant tests only)
+    - checkpoint file: periodically save progress, and optionally resume from it
+    - result sink: write structured result records instead of result dumps
+    - replay: only re-run tester functions on the instances with given identifiers
+    - batch tester functions (optional): evaluate batch_size instances per call instead of single instances
+    - reference store (optional): reuse reference results of previous runs from a database file
+    - operation counters (optional): count AF and IncAF operations during the run (see AF.counters)
     """
 
     # Tester functions
     test_instance = None
     reference_test_instance = None
+    batch_test_instance = None  # Default: evaluate single instances with test_instance
+    batch_reference_test_instance = None  # Default: evaluate single instances with reference_test_instance
 
     # config behaviour
     exit_on_failure = False  # Default: don't abort on first failure
     abort_now = False  # set for graceful abortion
+    processes = 1  # Default: evaluate all instances in this process (always the case with isomorphism reduction)
+    chunk_size = 1000  # Default: worker processes evaluate 1000 consecutive instances per task
+    batch_size = 1000  # Default: if batch tester functions are set, evaluate 1000 instances per call
+    checkpoint_file = None  # Default: do not save checkpoints
+    checkpoint_interval = 60  # Default: if checkpoint file is specified, save checkpoint every 60 seconds
+    resume = False  # Default: start from scratch, do not resume from checkpoint file
+    replay_ids = None  # Default: run generated instances instead of replaying instances with given identifiers
+    reference_store = None  # Default: compute all reference results instead of reusing stored ones (see ReferenceStore)
 
     # instance generation configuration
     n_min = 1  # Default: start on instances with n=1
     n_max = 3  # Default: go until instances with n=3
     randomized = False  # Default: exhaustive, don't randomize over instance space
+    random_sample_size = 1000  # Default: if randomized, test 1000 samples per AF size
+    random_seed = None  # Default: if randomized, pick a random seed (posted as status message to reproduce the run)
+    random_unique = False  # Default: if randomized, sample with replacement
     use_extension = False  # Default: no extension
     use_argument = False  # Default: no single argument
     use_uncertain_args = False  # Default: no argument uncertainty
     use_uncertain_attacks = False  # Default: no attack uncertainty
+    use_isomorphism_reduction = False  # Default: test all instances, not only canonical representatives
+    count_operations = False  # Default: do not count AF and IncAF operations (see AF.counters)
 
     # logging configuration
     name = "unnamed"
@@ -45,12 +123,29 @@ class TestRunner(object):
     log_results_to_file = True  # Default: if log file is specified, post result dumps to log file
     log_results_on_success = False  # Default: do not log successful instances
     log_results_on_failure = True  # Default: log failed instances
+    log_results_compact = False  # Default: dump AF, extension and argument along with the instance identifier
+    result_label = 'primary result'  # label of the tester function result in result dumps
     log_status_interval = 3  # Default: print status log message every 3 seconds
+    result_buffer = None  # Default: write result dumps directly instead of collecting them (see run_chunk)
+    result_sink = None  # Default: write result dumps instead of structured records (see ResultSink)
 
     # progress counters
     current_count = 0
     total_count = 0
     success_count = 0
+    failures = None  # [n, position] of failed instances, collected if checkpoint file is specified
+    saved_failure_count = 0  # number of failures already appended to the failures file (see save_checkpoint)
+    operation_counters = None  # collections.Counter of AF and IncAF operations, collected if count_operations is set
+    pending_counts = None  # shared [count, success count] of instances evaluated by workers, not merged yet
+    reported_count = None  # count already added to pending_counts by this worker process, None in parent process
+    reported_success_count = 0  # success count already added to pending_counts by this worker process
+    next_report_time = 0
+
+    # checkpoint state
+    current_n = None  # AF size currently tested
+    current_position = 0  # number of instances already tested for current AF size
+    completed_total_count = 0  # total_count of all completed AF sizes
+    next_checkpoint_time = 0
 
     def __init__(self, name, test_instance, reference_test_instance):
         self.name = str(name)
@@ -65,14 +160,28 @@ class TestRunner(object):
         :return:
         """
         try:
-            opts, args = getopt.getopt(argv, "", ["nMax=", "nMin=", "rand=", "log="])
+            opts, args = getopt.getopt(argv, "", ["nMax=", "nMin=", "rand=", "log=", "processes=", "iso",
+                                                  "checkpoint=", "resume", "sink=", "seed=", "unique", "counters",
+                                                  "replay=", "refstore="])
         except getopt.GetoptError:
             print('available options:')
             print('\t--nMin=int\t\tset smallest AF size to be generated')
             print('\t--nMax=int\t\tset largest AF size to be generated')
             print('\t--rand=int\t\tuse random generation with given sample size instead of exhaustive generation')
+            print('\t--seed=int\t\tseed of random generation, to reproduce a randomized run')
+            print('\t--unique\t\tsample without replacement in random generation')
+            print('\t--counters\t\tcount AF and IncAF operations and post them at the end of the run')
             print('\t--log=<filename>\twrite log to file with specified name infix')
+            print('\t--processes=int\t\tevaluate exhaustively generated instances in given number of processes '
+                  '(ignored with --iso, which always runs in this process)')
+            print('\t--iso\t\t\tonly test one representative per isomorphism class, weighted by class size')
+            print('\t--checkpoint=<filename>\tperiodically save progress to checkpoint file with specified name')
+            print('\t--resume\t\tresume from checkpoint file, if it exists (requires --checkpoint)')
+            print('\t--sink=<filename>\twrite result records to JSON Lines file with specified name')
+            print('\t--replay=<id>\t\tonly re-run the instance with given identifier (repeatable)')
+            print('\t--refstore=<filename>\treuse and store reference results in database file with specified name')
             sys.exit(0)
+        sink_name = None
         for opt, arg in opts:
             if opt == '--nMax':
                 self.n_max = int(arg)
@@ -80,12 +189,40 @@ class TestRunner(object):
                 self.n_min = int(arg)
             elif opt == '--rand':
                 self.randomized = True
+                if arg:
+                    self.random_sample_size = int(arg)
+            elif opt == '--seed':
+                self.random_seed = int(arg)
+            elif opt == '--unique':
+                self.random_unique = True
+            elif opt == '--counters':
+                self.count_operations = True
             elif opt == '--log':
                 now = datetime.datetime.now()
                 timestamp = now.strftime("-%Y-%m-%d-%H-%M-%S")
                 prefix = arg if arg else self.name
                 log_name = prefix + timestamp + '.log'
                 self.log_file = open(log_name, 'w')
+            elif opt == '--processes':
+                self.processes = int(arg)
+            elif opt == '--iso':
+                self.use_isomorphism_reduction = True
+            elif opt == '--checkpoint':
+                self.checkpoint_file = arg
+            elif opt == '--resume':
+                self.resume = True
+            elif opt == '--sink':
+                sink_name = arg
+            elif opt == '--replay':
+                if self.replay_ids is None:
+                    self.replay_ids = []
+                self.replay_ids.append(arg)
+            elif opt == '--refstore':
+                self.reference_store = ReferenceStore(arg)
+        if self.resume and not self.checkpoint_file:
+            raise ValueError('--resume requires --checkpoint')
+        if sink_name:
+            self.result_sink = JsonLinesSink(sink_name, append=self.resume)
 
     def write_log_status(self, msg):
         status_msg = '[' + self.name + '] ' + str(msg) + '\n'
@@ -95,6 +232,9 @@ class TestRunner(object):
             self.log_file.write(status_msg)
 
     def write_log_results(self, msg):
+        if self.result_buffer is not None:
+            self.result_buffer.append(msg)
+            return
         if self.log_results_to_stream:
             self.log_stream.write(msg)
         if self.log_results_to_file and self.log_file:
@@ -106,84 +246,684 @@ class TestRunner(object):
             self.log_status_progress()
 
     def log_status_progress(self):
+        current_count = self.current_count
+        success_count = self.success_count
+        pending_counts = self.pending_counts
+        if pending_counts is not None:
+            # include instances of chunks still evaluated by worker processes (see run_parallel)
+            with pending_counts.get_lock():
+                current_count = self.current_count + pending_counts[0]
+                success_count = self.success_count + pending_counts[1]
         progress = 0
         equivalence = 100
         if self.total_count > 0:
-            progress = ((self.current_count * 10000.0) // self.total_count) / 100
-            equivalence = ((self.success_count * 10000.0) // self.current_count) / 100.0
+            progress = ((current_count * 10000.0) // self.total_count) / 100
+        if current_count > 0:
+            equivalence = ((success_count * 10000.0) // current_count) / 100.0
         progress = "{:6.2f}".format(progress)
         equivalence = "{:6.2f}".format(equivalence)
         s = "[progress: " + str(progress) + "%] equivalent: " + str(equivalence) + \
-            "% (#fails: " + str(self.current_count - self.success_count) + "/" + str(self.current_count) + ")"
+            "% (#fails: " + str(current_count - success_count) + "/" + str(current_count) + ")"
         self.write_log_status(s)
 
+    def report_progress(self):
+        """
+        Add the instances evaluated by this worker process since its last report to pending_counts, so status messages
+        of the parent process show progress within chunks (see run_parallel).
+
+        :return:
+        """
+        with self.pending_counts.get_lock():
+            self.pending_counts[0] += self.current_count - self.reported_count
+            self.pending_counts[1] += self.success_count - self.reported_success_count
+        self.reported_count = self.current_count
+        self.reported_success_count = self.success_count
+        self.next_report_time = time.time() + self.log_status_interval
+
+    def get_checkpoint_config(self):
+        """
+        Returns the generation configuration that determines the sequence of instances, which a resumed run has to
+        share with the run that saved the checkpoint (see load_checkpoint). The random seed is checked separately.
+
+        :return: dict mapping attribute names to values
+        """
+        config = {'n_min': self.n_min,
+                  'n_max': self.n_max,
+                  'use_extension': self.use_extension,
+                  'use_argument': self.use_argument,
+                  'use_uncertain_args': self.use_uncertain_args,
+                  'use_uncertain_attacks': self.use_uncertain_attacks,
+                  'use_isomorphism_reduction': self.use_isomorphism_reduction,
+                  'randomized': self.randomized}
+        if self.randomized:
+            config['random_sample_size'] = self.random_sample_size
+            config['random_unique'] = self.random_unique
+        return config
+
+    def get_failures_file(self):
+        """
+        :return: name of the JSON Lines file next to the checkpoint file that failures are appended to
+        """
+        return self.checkpoint_file + '.failures'
+
+    def save_checkpoint(self):
+        """
+        Atomically write the current progress (AF size, position, counters, additional statistics of subclasses and
+        the ends of the written result records and failures) and the generation configuration to the checkpoint file.
+
+        Failures are appended to a separate file (see get_failures_file), so each checkpoint only writes the failures
+        found since the previous one.
+
+        :return:
+        """
+        if self.result_sink is not None:
+            self.result_sink.flush()
+        failures = self.failures if self.failures is not None else []
+        with open(self.get_failures_file(), 'a') as failures_file:
+            failures_file.write(''.join([json.dumps(failure) + '\n'
+                                         for failure in failures[self.saved_failure_count:]]))
+            failures_file.flush()
+            os.fsync(failures_file.fileno())
+            failures_offset = failures_file.tell()
+        self.saved_failure_count = len(failures)
+        state = {'config': self.get_checkpoint_config(),
+                 'n': self.current_n,
+                 'position': self.current_position,
+                 'total_count': self.completed_total_count,
+                 'current_count': self.current_count,
+                 'success_count': self.success_count,
+                 'failures_offset': failures_offset,
+                 'random_seed': self.random_seed,
+                 'operation_counts': dict(self.operation_counters) if self.operation_counters is not None else None,
+                 'statistics': self.get_chunk_statistics(),
+                 'sink_offset': self.result_sink.get_offset() if self.result_sink is not None else None}
+        temp_name = self.checkpoint_file + '.tmp'
+        with open(temp_name, 'w') as temp_file:
+            json.dump(state, temp_file)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_name, self.checkpoint_file)
+        self.next_checkpoint_time = time.time() + self.checkpoint_interval
+
+    def load_checkpoint(self):
+        """
+        Restore progress from the checkpoint file, and discard result records and failures written after it was
+        saved.
+
+        :return: True if a checkpoint was restored, False if the checkpoint file does not exist
+        :raises ValueError: if the checkpoint was saved with a different generation configuration or random seed, or
+            its failures file is missing
+        """
+        if not os.path.exists(self.checkpoint_file):
+            return False
+        with open(self.checkpoint_file) as checkpoint:
+            state = json.load(checkpoint)
+        config = self.get_checkpoint_config()
+        saved_config = state.get('config')
+        if saved_config != config:
+            if saved_config is None:
+                raise ValueError('checkpoint ' + self.checkpoint_file + ' does not contain its configuration')
+            differences = [key + '=' + str(saved_config.get(key)) + ' (now ' + str(config.get(key)) + ')'
+                           for key in sorted(set(saved_config) | set(config))
+                           if saved_config.get(key) != config.get(key)]
+            raise ValueError('checkpoint ' + self.checkpoint_file + ' was saved with a different configuration: ' +
+                             ', '.join(differences))
+        if state.get('random_seed') is not None and self.random_seed is not None \
+                and state['random_seed'] != self.random_seed:
+            raise ValueError('checkpoint ' + self.checkpoint_file + ' was saved with random seed ' +
+                             str(state['random_seed']) + ' (now ' + str(self.random_seed) + ')')
+        self.current_n = state['n']
+        self.current_position = state['position']
+        self.completed_total_count = state['total_count']
+        self.total_count = state['total_count']
+        self.current_count = state['current_count']
+        self.success_count = state['success_count']
+        if not os.path.exists(self.get_failures_file()):
+            raise ValueError('failures file ' + self.get_failures_file() + ' of checkpoint is missing')
+        with open(self.get_failures_file(), 'rb+') as failures_file:
+            failures = failures_file.read(state['failures_offset']).decode()
+            failures_file.truncate(state['failures_offset'])
+        self.failures = [json.loads(line) for line in failures.splitlines()]
+        self.saved_failure_count = len(self.failures)
+        if state.get('random_seed') is not None:
+            self.random_seed = state['random_seed']
+        if state.get('operation_counts') is not None and self.operation_counters is not None:
+            self.operation_counters.clear()
+            self.operation_counters.update(state['operation_counts'])
+        if state.get('statistics') is not None:
+            self.reset_chunk_statistics()
+            self.merge_chunk_statistics(state['statistics'])
+        if self.result_sink is not None and state.get('sink_offset') is not None:
+            self.result_sink.truncate(state['sink_offset'])
+        return True
+
+    def update_position(self, position):
+        """
+        Set the number of instances already tested for the current AF size, and save a checkpoint if due.
+
+        :param position: number of tested instances
+        :return:
+        """
+        self.current_position = position
+        if self.checkpoint_file and time.time() >= self.next_checkpoint_time:
+            self.save_checkpoint()
+        if self.reported_count is not None and time.time() >= self.next_report_time:
+            self.report_progress()
+
+    def replay(self, instance_id):
+        """
+        Rebuild the instance with the given identifier (see InstanceGenerator.get_instance_id), re-run the tester
+        functions on it and post the instance and both results as status messages.
+
+        :param instance_id: instance identifier
+        :return: True if the results are equivalent, False otherwise
+        """
+        generator = generate_instance(instance_id)
+        result = self.test_instance(self, generator.af, generator.extension, generator.arg)
+        reference_result = self.reference_test_instance(self, generator.af, generator.extension, generator.arg)
+        equivalent = (result == reference_result)
+        self.log_replayed_instance(instance_id, generator)
+        self.write_log_status('\t' + self.result_label + ': ' + str(result))
+        self.write_log_status('\treference result: ' + str(reference_result))
+        self.write_log_status('\t' + ('equivalent' if equivalent else 'NOT equivalent'))
+        return equivalent
+
+    def log_replayed_instance(self, instance_id, generator):
+        """
+        Post a replayed instance as status messages (see replay).
+
+        :param instance_id: instance identifier
+        :param generator: InstanceGenerator holding the instance
+        :return:
+        """
+        self.write_log_status('Replaying instance ' + instance_id)
+        self.write_log_status('\tArguments: ' + str(generator.af.A))
+        self.write_log_status('\tAttacks: ' + str(generator.af.R))
+        if generator.use_extension:
+            self.write_log_status('\textension: ' + str(generator.extension))
+        if generator.use_argument:
+            self.write_log_status('\targ: ' + str(generator.arg))
+
     def run(self):
+        if self.replay_ids:
+            for instance_id in self.replay_ids:
+                self.replay(instance_id)
+            self.abort_now = True
+            return
+
         self.abort_now = False
         self.write_log_status('Script start... ----------------------------------------------')
         self.write_log_status('Testing ' + self.name + '...')
 
+        self.current_n = self.n_min
+        self.current_position = 0
+        self.completed_total_count = self.total_count
+        previous_counters = AF.counters
+        if self.count_operations:
+            self.operation_counters = collections.Counter()
+            AF.counters = self.operation_counters
+        if self.checkpoint_file:
+            self.failures = []
+            self.saved_failure_count = 0
+            self.next_checkpoint_time = time.time() + self.checkpoint_interval
+            if self.resume and self.load_checkpoint():
+                self.write_log_status('Resuming n=' + str(self.current_n) + ' at instance ' +
+                                      str(self.current_position) + ' from checkpoint ' + self.checkpoint_file)
+            else:
+                open(self.get_failures_file(), 'w').close()
+                if self.resume and self.result_sink is not None:
+                    self.result_sink.truncate(0)  # records of a run that ended before its first checkpoint
+        elif self.resume:
+            raise ValueError('resuming requires a checkpoint file')
+
         # Start periodic status messages
         self.start_log_status_loop()
 
-        n = self.n_min
+        n = self.current_n
         while not self.abort_now and (n <= self.n_max):
             self.write_log_status('-------------------')
             self.write_log_status('Start testing n=' + str(n))
-            generator = InstanceGenerator(n, self.randomized, self.use_extension, self.use_argument,
-                                          self.use_uncertain_args, self.use_uncertain_attacks)
-            self.total_count += generator.total_count
-            self.write_log_status('number of instances: ' + str(generator.total_count))
-            self.run_single(generator)
+            generator = self.create_generator(n)
+            if generator.randomize and self.random_seed is None:
+                self.random_seed = generator.get_random_seed()
+            self.total_count += generator.get_instance_count()
+            self.write_log_status('number of instances: ' + str(generator.get_instance_count()))
+            if generator.randomize:
+                self.write_log_status('random seed: ' + str(self.random_seed))
+            self.run_single(generator, self.current_position)
             self.log_status_progress()  # After finishing current n, post additional status message
+            if not self.abort_now:
+                self.current_n = n + 1
+                self.current_position = 0
+                self.completed_total_count = self.total_count
             n += 1
 
+        if self.checkpoint_file:
+            self.save_checkpoint()
+        if self.result_sink is not None:
+            self.result_sink.flush()
+        if self.reference_store is not None:
+            self.reference_store.flush()
+        self.log_summary()
+        if self.count_operations:
+            AF.counters = previous_counters
+            self.log_operation_counters()
+
         # Indicate end of run
         self.write_log_status('...finished --------------------------------------------------')
         self.abort_now = True
 
-    def run_single(self, generator):
+    def run_single(self, generator, start=0):
         """
         Run tests using the given instance generator.
 
         :param generator: InstanceGenerator to be used
+        :param start: number of instances to skip, e.g. when resuming from a checkpoint
         :return:
         """
         if self.abort_now:
             return
 
-        for instance in generator.next():
+        if self.use_isomorphism_reduction and not generator.randomize:
+            if self.processes > 1:
+                # canonical instances are only known by enumerating all previous ones, so they cannot be chunked
+                self.write_log_status('warning: isomorphism reduction runs in a single process, ignoring processes=' +
+                                      str(self.processes))
+            instances = itertools.islice(generator.next_canonical(), start, None)
+        elif self.processes > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            self.run_parallel(generator, start)
+            return
+        else:
+            instances = generator.next_slice(start, generator.get_instance_count())
+
+        if self.run_instances(generator, instances, start):
+            self.abort_now = True
+
+    def run_instances(self, generator, instances, start):
+        """
+        Run tests on the given instances, one at a time, or batch_size instances at a time if a batch tester function
+        is set.
+
+        :param generator: InstanceGenerator that generates the instances
+        :param instances: iterable of generated instances
+        :param start: position of the first instance
+        :return: True if the run has to be aborted due to a failure, False otherwise
+        """
+        batched = self.batch_test_instance is not None or self.batch_reference_test_instance is not None
+        copy_afs = batched and self.requires_batch_afs()
+        batch = []
+        for position, instance in enumerate(instances, start):
             if not instance:
-                return
-            result = self.test_instance(self, instance.af, instance.extension, instance.arg)
-            reference_result = self.reference_test_instance(self, instance.af, instance.extension, instance.arg)
+                return False
+            if batched:
+                af = instance.af
+                extension = None if instance.extension is None else set(instance.extension)
+                batch.append((position, af.copy() if copy_afs else None, extension, instance.arg, instance.weight,
+                              instance.current_count, list(instance.digits), af.args_mask, list(af.attack_masks)))
+                if len(batch) < self.batch_size:
+                    continue
+                failed = self.evaluate_batch(generator, batch)
+                batch = []
+            else:
+                failed = [] if self.evaluate_instance(generator, instance) else [position]
+            if self.record_failures(generator, failed, position + 1):
+                return True
+        if batch:
+            return self.record_failures(generator, self.evaluate_batch(generator, batch), batch[-1][0] + 1)
+        return False
+
+    def record_failures(self, generator, failed, position):
+        """
+        Collect failed instances (if failures are collected) and update the position of the current run.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param failed: list of positions of failed instances
+        :param position: number of instances already tested
+        :return: True if the run has to be aborted due to a failure, False otherwise
+        """
+        if self.failures is not None:
+            self.failures.extend([generator.n, failed_position] for failed_position in failed)
+        self.update_position(position)
+        return len(failed) > 0 and self.exit_on_failure
+
+    def run_parallel(self, generator, start=0):
+        """
+        Run tests on all instances of the given generator in a pool of worker processes.
+
+        The seed space (or the sequence of random samples) is split into chunks of chunk_size consecutive instances,
+        and worker processes generate the instances of their chunks independently. Results are merged in order, so
+        counters and result dumps match a serial run. With exit_on_failure, outstanding chunks are cancelled after
+        the first chunk containing a failure. Worker processes report their progress every log_status_interval seconds
+        (see report_progress), so status messages do not stall until a chunk is merged.
+
+        :param generator: InstanceGenerator to be used
+        :param start: number of instances to skip, e.g. when resuming from a checkpoint
+        :return:
+        """
+        global worker_runner
+        worker_runner = self
+        instance_count = generator.get_instance_count()
+        tasks = [(generator.n, chunk_start, min(chunk_start + self.chunk_size, instance_count))
+                 for chunk_start in range(start, instance_count, self.chunk_size)]
+        generator.current_count = start
+        if self.reference_store is not None:
+            self.reference_store.flush()
+        context = multiprocessing.get_context('fork')
+        self.pending_counts = context.Array('q', 2)
+        pool = context.Pool(self.processes)
+        try:
+            for count, success_count, failures, results, statistics, operation_counts in pool.imap(run_chunk, tasks):
+                with self.pending_counts.get_lock():
+                    self.pending_counts[0] -= count
+                    self.pending_counts[1] -= success_count
+                    self.current_count += count
+                    self.success_count += success_count
+                self.merge_chunk_statistics(statistics)
+                if operation_counts is not None:
+                    self.operation_counters.update(operation_counts)
+                generator.current_count += count
+                if self.failures is not None:
+                    self.failures.extend([generator.n, position] for position in failures)
+                if self.result_sink is not None:
+                    for record in results:
+                        self.result_sink.write(record)
+                elif results:
+                    self.write_log_results(''.join(results))
+                self.update_position(generator.current_count)
+                if self.exit_on_failure and failures:
+                    self.abort_now = True
+                    break
+        finally:
+            pool.terminate()
+            pool.join()
+            worker_runner = None
+            self.pending_counts = None
+
+    def log_summary(self):
+        """
+        Post additional statistics of subclasses as status messages at the end of a run.
+
+        :return:
+        """
+        pass
+
+    def log_operation_counters(self):
+        """
+        Post the operation counts of the run (see AF.counters) as status messages, one per operation.
+
+        :return:
+        """
+        self.write_log_status('operation counts:')
+        for key in sorted(self.operation_counters):
+            self.write_log_status('\t' + key + ': ' + str(self.operation_counters[key]))
+
+    def create_generator(self, n):
+        """
+        Create an instance generator for the given AF size with the generation configuration of this runner.
+
+        :param n: AF size
+        :return: InstanceGenerator
+        """
+        generator = InstanceGenerator(n, self.randomized, self.use_extension, self.use_argument,
+                                      self.use_uncertain_args, self.use_uncertain_attacks)
+        generator.randomize_sample_size = self.random_sample_size
+        generator.random_seed = self.random_seed
+        generator.sample_unique = self.random_unique
+        return generator
+
+    def reset_chunk_statistics(self):
+        """
+        Reset additional statistics of subclasses before a worker process evaluates a chunk (see run_chunk).
+
+        :return:
+        """
+        pass
+
+    def get_chunk_statistics(self):
+        """
+        Returns additional statistics of subclasses, collected by a worker process for a chunk (see run_chunk) or
+        saved in a checkpoint (see save_checkpoint).
+
+        :return: statistics that can be pickled and converted to JSON, or None
+        """
+        return None
+
+    def merge_chunk_statistics(self, statistics):
+        """
+        Add the additional statistics of a chunk evaluated in a worker process (see run_parallel) or restored from a
+        checkpoint (see load_checkpoint).
+
+        :param statistics: statistics returned by get_chunk_statistics, after conversion to JSON and back for
+          checkpoints
+        :return:
+        """
+        pass
+
+    def evaluate_instance(self, generator, instance):
+        """
+        Compare test and reference result for a single generated instance, and update counters and logs.
+        Counters are increased by the weight of the instance, i.e. the number of instances it represents.
+
+        :param generator: InstanceGenerator that generated the instance
+        :param instance: generated instance (the generator itself)
+        :return: True if the results are equivalent, False otherwise
+        """
+        result = self.test_instance(self, instance.af, instance.extension, instance.arg)
+        reference_result = self.get_reference_result(generator, instance)
+        equivalent = (result == reference_result)
+        self.current_count += instance.weight
+        if equivalent:
+            # success
+            self.success_count += instance.weight
+            if self.log_results_on_success:
+                self.log_result(generator, instance, result, reference_result)
+        else:
+            # failure
+            if self.log_results_on_failure:
+                self.log_result(generator, instance, result, reference_result)
+        return equivalent
+
+    def create_record(self, generator, instance, result, reference_result):
+        """
+        Create the structured result record of an instance. The instance is identified by its instance identifier
+        (see InstanceGenerator.get_instance_id) and its position in the flattened seed space, instead of its full
+        attack matrix.
+
+        :param generator: InstanceGenerator that generated the instance
+        :param instance: generated instance (the generator itself)
+        :param result: result of the tester function
+        :param reference_result: result of the reference tester function
+        :return: dict with keys id, n, index, weight, result and reference
+        """
+        return {'id': generator.get_instance_id(),
+                'n': generator.n,
+                'index': generator.get_index(),
+                'weight': instance.weight,
+                'result': result,
+                'reference': reference_result}
+
+    def evaluate_batch(self, generator, batch):
+        """
+        Compare test and reference results for a batch of instances, and update counters and logs.
+
+        The batch tester functions take the runner, a BatchAF of the definite arguments and attacks of the instances
+        (see create_batch_af) and lists of their extensions and arguments, and return a list of results. If only one
+        of them is set, the other tester function is called per instance.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param batch: list of tuples (position, AF, extension, argument, weight, instance number, digits, bitmask of
+          definite arguments, list of bitmasks of definite attacks), AF is a copy of the instance if
+          requires_batch_afs, None otherwise
+        :return: list of positions of failed instances
+        """
+        batch_af = None
+        if self.batch_test_instance is not None:
+            batch_af = self.create_batch_af(generator, batch)
+            results = self.batch_test_instance(self, batch_af, [entry[2] for entry in batch],
+                                               [entry[3] for entry in batch])
+        else:
+            results = [self.test_instance(self, entry[1], entry[2], entry[3]) for entry in batch]
+        reference_results = self.get_reference_results(generator, batch, batch_af)
+
+        failed = []
+        log_generator = None  # regenerates logged instances
+        for entry, result, reference_result in zip(batch, results, reference_results):
+            position, weight = entry[0], entry[4]
             equivalent = (result == reference_result)
-            self.current_count += 1
+            self.current_count += weight
             if equivalent:
-                # success
-                self.success_count += 1
-                if self.log_results_on_success:
-                    self.log_result(generator, instance, result, reference_result)
+                self.success_count += weight
             else:
-                # failure
-                if self.log_results_on_failure:
-                    self.log_result(generator, instance, result, reference_result)
-                if self.exit_on_failure:
-                    self.abort_now = True
-                    return
+                failed.append(position)
+            if self.log_results_on_success if equivalent else self.log_results_on_failure:
+                log_generator = self.restore_instance(generator, entry, log_generator)
+                self.log_result(log_generator, log_generator, result, reference_result)
+        return failed
+
+    def requires_batch_afs(self):
+        """
+        Indicates whether batched instances are evaluated by tester functions that take single AFs, so that each batch
+        entry has to hold a copy of its AF (see evaluate_batch).
+
+        :return: True if a copy of each AF is required, False if the bitmasks suffice
+        """
+        return self.batch_test_instance is None or self.batch_reference_test_instance is None
+
+    def create_batch_af(self, generator, batch):
+        """
+        Stack the definite arguments and attacks of a batch of instances into a BatchAF, straight from the bitmasks in
+        the batch entries.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param batch: list of batch entries (see evaluate_batch)
+        :return: BatchAF
+        """
+        from incaffeine.batch import stack_masks  # numpy is only required by batch tester functions
+        return stack_masks([entry[7] for entry in batch], [entry[8] for entry in batch], generator.n)
+
+    def restore_instance(self, generator, entry, log_generator=None):
+        """
+        Regenerate a batched instance, e.g. to log it.
+
+        :param generator: InstanceGenerator that generated the instance
+        :param entry: batch entry of the instance (see evaluate_batch)
+        :param log_generator: optional InstanceGenerator with the flags of generator to be reused
+        :return: InstanceGenerator holding the instance
+        """
+        if log_generator is None:
+            log_generator = InstanceGenerator(generator.n, False, generator.use_extension, generator.use_argument,
+                                              generator.use_uncertain_args, generator.use_uncertain_attacks)
+        digits = entry[6]
+        for digit_position in range(len(digits)):
+            log_generator.apply_digit(digit_position, digits[digit_position])
+        log_generator.weight = entry[4]
+        log_generator.current_count = entry[5]
+        return log_generator
+
+    def get_reference_result(self, generator, instance):
+        """
+        Compute the reference result of a generated instance, or look it up in the reference store.
+
+        :param generator: InstanceGenerator that generated the instance
+        :param instance: generated instance (the generator itself)
+        :return: reference result
+        """
+        if self.reference_store is None:
+            return self.reference_test_instance(self, instance.af, instance.extension, instance.arg)
+        namespace = self.get_reference_namespace(generator)
+        position = generator.get_index()
+        stored, reference_result = self.reference_store.lookup(namespace, generator.n, position)
+        if not stored:
+            reference_result = self.reference_test_instance(self, instance.af, instance.extension, instance.arg)
+            self.reference_store.store(namespace, generator.n, position, reference_result)
+        return reference_result
+
+    def get_reference_results(self, generator, batch, batch_af=None):
+        """
+        Compute the reference results of a batch of instances, or look them up in the reference store.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param batch: list of batch entries (see evaluate_batch)
+        :param batch_af: optional BatchAF of the batch (see create_batch_af), created if required and not given
+        :return: list of reference results
+        """
+        if self.reference_store is None:
+            return self.compute_reference_results(generator, batch, batch_af)
+        namespace = self.get_reference_namespace(generator)
+        positions = [generator.get_index(entry[6]) for entry in batch]
+        reference_results = [self.reference_store.lookup(namespace, generator.n, position) for position in positions]
+        missing = [i for i in range(len(batch)) if not reference_results[i][0]]
+        computed = []
+        if missing:
+            computed = self.compute_reference_results(generator, [batch[i] for i in missing],
+                                                      batch_af.select(missing) if batch_af is not None else None)
+        reference_results = [reference_result for _, reference_result in reference_results]
+        for i, reference_result in zip(missing, computed):
+            reference_results[i] = reference_result
+            self.reference_store.store(namespace, generator.n, positions[i], reference_result)
+        return reference_results
+
+    def compute_reference_results(self, generator, batch, batch_af=None):
+        """
+        Compute the reference results of a batch of instances, with the batch reference tester function if it is set.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param batch: list of batch entries (see evaluate_batch)
+        :param batch_af: optional BatchAF of the batch (see create_batch_af), created if required and not given
+        :return: list of reference results
+        """
+        if self.batch_reference_test_instance is not None:
+            if batch_af is None:
+                batch_af = self.create_batch_af(generator, batch)
+            return self.batch_reference_test_instance(self, batch_af, [entry[2] for entry in batch],
+                                                      [entry[3] for entry in batch])
+        return [self.reference_test_instance(self, entry[1], entry[2], entry[3]) for entry in batch]
+
+    def get_reference_namespace(self, generator):
+        """
+        Identify the reference results of this runner for instances of the given generator in the reference store:
+        runner name, qualified name of the reference tester function and generator flags (see
+        InstanceGenerator.get_instance_id).
+
+        :param generator: InstanceGenerator that generates the instances
+        :return: namespace string
+        """
+        function = self.reference_test_instance or self.batch_reference_test_instance
+        flags = [generator.use_extension, generator.use_argument, generator.use_uncertain_args,
+                 generator.use_uncertain_attacks]
+        return ':'.join([self.name,
+                         getattr(function, '__module__', '') + '.' + getattr(function, '__qualname__',
+                                                                             getattr(function, '__name__', '')),
+                         ''.join(['1' if flag else '0' for flag in flags])])
 
-    def log_result(self, generator, instance, result, reference_result):
+    def log_result(self, generator, instance, result, reference_result, result_label=None):
+        """
+        Log the results of an instance, as record to the result sink (if set) or as result dump.
+
+        :param generator: InstanceGenerator that generated the instance
+        :param instance: generated instance
+        :param result: result of the tester function
+        :param reference_result: result of the reference tester function
+        :param result_label: label of the result in the result dump, result_label of the runner by default
+        :return:
+        """
+        if self.result_sink is not None:
+            self.result_sink.write(self.create_record(generator, instance, result, reference_result))
+            return
         if not (self.log_results_to_stream or (self.log_results_to_file and self.log_file)):
             return  # Fail early if no result logging is available
 
         self.write_log_results('-------------------------------\n')
         self.write_log_results('instance number: ' + str(generator.current_count) + '/'
-                               + str(generator.total_count) + '\n')
-        self.log_af(instance.af)
-        if self.use_extension:
-            self.log_extension(instance.extension)
-        if self.use_argument:
-            self.log_argument(instance.arg)
-        self.write_log_results('\tprimary result: ')
+                               + str(generator.get_instance_count()) + '\n')
+        self.write_log_results('instance id: ' + generator.get_instance_id() + '\n')
+        if not self.log_results_compact:
+            self.log_af(instance.af)
+            if self.use_extension:
+                self.log_extension(instance.extension)
+            if self.use_argument:
+                self.log_argument(instance.arg)
+        self.write_log_results('\t' + (self.result_label if result_label is None else result_label) + ': ')
         self.write_log_results(str(result))
         self.write_log_results('\n\treference result: ')
         self.write_log_results(str(reference_result))
@@ -203,3 +943,284 @@ class TestRunner(object):
 
     def log_argument(self, arg):
         self.write_log_results('arg: ' + str(arg) + '\n')
+
+
+class DifferentialRunner(TestRunner):
+    """
+    Test runner comparing several named candidate tester functions against one reference tester function in a single
+    pass over the instances, so the reference result of each instance is only computed once.
+
+    An instance is successful if all candidates agree with the reference. Successful instances (weighted) and the time
+    spent in each candidate are counted per candidate, result dumps and records name the candidate, and a summary per
+    candidate is posted at the end of the run (see log_summary).
+    """
+
+    candidates = None  # list of tuples (name, tester function)
+    candidate_success_counts = None  # maps candidate names to the number of instances the candidate agreed on
+    candidate_times = None  # maps candidate names to the time spent in the candidate in seconds
+    current_candidate = None  # name of the candidate whose result is logged
+
+    def __init__(self, name, candidates, reference_test_instance):
+        """
+        :param name: runner name
+        :param candidates: list of tuples (name, tester function), tester functions take the same parameters as
+          test_instance
+        :param reference_test_instance: reference tester function
+        """
+        super(DifferentialRunner, self).__init__(name, None, reference_test_instance)
+        self.candidates = list(candidates)
+        self.reset_chunk_statistics()
+
+    def reset_chunk_statistics(self):
+        self.candidate_success_counts = dict([(name, 0) for name, _ in self.candidates])
+        self.candidate_times = dict([(name, 0.0) for name, _ in self.candidates])
+
+    def get_chunk_statistics(self):
+        return self.candidate_success_counts, self.candidate_times
+
+    def merge_chunk_statistics(self, statistics):
+        success_counts, times = statistics
+        for name, _ in self.candidates:
+            self.candidate_success_counts[name] += success_counts[name]
+            self.candidate_times[name] += times[name]
+
+    def replay(self, instance_id):
+        """
+        Rebuild the instance with the given identifier, compute its reference result once and re-run all candidates
+        on it, and post the instance and all results as status messages.
+
+        :param instance_id: instance identifier
+        :return: True if the results of all candidates are equivalent to the reference result, False otherwise
+        """
+        generator = generate_instance(instance_id)
+        reference_result = self.reference_test_instance(self, generator.af, generator.extension, generator.arg)
+        self.log_replayed_instance(instance_id, generator)
+        self.write_log_status('\treference result: ' + str(reference_result))
+        equivalent = True
+        for name, function in self.candidates:
+            result = function(self, generator.af, generator.extension, generator.arg)
+            self.write_log_status('\t' + name + ' result: ' + str(result) + ' (' +
+                                  ('equivalent' if result == reference_result else 'NOT equivalent') + ')')
+            equivalent = equivalent and result == reference_result
+        return equivalent
+
+    def evaluate_candidates(self, af, extension, arg, reference_result, weight):
+        """
+        Run all candidates on an instance, and update their counters.
+
+        :param af: AF of the instance
+        :param extension: extension of the instance
+        :param arg: argument of the instance
+        :param reference_result: result of the reference tester function
+        :param weight: number of instances the instance represents
+        :return: list of tuples (name, result) of all candidates
+        """
+        results = []
+        for name, function in self.candidates:
+            start = time.perf_counter()
+            result = function(self, af, extension, arg)
+            self.candidate_times[name] += time.perf_counter() - start
+            if result == reference_result:
+                self.candidate_success_counts[name] += weight
+            results.append((name, result))
+        return results
+
+    def log_candidate_results(self, generator, instance, results, reference_result):
+        """
+        Log the results of the candidates on an instance, according to the result logging configuration.
+
+        :param generator: InstanceGenerator that generated the instance
+        :param instance: generated instance
+        :param results: list of tuples (name, result) of all candidates
+        :param reference_result: result of the reference tester function
+        :return:
+        """
+        for name, result in results:
+            if self.log_results_on_success if result == reference_result else self.log_results_on_failure:
+                self.current_candidate = name
+                try:
+                    self.log_result(generator, instance, result, reference_result, name + ' result')
+                finally:
+                    self.current_candidate = None
+
+    def is_logged(self, results, reference_result):
+        """
+        :param results: list of tuples (name, result) of all candidates
+        :param reference_result: result of the reference tester function
+        :return: True if the result of at least one candidate has to be logged, False otherwise
+        """
+        return any([self.log_results_on_success if result == reference_result else self.log_results_on_failure
+                    for _, result in results])
+
+    def evaluate_instance(self, generator, instance):
+        reference_result = self.get_reference_result(generator, instance)
+        results = self.evaluate_candidates(instance.af, instance.extension, instance.arg, reference_result,
+                                           instance.weight)
+        equivalent = all([result == reference_result for _, result in results])
+        self.current_count += instance.weight
+        if equivalent:
+            self.success_count += instance.weight
+        if self.is_logged(results, reference_result):
+            self.log_candidate_results(generator, instance, results, reference_result)
+        return equivalent
+
+    def requires_batch_afs(self):
+        return True  # candidates are called per instance
+
+    def evaluate_batch(self, generator, batch):
+        """
+        Batch variant of evaluate_instance: reference results are computed with the batch reference tester function
+        (if it is set), candidates are called per instance.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param batch: list of batch entries (see TestRunner.evaluate_batch)
+        :return: list of positions of failed instances
+        """
+        reference_results = self.get_reference_results(generator, batch)
+        failed = []
+        log_generator = None  # regenerates logged instances
+        for entry, reference_result in zip(batch, reference_results):
+            position, af, extension, arg, weight = entry[:5]
+            results = self.evaluate_candidates(af, extension, arg, reference_result, weight)
+            self.current_count += weight
+            if all([result == reference_result for _, result in results]):
+                self.success_count += weight
+            else:
+                failed.append(position)
+            if self.is_logged(results, reference_result):
+                log_generator = self.restore_instance(generator, entry, log_generator)
+                self.log_candidate_results(log_generator, log_generator, results, reference_result)
+        return failed
+
+    def create_record(self, generator, instance, result, reference_result):
+        record = super(DifferentialRunner, self).create_record(generator, instance, result, reference_result)
+        record['candidate'] = self.current_candidate
+        return record
+
+    def log_summary(self):
+        """
+        Post the number of failed instances and the time spent per candidate as status messages.
+
+        :return:
+        """
+        for name, _ in self.candidates:
+            success_count = self.candidate_success_counts[name]
+            equivalence = 100.0
+            if self.current_count > 0:
+                equivalence = ((success_count * 10000.0) // self.current_count) / 100.0
+            self.write_log_status('candidate ' + name + ': equivalent: ' + "{:6.2f}".format(equivalence) +
+                                  "% (#fails: " + str(self.current_count - success_count) + "/" +
+                                  str(self.current_count) + "), time: " +
+                                  "{:.3f}".format(self.candidate_times[name]) + " s")
+
+
+class TallyRunner(TestRunner):
+    """
+    Test runner counting the return values of a single tester function instead of comparing it to a reference, e.g.
+    to determine the ratio of instances satisfying a property. No reference function is called and no results are
+    logged.
+
+    The (weighted) number of instances per AF size and return value is collected in histogram, optionally also per
+    number of possible attacks and possible arguments (tally_uncertainty). Instances with truthy return values count
+    as successful, so progress messages show their ratio. The histogram is posted at the end of the run (see
+    log_summary).
+    """
+
+    tally_uncertainty = False  # Default: do not distinguish instances by their number of possible elements
+    histogram = None
+    """maps tuples (n, return value) or, if tally_uncertainty is set, (n, number of possible attacks, number of
+    possible arguments, return value) to the number of instances"""
+
+    def __init__(self, name, tally_instance):
+        """
+        :param name: runner name
+        :param tally_instance: tester function whose return values are counted, takes the same parameters as
+          test_instance
+        """
+        super(TallyRunner, self).__init__(name, tally_instance, None)
+        self.reset_chunk_statistics()
+
+    def reset_chunk_statistics(self):
+        self.histogram = {}
+
+    def get_chunk_statistics(self):
+        return [[list(key), count] for key, count in self.histogram.items()]
+
+    def merge_chunk_statistics(self, statistics):
+        for key, count in statistics:
+            key = tuple(key)
+            self.histogram[key] = self.histogram.get(key, 0) + count
+
+    def tally(self, n, af, value, weight):
+        """
+        Count the return value of the tester function on an instance.
+
+        :param n: AF size of the instance
+        :param af: AF of the instance, only required if tally_uncertainty is set
+        :param value: return value of the tester function
+        :param weight: number of instances the instance represents
+        :return: True if the value is truthy, False otherwise
+        """
+        if self.tally_uncertainty:
+            possible_attacks, possible_arguments = af.possible_elements()
+            key = (n, len(possible_attacks), len(possible_arguments), value)
+        else:
+            key = (n, value)
+        self.histogram[key] = self.histogram.get(key, 0) + weight
+        self.current_count += weight
+        if value:
+            self.success_count += weight
+            return True
+        return False
+
+    def evaluate_instance(self, generator, instance):
+        self.tally(generator.n, instance.af,
+                   self.test_instance(self, instance.af, instance.extension, instance.arg), instance.weight)
+        return True
+
+    def requires_batch_afs(self):
+        return self.batch_test_instance is None or self.tally_uncertainty
+
+    def evaluate_batch(self, generator, batch):
+        """
+        Batch variant of evaluate_instance, using the batch tester function if it is set.
+
+        :param generator: InstanceGenerator that generated the instances
+        :param batch: list of batch entries (see TestRunner.evaluate_batch)
+        :return: empty list, tallied instances never fail
+        """
+        if self.batch_test_instance is not None:
+            values = self.batch_test_instance(self, self.create_batch_af(generator, batch),
+                                              [entry[2] for entry in batch], [entry[3] for entry in batch])
+        else:
+            values = [self.test_instance(self, entry[1], entry[2], entry[3]) for entry in batch]
+        for entry, value in zip(batch, values):
+            self.tally(generator.n, entry[1], value, entry[4])
+        return []
+
+    def replay(self, instance_id):
+        generator = generate_instance(instance_id)
+        value = self.test_instance(self, generator.af, generator.extension, generator.arg)
+        self.log_replayed_instance(instance_id, generator)
+        self.write_log_status('\t' + self.result_label + ': ' + str(value))
+        return True
+
+    def log_summary(self):
+        """
+        Post the histogram as status messages, one line per AF size (and number of possible attacks and arguments),
+        with the number and percentage of instances per return value.
+
+        :return:
+        """
+        groups = {}
+        for key, count in self.histogram.items():
+            groups.setdefault(key[:-1], []).append((key[-1], count))
+        for group in sorted(groups):
+            counts = groups[group]
+            total = sum([count for _, count in counts])
+            label = 'n=' + str(group[0])
+            if self.tally_uncertainty:
+                label += ', possible attacks=' + str(group[1]) + ', possible arguments=' + str(group[2])
+            values = ['{}: {} ({:6.2f}%)'.format(value, count, ((count * 10000.0) // total) / 100.0)
+                      for value, count in sorted(counts, key=lambda value_count: str(value_count[0]))]
+            self.write_log_status(label + ': ' + ', '.join(values))
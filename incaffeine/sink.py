@@ -0,0 +1,118 @@
+import json
+
+
+class ResultSink(object):
+    """
+    Receiver of structured result records, one record per logged instance (see TestRunner.create_record).
+
+    Records are buffered and handed to write_records in batches of buffer_size records. This base class keeps all
+    records in memory (records), subclasses persist them instead.
+    """
+
+    def __init__(self, buffer_size=1000):
+        self.buffer_size = buffer_size
+        """(int) number of records collected before they are written"""
+        self.buffer = []
+        """(list) records not written yet"""
+        self.records = []
+        """(list) written records"""
+
+    def write(self, record):
+        """
+        Add a record, and write all buffered records if the buffer is full.
+
+        :param record: dict representing the result of an instance
+        :return:
+        """
+        self.buffer.append(record)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered records.
+
+        :return:
+        """
+        if self.buffer:
+            self.write_records(self.buffer)
+            self.buffer = []
+
+    def write_records(self, records):
+        """
+        Write a batch of records.
+
+        :param records: list of records
+        :return:
+        """
+        self.records.extend(records)
+
+    def get_offset(self):
+        """
+        Returns the position after the written records, e.g. to save it in a checkpoint (see
+        TestRunner.save_checkpoint).
+
+        :return: number of written records
+        """
+        return len(self.records)
+
+    def truncate(self, offset):
+        """
+        Discard buffered records and all records written after the given position, e.g. when resuming from a
+        checkpoint (see TestRunner.load_checkpoint).
+
+        :param offset: position returned by get_offset
+        :return:
+        """
+        self.buffer = []
+        del self.records[offset:]
+
+    def close(self):
+        self.flush()
+
+
+class JsonLinesSink(ResultSink):
+    """
+    Result sink writing one compact JSON object per line to a file. Sets (e.g. extensions) are written as sorted lists.
+    """
+
+    def __init__(self, file_name, buffer_size=1000, append=False):
+        super(JsonLinesSink, self).__init__(buffer_size)
+        self.file = open(file_name, 'a' if append else 'w')
+        """(file) output file"""
+
+    def write_records(self, records):
+        self.file.write(''.join([json.dumps(record, separators=(',', ':'), default=encode_value) + '\n'
+                                 for record in records]))
+        self.file.flush()
+
+    def get_offset(self):
+        """
+        :return: byte offset of the end of the written records in the output file
+        """
+        return self.file.tell()
+
+    def truncate(self, offset):
+        """
+        :param offset: byte offset returned by get_offset
+        :return:
+        """
+        self.buffer = []
+        self.file.seek(offset)
+        self.file.truncate()
+
+    def close(self):
+        super(JsonLinesSink, self).close()
+        self.file.close()
+
+
+def encode_value(value):
+    """
+    Convert values that are not JSON serializable.
+
+    :param value: value of a record
+    :return: sorted list for sets, string representation otherwise
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
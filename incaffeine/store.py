@@ -0,0 +1,107 @@
+import os
+import pickle
+import sqlite3
+
+
+class ReferenceStore(object):
+    """
+    Persistent store of reference results in an SQLite database, so repeated runs against the same instance space only
+    compute each reference result once (see TestRunner.reference_store).
+
+    Results are keyed by a namespace (identifying the runner, the reference tester function and the generator flags,
+    see TestRunner.get_reference_namespace), the AF size and the position of the instance in the flattened seed space.
+    New results are buffered and written in batches of buffer_size results. Every process opens its own connection,
+    so forked worker processes can share a store.
+
+    Stored results are not invalidated automatically: delete the database file after changing a reference function.
+    """
+
+    def __init__(self, file_name, buffer_size=1000):
+        self.file_name = file_name
+        """(str) name of the database file"""
+        self.buffer_size = buffer_size
+        """(int) number of results collected before they are written"""
+        self.buffer = {}
+        """(dict) results not written yet, maps (namespace, n, position) to results"""
+        self.connection = None
+        """(sqlite3.Connection) connection of process pid, None if not connected yet"""
+        self.pid = None
+        """(int) id of the process that opened connection"""
+        self.hits = 0
+        """(int) number of lookups of stored results"""
+        self.misses = 0
+        """(int) number of lookups of missing results"""
+
+    def connect(self):
+        """
+        Open the database of this process, and create the result table if it does not exist yet.
+
+        :return: sqlite3.Connection
+        """
+        if self.connection is None or self.pid != os.getpid():
+            self.buffer = {}  # results buffered before a fork are written by the parent process
+            self.connection = sqlite3.connect(self.file_name, timeout=60)
+            self.pid = os.getpid()
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS reference_results (namespace TEXT, n INTEGER, '
+                                    'position INTEGER, result BLOB, PRIMARY KEY (namespace, n, position)) '
+                                    'WITHOUT ROWID')
+            self.connection.commit()
+        return self.connection
+
+    def lookup(self, namespace, n, position):
+        """
+        Look up a stored result.
+
+        :param namespace: namespace of the result
+        :param n: AF size of the instance
+        :param position: position of the instance in the flattened seed space
+        :return: tuple of a flag indicating whether the result is stored, and the result (None if not stored)
+        """
+        connection = self.connect()
+        key = (namespace, n, position)
+        if key in self.buffer:
+            self.hits += 1
+            return True, self.buffer[key]
+        row = connection.execute('SELECT result FROM reference_results WHERE namespace = ? AND n = ? AND position = ?',
+                                 key).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def store(self, namespace, n, position, result):
+        """
+        Add a result, and write all buffered results if the buffer is full.
+
+        :param namespace: namespace of the result
+        :param n: AF size of the instance
+        :param position: position of the instance in the flattened seed space
+        :param result: result of the reference tester function
+        :return:
+        """
+        self.connect()
+        self.buffer[(namespace, n, position)] = result
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered results.
+
+        :return:
+        """
+        if self.buffer:
+            connection = self.connect()
+            connection.executemany('INSERT OR REPLACE INTO reference_results VALUES (?, ?, ?, ?)',
+                                   [key + (sqlite3.Binary(pickle.dumps(result, pickle.HIGHEST_PROTOCOL)),)
+                                    for key, result in self.buffer.items()])
+            connection.commit()
+            self.buffer = {}
+
+    def close(self):
+        self.flush()
+        if self.connection is not None and self.pid == os.getpid():
+            self.connection.close()
+        self.connection = None
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 
+import copy
+import pickle
 import unittest
 import sys
 sys.path.append('../')
 
-from incaffeine.af import AF
+from incaffeine.af import AF, count_operations
 
 
 class TestAF(unittest.TestCase):
@@ -60,6 +62,116 @@ class TestAF(unittest.TestCase):
 
         self.assertEqual(af.restricted_extension(args), args_reference)
 
+    def test_masks(self):
+        af = AF(3)
+        af.set_argument(2, AF.NO_ARGUMENT)
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, AF.NO_ATTACK)
+
+        self.assertEqual(af.args_mask, 0b011)
+        self.assertEqual(af.attack_masks, [0b010, 0b100, 0b000])
+        self.assertEqual(af.attacked_by_masks, [0b000, 0b001, 0b010])
+        self.assertEqual(af.attacks_of(0b111), 0b010)
+        self.assertEqual(af.attackers_of(0b111), 0b001)
+
+        # writes to A and R keep the bitmasks (and the cache) up to date
+        af.enable_cache()
+        self.assertEqual(af.grounded_extension(), {0})
+        af.R[2][0] = AF.DEFINITE_ATTACK
+        af.A[2] = AF.DEFINITE_ARGUMENT
+
+        self.assertEqual(af.args_mask, 0b111)
+        self.assertEqual(af.attack_masks, [0b010, 0b100, 0b001])
+        self.assertEqual(af.attacks_of(0b111), 0b111)
+        self.assertEqual(af.grounded_extension(), set())
+
+        af.R[0][:] = [AF.NO_ATTACK] * 3
+        self.assertEqual(af.attacked_by_masks, [0b100, 0b000, 0b010])
+        af.R[1] = [AF.NO_ATTACK, AF.NO_ATTACK, AF.NO_ATTACK]
+        self.assertEqual(af.attack_masks, [0b000, 0b000, 0b001])
+        af.A[:] = [AF.NO_ARGUMENT, AF.DEFINITE_ARGUMENT, AF.DEFINITE_ARGUMENT]
+        self.assertEqual(af.args_mask, 0b110)
+        self.assertEqual(af.grounded_extension(), {1, 2})
+
+        af.A = [AF.DEFINITE_ARGUMENT] * 3
+        af.R = [[AF.NO_ATTACK, AF.DEFINITE_ATTACK, AF.NO_ATTACK]] * 3
+        self.assertEqual(af.args_mask, 0b111)
+        self.assertEqual(af.attacked_by_masks, [0b000, 0b111, 0b000])
+        self.assertEqual(af.grounded_extension(), {0, 2})
+        af.R[0][1] = AF.NO_ATTACK
+        self.assertEqual(af.R[1][1], AF.DEFINITE_ATTACK)
+        self.assertEqual(af.attacked_by_masks, [0b000, 0b110, 0b000])
+        other = AF(3)
+        other.R = af.R
+        other.R[1][1] = AF.NO_ATTACK
+        self.assertEqual(other.attacked_by_masks, [0b000, 0b100, 0b000])
+        self.assertEqual(af.attacked_by_masks, [0b000, 0b110, 0b000])
+
+        # copies are independent and keep writing through to their own bitmasks
+        for other in [af.copy(), copy.deepcopy(af), pickle.loads(pickle.dumps(af))]:
+            self.assertEqual(other, af)
+            self.assertEqual(other.attack_masks, af.attack_masks)
+            other.R[2][1] = AF.NO_ATTACK
+            self.assertEqual(other.attacked_by_masks, [0b000, 0b010, 0b000])
+            self.assertEqual(af.attacked_by_masks, [0b000, 0b110, 0b000])
+
+    def test_cache(self):
+        af = AF(3)
+        af.enable_cache()
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+
+        self.assertEqual(af.grounded_extension(), {0, 2})
+        self.assertTrue(af.is_complete({0, 2}))
+        self.assertEqual(af.cache.grounded, 0b101)
+
+        cache = af.cache
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        self.assertIs(af.cache, cache)
+
+        af.set_attack(2, 0, AF.DEFINITE_ATTACK)
+        self.assertIsNot(af.cache, cache)
+        self.assertEqual(af.grounded_extension(), set())
+        self.assertFalse(af.is_complete({0, 2}))
+
+        af.set_argument(2, AF.NO_ARGUMENT)
+        self.assertEqual(af.grounded_extension(), {0})
+
+        af.disable_cache()
+        self.assertIsNone(af.cache)
+        self.assertEqual(af.grounded_extension(), {0})
+
+    def test_cache_grounded_updates(self):
+        # flip every attack of every AF with 3 arguments, starting from a cached grounded extension
+        n = 3
+        for code in range(1 << (n * n)):
+            af = AF(n)
+            for i in range(n * n):
+                if (code >> i) & 1:
+                    af.set_attack(i // n, i % n, AF.DEFINITE_ATTACK)
+            for i in range(n * n):
+                attacker, target = i // n, i % n
+                flipped = af.copy()
+                flipped.enable_cache()
+                flipped.grounded_mask()
+                value = AF.NO_ATTACK if af.R[attacker][target] == AF.DEFINITE_ATTACK else AF.DEFINITE_ATTACK
+                flipped.set_attack(attacker, target, value)
+                expected = flipped.copy()
+                expected.disable_cache()
+                self.assertEqual(flipped.grounded_mask(), expected.grounded_mask())
+
+        # adding an attack of the grounded extension onto an undecided argument lets the grounded extension grow
+        af = AF(5)
+        for attacker, target in [(1, 4), (2, 2), (3, 1), (3, 2), (3, 4), (4, 3)]:
+            af.set_attack(attacker, target, AF.DEFINITE_ATTACK)
+        af.enable_cache()
+        self.assertEqual(af.grounded_extension(), {0})
+        _, counters = count_operations(af.set_attack, 0, 3, AF.DEFINITE_ATTACK)
+        self.assertEqual(counters['grounded.updates'], 1)
+        self.assertEqual(af.cache.grounded, 0b11)
+
     def test_grounded_extension1(self):
         af = AF(3)
         af.set_argument(0, AF.DEFINITE_ARGUMENT)
@@ -97,6 +209,20 @@ class TestAF(unittest.TestCase):
 
         self.assertEqual(set(af.grounded_extension()), grounded_extension)
 
+    def test_grounded_extension4(self):
+        af = AF(6)
+        af.set_argument(5, AF.NO_ARGUMENT)
+        af.set_attack(5, 0, AF.DEFINITE_ATTACK)
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+        af.set_attack(2, 3, AF.DEFINITE_ATTACK)
+        af.set_attack(3, 3, AF.DEFINITE_ATTACK)
+        af.set_attack(3, 4, AF.DEFINITE_ATTACK)
+
+        grounded_extension = {0, 2, 4}
+
+        self.assertEqual(af.grounded_extension(), grounded_extension)
+
     def test_conflict_free1(self):
         af = AF(3)
         af.set_argument(0, AF.DEFINITE_ARGUMENT)
@@ -553,6 +679,22 @@ class TestAF(unittest.TestCase):
         self.assertFalse(af.verification({1, 2}, AF.SEMANTICS_PR))
         self.assertFalse(af.verification({0, 1, 2}, AF.SEMANTICS_PR))
 
+    def test_preferred4(self):
+        af = AF(5)
+        af.set_attack(1, 0, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+        af.set_attack(2, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(3, 4, AF.DEFINITE_ATTACK)
+        af.set_attack(4, 3, AF.DEFINITE_ATTACK)
+        af.set_attack(4, 4, AF.DEFINITE_ATTACK)
+
+        self.assertFalse(af.is_preferred(set()))
+        self.assertFalse(af.is_preferred({2}))
+        self.assertFalse(af.is_preferred({0, 2}))
+        self.assertTrue(af.is_preferred({0, 2, 3}))
+        self.assertTrue(af.is_preferred({1, 3}))
+        self.assertFalse(af.is_preferred({1, 3, 4}))
+
     def test_stable1(self):
         af = AF(3)
         af.set_argument(0, AF.DEFINITE_ARGUMENT)
@@ -1082,6 +1224,80 @@ class TestAF(unittest.TestCase):
         self.assertFalse(af.is_skeptically_acceptable_and_extension_exists(0, AF.SEMANTICS_ST))
         self.assertTrue(af.is_skeptically_acceptable_and_extension_exists(1, AF.SEMANTICS_ST))
 
+    def test_admissible_superset(self):
+        af = AF(4)
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+        af.set_attack(3, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 3, AF.DEFINITE_ATTACK)
+
+        self.assertEqual(af.admissible_superset(0b0100), 0b0101)
+        self.assertEqual(af.admissible_superset(0b0100, 0b0001), 0b1100)
+        self.assertIsNone(af.admissible_superset(0b0100, 0b1001))
+        self.assertIsNone(af.admissible_superset(0b0110))
+
+    def test_iter_extensions(self):
+        af = AF(3)
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+
+        self.assertEqual(set(af.iter_extensions(AF.SEMANTICS_ST)), {0b101, 0b010})
+        self.assertEqual(set(af.iter_extensions(AF.SEMANTICS_ST, include=0b100)), {0b101})
+        self.assertEqual(set(af.iter_extensions(AF.SEMANTICS_CP, exclude=0b010)), {0b000, 0b101})
+        self.assertEqual(set(af.iter_extensions(AF.SEMANTICS_PR, include=0b011)), set())
+
+    def test_acceptance_table(self):
+        af = AF(4)
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+        af.set_attack(3, 3, AF.DEFINITE_ATTACK)
+
+        memo = {}
+        table = af.acceptance_table(AF.SEMANTICS_PR, memo)
+        self.assertEqual(sorted(table.extensions), [0b0010, 0b0101])
+        self.assertTrue(table.exists)
+        self.assertIs(af.acceptance_table(AF.SEMANTICS_PR, memo), table)
+        for semantics in [AF.SEMANTICS_CF, AF.SEMANTICS_AD, AF.SEMANTICS_CP, AF.SEMANTICS_GR, AF.SEMANTICS_ST,
+                          AF.SEMANTICS_PR, AF.SEMANTICS_NECF, AF.SEMANTICS_NEAD]:
+            table = af.acceptance_table(semantics, memo)
+            for arg in range(4):
+                self.assertEqual(table.is_credulously_acceptable(arg), af.is_credulously_acceptable(arg, semantics))
+                self.assertEqual(table.is_skeptically_acceptable(arg), af.is_skeptically_acceptable(arg, semantics))
+                self.assertEqual(table.is_skeptically_acceptable_and_extension_exists(arg),
+                                 af.is_skeptically_acceptable_and_extension_exists(arg, semantics))
+
+        self.assertFalse(af.acceptance_table(AF.SEMANTICS_ST, memo).exists)
+        af.set_attack(3, 3, AF.NO_ATTACK)
+        table = af.acceptance_table(AF.SEMANTICS_ST, memo)
+        self.assertTrue(table.exists)
+        self.assertEqual(table.skeptical, 0b1000)
+
+        af.enable_cache()
+        self.assertIs(af.acceptance_table(AF.SEMANTICS_ST), af.acceptance_table(AF.SEMANTICS_ST))
+
+    def test_count_operations(self):
+        af = AF(3)
+        af.set_attack(0, 1, AF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, AF.DEFINITE_ATTACK)
+        af.set_attack(2, 0, AF.DEFINITE_ATTACK)
+
+        self.assertIsNone(AF.counters)
+        result, counters = count_operations(af.is_credulously_acceptable, 0, AF.SEMANTICS_ST)
+        self.assertFalse(result)
+        self.assertIsNone(AF.counters)
+        self.assertEqual(counters['credulous.ST'], 1)
+        self.assertGreater(counters['iter_extensions.subsets'], 0)
+        self.assertEqual(counters['verify.ST'], 0)  # every branch is cut by conflicts or unattacked arguments
+
+        def queries():
+            af.verification([0], AF.SEMANTICS_CF)
+            _, inner = count_operations(af.verification, [], AF.SEMANTICS_GR)
+            self.assertEqual(inner, {'verify.GR': 1, 'grounded': 1})
+        _, outer = count_operations(queries)
+        self.assertEqual(outer, {'verify.CF': 1, 'verify.GR': 1, 'grounded': 1})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import unittest
+import sys
+sys.path.append('../')
+
+from incaffeine.af import AF
+from incaffeine.helpers import powerset
+from incaffeine.instance_generator import InstanceGenerator
+
+try:
+    import numpy
+    from incaffeine.batch import stack, stack_sets
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestBatchAF(unittest.TestCase):
+
+    def create_afs(self):
+        generator = InstanceGenerator(3, False, False, False, True, True)
+        return [instance.af.copy() for instance in generator.next_range(0, generator.total_count, 101)]
+
+    def test_stack(self):
+        afs = self.create_afs()
+        batch = stack(afs)
+
+        self.assertEqual(batch.attacks.shape, (len(afs), 3, 3))
+        for i in range(len(afs)):
+            for attacker in range(3):
+                for target in range(3):
+                    definite = afs[i].R[attacker][target] == AF.DEFINITE_ATTACK and \
+                               afs[i].A[attacker] == AF.DEFINITE_ARGUMENT and afs[i].A[target] == AF.DEFINITE_ARGUMENT
+                    self.assertEqual(bool(batch.attacks[i, attacker, target]), definite)
+
+    def test_grounded(self):
+        afs = self.create_afs()
+        grounded = stack(afs).grounded()
+
+        for i in range(len(afs)):
+            self.assertEqual(set(numpy.flatnonzero(grounded[i]).tolist()), afs[i].grounded_extension())
+
+    def test_verification(self):
+        afs = self.create_afs()
+        batch = stack(afs)
+
+        for args in powerset(range(3)):
+            args = set(args)
+            sets = stack_sets([args for _ in afs], 3)
+            for semantics in [AF.SEMANTICS_CF, AF.SEMANTICS_NECF, AF.SEMANTICS_AD, AF.SEMANTICS_NEAD,
+                              AF.SEMANTICS_CP, AF.SEMANTICS_GR, AF.SEMANTICS_ST]:
+                expected = [af.verification(args, semantics) for af in afs]
+                self.assertEqual(batch.verification(sets, semantics).tolist(), expected)
+                self.assertEqual(batch.verification(sets[0], semantics).tolist(), expected)
+
+        self.assertRaises(ValueError, batch.verification, sets, AF.SEMANTICS_PR)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import unittest
+import random
+import sys
+sys.path.append('../')
+
+from incaffeine.benchmark import create_benchmarks, run_benchmarks, compare
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_workloads(self):
+        names = [name for name, _ in create_benchmarks()]
+        self.assertEqual(len(names), len(set(names)))
+        for name, workload in create_benchmarks():
+            if name.startswith('af.') or name.startswith('generator.'):
+                workload(random.Random(0))()
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(seed=1, repeat=2, name_filter='af.verification.GR')
+        self.assertEqual(list(results.keys()), ['af.verification.GR'])
+        self.assertGreater(results['af.verification.GR']['best'], 0)
+        self.assertLessEqual(results['af.verification.GR']['best'], results['af.verification.GR']['median'])
+
+    def test_compare(self):
+        baseline = {'a': {'best': 1.0}, 'b': {'best': 1.0}, 'c': {'best': 1.0}}
+        results = {'a': {'best': 1.1}, 'b': {'best': 1.5}, 'd': {'best': 1.0}}
+        comparison, regressions = compare(results, baseline, tolerance=0.2)
+        self.assertEqual([entry[0] for entry in comparison], ['a', 'b'])
+        self.assertAlmostEqual(comparison[1][3], 1.5)
+        self.assertEqual(regressions, ['b'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@ import copy
 sys.path.append('../')
 
 from incaffeine.runner import TestRunner
+from incaffeine.instance_generator import InstanceGenerator
 
 previous_instances = []
 
@@ -388,6 +389,71 @@ class TestGeneratorCorrectness(unittest.TestCase):
 
         self.assertEqual(runner.current_count, runner.success_count)
 
+    def test_next_range(self):
+        def snapshot(generator):
+            return copy.deepcopy(generator.af), copy.deepcopy(generator.extension), generator.arg
+
+        generator = InstanceGenerator(2, False, True, True, True, True)
+        instances = [snapshot(instance) for instance in generator.next()]
+        self.assertEqual(len(instances), generator.total_count)
+
+        for start, stop, step in [(0, generator.total_count, 1), (5, 1000, 7), (100, 5000, 997), (0, 10, 20)]:
+            ranged = InstanceGenerator(2, False, True, True, True, True)
+            self.assertEqual([snapshot(instance) for instance in ranged.next_range(start, stop, step)],
+                             instances[start:stop:step])
+
+        for index in [0, 17, generator.total_count - 1]:
+            generator.generate_index(index)
+            self.assertEqual(snapshot(generator), instances[index])
+            self.assertEqual(generator.decode_index(index)[:2], [index % 2, (index // 2) % 3])
+
+    def test_next_randomized(self):
+        def create_generator(seed, unique, sample_size):
+            generator = InstanceGenerator(2, True, True, True, True, True)
+            generator.random_seed = seed
+            generator.sample_unique = unique
+            generator.randomize_sample_size = sample_size
+            return generator
+
+        for unique in [False, True]:
+            generator = create_generator(42, unique, 3000)
+            indices = [instance.get_index() for instance in generator.next_randomized()]
+            self.assertEqual(len(indices), generator.get_instance_count())
+            self.assertEqual(generator.current_count, len(indices))
+            self.assertEqual(create_generator(42, unique, 3000).get_sample_indices(0, len(indices)), indices)
+            self.assertEqual([generator.get_sample_index(sample) for sample in range(100, 200)], indices[100:200])
+            self.assertNotEqual(create_generator(43, unique, 3000).get_sample_indices(0, len(indices)), indices)
+            # disjoint slices reproduce the full sample sequence
+            sliced = create_generator(42, unique, 3000)
+            self.assertEqual([instance.get_index() for instance in sliced.next_slice(1000, 2500)], indices[1000:2500])
+            for index in indices[:10]:
+                sliced.generate_index(index)
+                self.assertEqual(sliced.get_index(), index)
+            if unique:
+                # sampling without replacement yields a permutation of the seed space
+                self.assertEqual(len(indices), generator.total_count)
+                self.assertEqual(sorted(indices), list(range(generator.total_count)))
+            else:
+                self.assertEqual(len(indices), 3000)
+                self.assertLess(len(set(indices)), 3000)
+                self.assertTrue(all([0 <= index < generator.total_count for index in indices]))
+
+        generator = create_generator(None, False, 10)
+        self.assertEqual(len(list(generator.next_randomized())), 10)
+        self.assertIsNotNone(generator.random_seed)
+
+    def test_next_canonical(self):
+        for n, flags, expected_count in [(3, (False, False, False, False), 104),
+                                         (2, (True, True, True, True), 1296),
+                                         (3, (False, True, False, False), 272)]:
+            generator = InstanceGenerator(n, False, *flags)
+            instances = [(copy.deepcopy(instance.af), copy.deepcopy(instance.extension), instance.arg)
+                         for instance in generator.next_canonical()]
+            self.assertEqual(len(instances), expected_count)
+            self.assertEqual(generator.current_count, generator.total_count)
+            for i in range(len(instances)):
+                self.assertNotIn(instances[i], instances[:i])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 
+import random
 import unittest
 import sys
 sys.path.append('../')
 
-from incaffeine.incaf import IncAF
+from incaffeine.incaf import IncAF, AcceptanceStatuses
+from incaffeine.helpers import LRUCache
+from incaffeine.af import count_operations
+from incaffeine.instance_generator import InstanceGenerator
 
 
 class TestIncAF(unittest.TestCase):
@@ -35,6 +39,28 @@ class TestIncAF(unittest.TestCase):
 
         self.assertFalse(af1 == af2)
 
+    def test_copy(self):
+        af = IncAF(3)
+        af.set_argument(2, IncAF.POSSIBLE_ARGUMENT)
+        af.set_attack(0, 1, IncAF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, IncAF.POSSIBLE_ATTACK)
+
+        af_copy = af.copy()
+        self.assertIsInstance(af_copy, IncAF)
+        self.assertEqual(af, af_copy)
+        self.assertEqual(af.attack_masks, af_copy.attack_masks)
+
+        af_copy.set_attack(0, 1, IncAF.NO_ATTACK)
+        self.assertNotEqual(af, af_copy)
+        self.assertTrue(af.attacks(0, 1))
+
+        target = IncAF(2)
+        af.clone_into(af_copy)
+        af.clone_into(target)
+        self.assertEqual(af, af_copy)
+        self.assertEqual(af, target)
+        self.assertTrue(target.attacks(0, 1))
+
     def test_restricted_extension(self):
         af = IncAF(3)
         af.set_argument(0, IncAF.DEFINITE_ARGUMENT)
@@ -72,6 +98,55 @@ class TestIncAF(unittest.TestCase):
 
         self.assertEqual(af.minimal_completion(), minimal_completion)
 
+    def test_iter_completions(self):
+        af = IncAF(3)
+        af.set_argument(2, IncAF.POSSIBLE_ARGUMENT)
+        af.set_attack(0, 1, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 2, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(2, 0, IncAF.DEFINITE_ATTACK)
+
+        possible_attacks, possible_arguments = af.possible_elements()
+        self.assertEqual(possible_attacks, [(0, 1), (1, 2)])
+        self.assertEqual(possible_arguments, [2])
+
+        completions = []
+        changes = []
+        for changed in af.iter_completions(possible_attacks, possible_arguments):
+            completions.append((tuple(af.A), tuple(tuple(row) for row in af.R)))
+            changes.append(changed)
+
+        self.assertEqual(len(set(completions)), 8)
+        self.assertEqual(changes, [True, True, False, True, True, True, True, True])
+
+    def test_satisfied_bound(self):
+        af = IncAF(3)
+        af.set_argument(2, IncAF.POSSIBLE_ARGUMENT)
+        af.set_attack(0, 1, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 0, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 2, IncAF.POSSIBLE_ATTACK)
+        visited = []
+
+        def condition(completion):
+            visited.append(completion.R[1][2])
+            return completion.R[1][2] == IncAF.DEFINITE_ATTACK
+
+        def bound(partial):
+            if partial.R[1][2] == IncAF.NO_ATTACK:
+                return False
+            return None
+
+        self.assertTrue(af.possibly_satisfied(condition))
+        self.assertFalse(af.necessarily_satisfied(condition))
+
+        del visited[:]
+        self.assertFalse(af.necessarily_satisfied(condition, bound=bound))
+        self.assertNotIn(IncAF.NO_ATTACK, visited)
+
+        del visited[:]
+        af.set_attack(1, 2, IncAF.NO_ATTACK)
+        self.assertFalse(af.possibly_satisfied(condition, bound=bound))
+        self.assertEqual(visited, [])
+
     def test_possibly_attacks(self):
         af = IncAF(9)
         af.set_argument(0, IncAF.DEFINITE_ARGUMENT)
@@ -202,6 +277,92 @@ class TestIncAF(unittest.TestCase):
         self.assertTrue(af.is_necessarily_conflict_free({8, 10}))
         self.assertFalse(af.is_necessarily_conflict_free({8, 11}))
 
+    def test_polynomial_solver(self):
+        af = IncAF(3)
+        af.set_attack(0, 1, IncAF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 2, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(2, 1, IncAF.POSSIBLE_ATTACK)
+
+        self.assertEqual(af.polynomial_solver('possible_verification', IncAF.SEMANTICS_AD),
+                         af.is_possibly_admissible)
+        self.assertIsNone(af.polynomial_solver('possible_verification', IncAF.SEMANTICS_GR))
+
+        self.assertTrue(af.is_necessarily_admissible({0}))
+        self.assertTrue(af.is_possibly_admissible({2}))
+        self.assertFalse(af.is_necessarily_admissible({2}))
+        self.assertTrue(af.is_possibly_admissible({0, 2}))
+        self.assertTrue(af.is_necessarily_admissible({0, 2}))
+        self.assertTrue(af.is_possibly_stable({0, 2}))
+        self.assertTrue(af.is_necessarily_stable({0, 2}))
+        self.assertFalse(af.is_possibly_stable({0}))
+
+        af.set_argument(2, IncAF.POSSIBLE_ARGUMENT)
+        self.assertIsNone(af.polynomial_solver('possible_verification', IncAF.SEMANTICS_AD))
+        self.assertEqual(af.polynomial_solver('necessary_verification', IncAF.SEMANTICS_AD),
+                         af.is_necessarily_admissible)
+        self.assertTrue(af.is_necessarily_admissible({0, 2}))
+        self.assertFalse(af.is_necessarily_stable({0}))
+
+    def test_possible_credulous_grounded(self):
+        af = IncAF(3)
+        self.assertEqual(af.polynomial_solver('possible_credulous_acceptance', IncAF.SEMANTICS_GR),
+                         af.is_possibly_credulously_grounded)
+        af.set_argument(2, IncAF.POSSIBLE_ARGUMENT)
+        self.assertIsNone(af.polynomial_solver('possible_credulous_acceptance', IncAF.SEMANTICS_GR))
+
+        def enumerated(incaf, arg):
+            return incaf.possibly_satisfied(lambda completion: completion.is_credulously_acceptable(
+                arg, IncAF.SEMANTICS_GR), incremental=True)
+
+        generator = InstanceGenerator(2, False, False, True, False, True)
+        for instance in generator.next():
+            self.assertEqual(instance.af.is_possibly_credulously_acceptable(instance.arg, IncAF.SEMANTICS_GR),
+                             enumerated(instance.af, instance.arg))
+
+        rng = random.Random(0)
+        for _ in range(100):
+            af = IncAF(5)
+            for attacker in range(5):
+                for target in range(5):
+                    value = rng.random()
+                    if value < 0.3:
+                        af.set_attack(attacker, target, IncAF.DEFINITE_ATTACK)
+                    elif value < 0.5:
+                        af.set_attack(attacker, target, IncAF.POSSIBLE_ATTACK)
+            for arg in range(5):
+                self.assertEqual(af.is_possibly_credulously_acceptable(arg, IncAF.SEMANTICS_GR), enumerated(af, arg))
+
+        # 0 and 1 are unattacked and 0 definitely attacks 2, so 2 is grounded iff 1 attacks 0
+        af = IncAF(3)
+        af.set_attack(0, 2, IncAF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, IncAF.POSSIBLE_ATTACK)
+        self.assertTrue(af.is_possibly_credulously_grounded(2))
+        self.assertFalse(af.minimal_completion().is_credulously_acceptable(2, IncAF.SEMANTICS_GR))
+
+        # 0 and 1 attack each other and 2 possibly attacks both, so at most one of them is grounded, like the truth
+        # values of a variable. 3 is grounded iff both of its attackers 4 and 5 are defeated, i.e. iff 6 and 7 are
+        # grounded, which requires to defeat their attackers 8 by 0 and 9 by 1. This is unsatisfiable.
+        af = IncAF(10)
+        af.set_attack(0, 1, IncAF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, IncAF.DEFINITE_ATTACK)
+        af.set_attack(2, 0, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(2, 1, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(4, 3, IncAF.DEFINITE_ATTACK)
+        af.set_attack(5, 3, IncAF.DEFINITE_ATTACK)
+        af.set_attack(6, 4, IncAF.DEFINITE_ATTACK)
+        af.set_attack(7, 5, IncAF.DEFINITE_ATTACK)
+        af.set_attack(8, 6, IncAF.DEFINITE_ATTACK)
+        af.set_attack(9, 7, IncAF.DEFINITE_ATTACK)
+        af.set_attack(0, 8, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 9, IncAF.POSSIBLE_ATTACK)
+        self.assertFalse(af.is_possibly_credulously_grounded(3))
+        self.assertEqual(af.is_possibly_credulously_grounded(3), enumerated(af, 3))
+        self.assertTrue(af.is_possibly_credulously_grounded(6))
+        af.set_attack(0, 9, IncAF.POSSIBLE_ATTACK)
+        self.assertTrue(af.is_possibly_credulously_grounded(3))
+        self.assertEqual(af.is_possibly_credulously_grounded(3), enumerated(af, 3))
+
     def test_possible_verification(self):
         af = IncAF(4)
         af.set_argument(0, IncAF.POSSIBLE_ARGUMENT)
@@ -570,6 +731,89 @@ class TestIncAF(unittest.TestCase):
         self.assertFalse(af.is_necessarily_skeptically_acceptable_and_extension_exists(1, IncAF.SEMANTICS_ST))
         self.assertFalse(af.is_necessarily_skeptically_acceptable_and_extension_exists(2, IncAF.SEMANTICS_ST))
 
+    def test_acceptance_statuses(self):
+        af = IncAF(4)
+        af.set_argument(3, IncAF.POSSIBLE_ARGUMENT)
+        af.set_attack(0, 1, IncAF.DEFINITE_ATTACK)
+        af.set_attack(1, 0, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 2, IncAF.DEFINITE_ATTACK)
+        af.set_attack(2, 2, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(3, 0, IncAF.DEFINITE_ATTACK)
+
+        problems = ['possibly_credulously', 'necessarily_credulously', 'possibly_skeptically',
+                    'necessarily_skeptically', 'possibly_skeptically_acceptable_and_extension_exists',
+                    'necessarily_skeptically_acceptable_and_extension_exists']
+        methods = ['is_' + problem if problem.endswith('exists') else 'is_' + problem + '_acceptable'
+                   for problem in problems]
+        memo = {}
+        for semantics in [IncAF.SEMANTICS_CF, IncAF.SEMANTICS_AD, IncAF.SEMANTICS_CP, IncAF.SEMANTICS_GR,
+                          IncAF.SEMANTICS_ST, IncAF.SEMANTICS_PR, IncAF.SEMANTICS_NECF, IncAF.SEMANTICS_NEAD]:
+            statuses = af.acceptance_statuses(semantics, memo)
+            self.assertIs(af.acceptance_statuses(semantics, memo), statuses)
+            for status, method in zip(AcceptanceStatuses.STATUSES, methods):
+                single = af.acceptance_statuses(semantics, required=[status])
+                for arg in range(4):
+                    expected = getattr(af, method)(arg, semantics)
+                    self.assertEqual(getattr(statuses, method)(arg), expected)
+                    self.assertEqual(getattr(single, method)(arg), expected)
+
+        statuses = af.acceptance_statuses(IncAF.SEMANTICS_GR)
+        self.assertEqual(statuses.possibly_credulous, 0b1111)
+        self.assertEqual(statuses.necessarily_credulous, 0b0000)
+
+    def test_count_operations(self):
+        af = IncAF(3)
+        af.set_attack(0, 1, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 2, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(2, 0, IncAF.POSSIBLE_ATTACK)
+
+        result, counters = count_operations(af.is_necessarily_skeptically_acceptable, 0, IncAF.SEMANTICS_ST)
+        self.assertFalse(result)
+        self.assertEqual(counters['necessarily_satisfied'], 1)
+        self.assertEqual(counters['necessarily_satisfied.early_exits'], 1)
+        self.assertLessEqual(counters['completions'], 8)
+        self.assertEqual(counters['skeptical.ST'], counters['completions'])
+
+        result, counters = count_operations(af.possible_verification, [0], IncAF.SEMANTICS_PR)
+        self.assertFalse(result)
+        self.assertGreater(counters['bound.cuts'], 0)
+        self.assertLess(counters['completions'], 8)  # the bound prunes part of the 8 completions
+        self.assertEqual(counters['possibly_satisfied.early_exits'], 0)
+
+    def test_completion_cache(self):
+        af = IncAF(3)
+        af.set_argument(2, IncAF.POSSIBLE_ARGUMENT)
+        af.set_attack(0, 1, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(1, 0, IncAF.DEFINITE_ATTACK)
+        af.set_attack(1, 2, IncAF.POSSIBLE_ATTACK)
+        af.set_attack(2, 1, IncAF.DEFINITE_ATTACK)
+
+        methods = ['is_possibly_credulously_acceptable', 'is_necessarily_credulously_acceptable',
+                   'is_possibly_skeptically_acceptable', 'is_necessarily_skeptically_acceptable']
+        semantics_list = [IncAF.SEMANTICS_AD, IncAF.SEMANTICS_CP, IncAF.SEMANTICS_ST, IncAF.SEMANTICS_PR]
+        expected = [getattr(af, method)(arg, semantics)
+                    for method in methods for semantics in semantics_list for arg in range(3)]
+        expected_verification = [af.possible_verification([0], semantics) for semantics in semantics_list]
+
+        cache = LRUCache(4)
+        IncAF.completion_cache = cache
+        try:
+            for _ in range(2):
+                self.assertEqual([getattr(af, method)(arg, semantics)
+                                  for method in methods for semantics in semantics_list for arg in range(3)], expected)
+                self.assertEqual([af.possible_verification([0], semantics) for semantics in semantics_list],
+                                 expected_verification)
+        finally:
+            IncAF.completion_cache = None
+        self.assertGreater(cache.hits, 0)
+        self.assertEqual(len(cache), 4)
+
+        oldest = next(iter(cache.entries))
+        cache['new'] = True
+        self.assertNotIn(oldest, cache.entries)
+        self.assertIn('new', cache)
+        self.assertEqual(len(cache), 4)
+
 
 if __name__ == "__main__":
     unittest.main()
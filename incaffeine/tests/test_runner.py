@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+
+import io
+import re
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+import sys
+sys.path.append('../')
+
+from incaffeine.af import AF
+from incaffeine.instance_generator import InstanceGenerator, generate_instance
+from incaffeine.runner import TestRunner, DifferentialRunner, TallyRunner
+from incaffeine.sink import ResultSink, JsonLinesSink
+from incaffeine.store import ReferenceStore
+from incaffeine.helpers import powerset
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def grounded_credulous(runner, af, extension, arg):
+    return af.is_credulously_acceptable(arg, AF.SEMANTICS_GR)
+
+
+def complete_credulous(runner, af, extension, arg):
+    return af.is_credulously_acceptable(arg, AF.SEMANTICS_CP)
+
+
+def batch_grounded_credulous(runner, batch_af, extensions, args):
+    grounded = batch_af.grounded()
+    return [bool(grounded[i, args[i]]) for i in range(batch_af.batch_size)]
+
+
+def batch_complete_credulous(runner, batch_af, extensions, args):
+    accepted = numpy.zeros(batch_af.batch_size, dtype=bool)
+    indices = numpy.arange(batch_af.batch_size)
+    for subset in powerset(range(batch_af.n)):
+        sets = numpy.zeros(batch_af.n, dtype=bool)
+        sets[list(subset)] = True
+        accepted |= batch_af.is_complete(sets) & batch_af.to_sets(sets)[indices, args]
+    return accepted.tolist()
+
+
+class TestTestRunner(unittest.TestCase):
+
+    def create_runner(self, processes):
+        runner = TestRunner('test', grounded_credulous, complete_credulous)
+        runner.use_argument = True
+        runner.use_uncertain_args = True
+        runner.use_uncertain_attacks = True
+        runner.log_results_to_file = False
+        runner.log_stream = io.StringIO()
+        runner.processes = processes
+        runner.chunk_size = 100
+        runner.log_status_interval = 0.1
+        return runner
+
+    def run_generator(self, runner, n):
+        generator = InstanceGenerator(n, False, runner.use_extension, runner.use_argument,
+                                      runner.use_uncertain_args, runner.use_uncertain_attacks)
+        runner.run_single(generator)
+        return generator
+
+    def test_parallel(self):
+        serial = self.create_runner(1)
+        parallel = self.create_runner(3)
+        serial_generator = self.run_generator(serial, 2)
+        parallel_generator = self.run_generator(parallel, 2)
+
+        self.assertEqual(serial.current_count, serial_generator.total_count)
+        self.assertEqual(parallel.current_count, serial.current_count)
+        self.assertEqual(parallel.success_count, serial.success_count)
+        self.assertEqual(parallel_generator.current_count, serial_generator.current_count)
+        self.assertLess(serial.success_count, serial.current_count)
+        self.assertEqual(parallel.log_stream.getvalue(), serial.log_stream.getvalue())
+
+    def test_parallel_exit_on_failure(self):
+        runner = self.create_runner(2)
+        runner.exit_on_failure = True
+        self.run_generator(runner, 2)
+
+        self.assertTrue(runner.abort_now)
+        self.assertEqual(runner.current_count - runner.success_count, 1)
+
+    def test_parallel_status(self):
+        def slow_grounded_credulous(runner, af, extension, arg):
+            time.sleep(0.002)
+            return grounded_credulous(runner, af, extension, arg)
+
+        errors = []
+        previous_excepthook = threading.excepthook
+        threading.excepthook = errors.append
+        try:
+            runner = self.create_runner(2)
+            runner.test_instance = slow_grounded_credulous
+            runner.chunk_size = 1000  # one chunk, so the parent process merges no results until the end
+            runner.log_status_interval = 0.05
+            runner.n_min = 2
+            runner.n_max = 2
+            runner.run()
+            time.sleep(2 * runner.log_status_interval)  # let the last status timer expire
+        finally:
+            threading.excepthook = previous_excepthook
+
+        self.assertEqual(errors, [])
+        counts = [int(count) for count in re.findall(r'#fails: \d+/(\d+)\)', runner.log_stream.getvalue())]
+        self.assertEqual(counts[0], 0)
+        self.assertEqual(counts[-1], runner.current_count)
+        self.assertTrue(any([0 < count < runner.current_count for count in counts]))
+
+    def test_isomorphism_reduction(self):
+        full = self.create_runner(1)
+        full.use_extension = True
+        reduced = self.create_runner(1)
+        reduced.use_extension = True
+        reduced.use_isomorphism_reduction = True
+        reduced_parallel = self.create_runner(3)
+        reduced_parallel.use_extension = True
+        reduced_parallel.use_isomorphism_reduction = True
+        self.run_generator(full, 2)
+        self.run_generator(reduced, 2)
+        self.run_generator(reduced_parallel, 2)
+
+        self.assertEqual(reduced.current_count, full.current_count)
+        self.assertEqual(reduced.success_count, full.success_count)
+        self.assertEqual(reduced_parallel.current_count, full.current_count)
+        self.assertNotIn('warning', reduced.log_stream.getvalue())
+        self.assertIn('warning: isomorphism reduction runs in a single process', reduced_parallel.log_stream.getvalue())
+
+    def test_checkpoint_resume(self):
+        complete = self.create_runner(1)
+        complete.n_max = 2
+        complete.run()
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_file = os.path.join(directory, 'checkpoint.json')
+            interrupted = self.create_runner(1)
+            interrupted.n_max = 2
+            interrupted.checkpoint_file = checkpoint_file
+            interrupted.exit_on_failure = True
+            interrupted.run()
+            with open(checkpoint_file) as checkpoint:
+                state = json.load(checkpoint)
+            self.assertEqual(state['n'], 2)
+            with open(checkpoint_file + '.failures') as failures:
+                self.assertEqual([json.loads(line) for line in failures], [[2, state['position'] - 1]])
+            with open(checkpoint_file + '.failures', 'a') as failures:
+                failures.write('[2, 99]\n')  # appended after the checkpoint, e.g. before a crash
+
+            resumed = self.create_runner(1)
+            resumed.n_max = 2
+            resumed.checkpoint_file = checkpoint_file
+            resumed.resume = True
+            resumed.run()
+
+        self.assertEqual(resumed.total_count, complete.total_count)
+        self.assertEqual(resumed.current_count, complete.current_count)
+        self.assertEqual(resumed.success_count, complete.success_count)
+        self.assertEqual(len(resumed.failures), complete.current_count - complete.success_count)
+
+    def test_checkpoint_resume_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_file = os.path.join(directory, 'checkpoint.json')
+            complete_name = os.path.join(directory, 'complete.jsonl')
+            sink_name = os.path.join(directory, 'results.jsonl')
+            complete = self.create_runner(1)
+            complete.n_max = 2
+            complete.result_sink = JsonLinesSink(complete_name, buffer_size=1)
+            complete.run()
+            complete.result_sink.close()
+
+            interrupted = self.create_runner(1)
+            interrupted.n_max = 2
+            interrupted.checkpoint_file = checkpoint_file
+            interrupted.exit_on_failure = True
+            interrupted.result_sink = JsonLinesSink(sink_name, buffer_size=1)
+            interrupted.run()
+            interrupted.result_sink.write({'n': 2, 'index': 0})  # flushed after the checkpoint, e.g. before a crash
+            interrupted.result_sink.close()
+
+            resumed = self.create_runner(1)
+            resumed.apply_params(['--nMax=2', '--checkpoint=' + checkpoint_file, '--resume', '--sink=' + sink_name])
+            resumed.result_sink.buffer_size = 1
+            resumed.run()
+            resumed.result_sink.close()
+            with open(sink_name) as results, open(complete_name) as complete_results:
+                self.assertEqual(results.read(), complete_results.read())
+
+            changed = self.create_runner(1)
+            changed.n_max = 2
+            changed.use_extension = True
+            changed.checkpoint_file = checkpoint_file
+            self.assertRaises(ValueError, changed.load_checkpoint)
+
+            randomized = self.create_runner(1)
+            randomized.apply_params(['--rand=10', '--seed=1', '--nMin=2', '--nMax=2',
+                                     '--checkpoint=' + checkpoint_file])
+            randomized.run()
+            randomized.random_seed = 2
+            self.assertRaises(ValueError, randomized.load_checkpoint)
+            randomized.random_seed = None
+            self.assertTrue(randomized.load_checkpoint())
+            self.assertEqual(randomized.random_seed, 1)
+
+            os.remove(checkpoint_file + '.failures')
+            self.assertRaises(ValueError, randomized.load_checkpoint)
+
+            without_checkpoint = self.create_runner(1)
+            self.assertRaises(ValueError, without_checkpoint.apply_params, ['--resume', '--sink=' + sink_name])
+
+    def test_result_sink(self):
+        serial = self.create_runner(1)
+        serial.result_sink = ResultSink(buffer_size=10)
+        parallel = self.create_runner(3)
+        parallel.result_sink = ResultSink(buffer_size=10)
+        generator = self.run_generator(serial, 2)
+        self.run_generator(parallel, 2)
+        serial.result_sink.flush()
+        parallel.result_sink.flush()
+
+        records = serial.result_sink.records
+        self.assertEqual(len(records), serial.current_count - serial.success_count)
+        self.assertEqual(parallel.result_sink.records, records)
+        self.assertEqual(serial.log_stream.getvalue(), '')
+        for record in records:
+            generator.generate_index(record['index'])
+            self.assertEqual(record['result'], grounded_credulous(serial, generator.af, None, generator.arg))
+            self.assertEqual(record['reference'], complete_credulous(serial, generator.af, None, generator.arg))
+
+    def test_json_lines_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'results.jsonl')
+            sink = JsonLinesSink(file_name, buffer_size=2)
+            sink.write({'n': 2, 'index': 0, 'result': {1, 0}})
+            sink.write({'n': 2, 'index': 1, 'result': True})
+            sink.write({'n': 2, 'index': 2, 'result': None})
+            sink.close()
+            with open(file_name) as results:
+                lines = results.read().splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0]), {'n': 2, 'index': 0, 'result': [0, 1]})
+        self.assertEqual(json.loads(lines[2]), {'n': 2, 'index': 2, 'result': None})
+
+    def test_replay(self):
+        runner = self.create_runner(1)
+        runner.result_sink = ResultSink()
+        self.run_generator(runner, 2)
+        runner.result_sink.flush()
+        record = runner.result_sink.records[0]
+
+        replayed = generate_instance(record['id'])
+        self.assertEqual(replayed.get_index(), record['index'])
+        self.assertEqual(replayed.get_instance_id(), record['id'])
+
+        runner.replay_ids = [record['id']]
+        self.assertFalse(runner.replay(record['id']))
+        runner.run()
+        self.assertIn('Replaying instance ' + record['id'], runner.log_stream.getvalue())
+        self.assertIn('NOT equivalent', runner.log_stream.getvalue())
+        self.assertRaises(ValueError, generate_instance, '2:1x11:0:0:0:0')
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_batch(self):
+        single = self.create_runner(1)
+        single.use_extension = True
+        single.result_sink = ResultSink()
+        self.run_generator(single, 2)
+        single.result_sink.flush()
+
+        for processes in [1, 3]:
+            batched = self.create_runner(processes)
+            batched.use_extension = True
+            batched.result_sink = ResultSink()
+            batched.test_instance = None
+            batched.batch_test_instance = batch_grounded_credulous
+            batched.batch_size = 64
+            self.run_generator(batched, 2)
+            batched.result_sink.flush()
+
+            self.assertEqual(batched.current_count, single.current_count)
+            self.assertEqual(batched.success_count, single.success_count)
+            self.assertEqual(batched.result_sink.records, single.result_sink.records)
+
+    def test_reference_store(self):
+        expected = self.create_runner(1)
+        expected.result_sink = ResultSink()
+        self.run_generator(expected, 2)
+        expected.result_sink.flush()
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'references.db')
+            calls = []
+
+            def counting_reference(runner, af, extension, arg):
+                calls.append(arg)
+                return complete_credulous(runner, af, extension, arg)
+
+            # the parallel run computes and stores all reference results in worker processes, later runs reuse them
+            for processes, batch in [(3, False), (1, False), (1, numpy is not None)]:
+                runner = self.create_runner(processes)
+                runner.result_sink = ResultSink()
+                runner.reference_test_instance = counting_reference
+                runner.reference_store = ReferenceStore(file_name, buffer_size=50)
+                if batch:
+                    runner.test_instance = None
+                    runner.batch_test_instance = batch_grounded_credulous
+                    runner.batch_size = 64
+                generator = self.run_generator(runner, 2)
+                runner.result_sink.flush()
+
+                self.assertEqual(runner.current_count, expected.current_count)
+                self.assertEqual(runner.success_count, expected.success_count)
+                self.assertEqual(runner.result_sink.records, expected.result_sink.records)
+                self.assertEqual(calls, [])
+                if processes == 1:
+                    self.assertEqual(runner.reference_store.hits, generator.total_count)
+                runner.reference_store.close()
+
+            other = ReferenceStore(file_name)
+            namespace = runner.get_reference_namespace(generator)
+            self.assertEqual(other.lookup(namespace, 2, 0), (True, complete_credulous(runner, *self.instance(2, 0))))
+            self.assertEqual(other.lookup(namespace + 'x', 2, 0), (False, None))
+            other.close()
+
+    def test_differential(self):
+        expected = self.create_runner(1)
+        expected.result_sink = ResultSink()
+        self.run_generator(expected, 2)
+        expected.result_sink.flush()
+
+        for processes, batch in [(1, False), (3, False), (1, numpy is not None)]:
+            runner = DifferentialRunner('test', [('gr', grounded_credulous), ('cp', complete_credulous)],
+                                        complete_credulous)
+            runner.use_argument = True
+            runner.use_uncertain_args = True
+            runner.use_uncertain_attacks = True
+            runner.log_stream = io.StringIO()
+            runner.processes = processes
+            runner.chunk_size = 100
+            runner.result_sink = ResultSink()
+            if batch:
+                runner.batch_reference_test_instance = batch_complete_credulous
+                runner.batch_size = 64
+            generator = self.run_generator(runner, 2)
+            runner.result_sink.flush()
+
+            self.assertEqual(runner.current_count, generator.total_count)
+            self.assertEqual(runner.success_count, expected.success_count)
+            self.assertEqual(runner.candidate_success_counts, {'gr': expected.success_count,
+                                                               'cp': generator.total_count})
+            self.assertEqual(set(runner.candidate_times.keys()), {'gr', 'cp'})
+            for record in expected.result_sink.records:
+                record['candidate'] = 'gr'
+            self.assertEqual(runner.result_sink.records, expected.result_sink.records)
+
+        runner.log_summary()
+        self.assertIn('candidate gr: equivalent:', runner.log_stream.getvalue())
+        runner.result_sink = None
+        runner.log_results_to_stream = True
+        runner.log_stream = io.StringIO()
+        self.run_generator(runner, 2)
+        self.assertIn('gr result: ', runner.log_stream.getvalue())
+        self.assertNotIn('cp result: ', runner.log_stream.getvalue())
+        self.assertEqual(runner.result_label, 'primary result')
+        self.assertIsNone(runner.current_candidate)
+
+        # replay computes the reference result once for all candidates
+        calls = []
+
+        def counting_reference(runner, af, extension, arg):
+            calls.append(arg)
+            return complete_credulous(runner, af, extension, arg)
+        runner.reference_test_instance = counting_reference
+        runner.log_stream = io.StringIO()
+        self.assertFalse(runner.replay(expected.result_sink.records[0]['id']))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(runner.log_stream.getvalue().count('Replaying instance '), 1)
+        self.assertIn('gr result: False (NOT equivalent)', runner.log_stream.getvalue())
+        self.assertIn('cp result: True (equivalent)', runner.log_stream.getvalue())
+
+    def test_tally(self):
+        expected = self.create_runner(1)
+        generator = self.run_generator(expected, 2)
+        histogram = {}
+        uncertainty_histogram = {}
+        for instance in generator.next():
+            value = grounded_credulous(expected, instance.af, None, instance.arg)
+            possible_attacks, possible_arguments = instance.af.possible_elements()
+            histogram[(2, value)] = histogram.get((2, value), 0) + 1
+            key = (2, len(possible_attacks), len(possible_arguments), value)
+            uncertainty_histogram[key] = uncertainty_histogram.get(key, 0) + 1
+
+        for processes, batch, iso in [(1, False, False), (3, False, False), (1, numpy is not None, False),
+                                      (1, False, True)]:
+            runner = TallyRunner('test', grounded_credulous)
+            runner.use_argument = True
+            runner.use_uncertain_args = True
+            runner.use_uncertain_attacks = True
+            runner.log_stream = io.StringIO()
+            runner.processes = processes
+            runner.chunk_size = 100
+            runner.use_isomorphism_reduction = iso
+            if batch:
+                runner.test_instance = None
+                runner.batch_test_instance = batch_grounded_credulous
+                runner.batch_size = 64
+            self.run_generator(runner, 2)
+            self.assertEqual(runner.histogram, histogram)
+            self.assertEqual(runner.current_count, expected.current_count)
+            self.assertEqual(runner.success_count, histogram[(2, True)])
+            self.assertEqual(runner.log_stream.getvalue(), '')
+
+        runner.tally_uncertainty = True
+        runner.reset_chunk_statistics()
+        self.run_generator(runner, 2)
+        self.assertEqual(runner.histogram, uncertainty_histogram)
+        runner.log_summary()
+        self.assertIn('n=2, possible attacks=0, possible arguments=0: False: ', runner.log_stream.getvalue())
+
+        with tempfile.TemporaryDirectory() as directory:
+            runner.checkpoint_file = os.path.join(directory, 'checkpoint.json')
+            runner.save_checkpoint()
+            resumed = TallyRunner('test', grounded_credulous)
+            resumed.use_argument = True
+            resumed.use_uncertain_args = True
+            resumed.use_uncertain_attacks = True
+            resumed.use_isomorphism_reduction = runner.use_isomorphism_reduction
+            resumed.checkpoint_file = runner.checkpoint_file
+            self.assertTrue(resumed.load_checkpoint())
+            self.assertEqual(resumed.histogram, uncertainty_histogram)
+
+    def test_randomized(self):
+        runs = []
+        for processes in [1, 3]:
+            runner = self.create_runner(processes)
+            runner.apply_params(['--rand=500', '--seed=7', '--unique', '--nMin=2', '--nMax=2'])
+            runner.result_sink = ResultSink()
+            runner.run()
+            runner.result_sink.flush()
+            self.assertEqual(runner.total_count, 500)
+            self.assertEqual(runner.current_count, 500)
+            self.assertIn('random seed: 7', runner.log_stream.getvalue())
+            runs.append(runner)
+        self.assertEqual(runs[1].success_count, runs[0].success_count)
+        self.assertEqual(runs[1].result_sink.records, runs[0].result_sink.records)
+        self.assertEqual(len(set([record['index'] for record in runs[0].result_sink.records])),
+                         len(runs[0].result_sink.records))
+
+    def test_operation_counters(self):
+        runs = []
+        for processes in [1, 3]:
+            runner = self.create_runner(processes)
+            runner.apply_params(['--counters', '--nMin=2', '--nMax=2'])
+            runner.run()
+            self.assertIsNone(AF.counters)
+            self.assertIn('operation counts:', runner.log_stream.getvalue())
+            runs.append(runner)
+        self.assertEqual(runs[0].operation_counters['credulous.GR'], runs[0].current_count)
+        self.assertEqual(runs[1].operation_counters, runs[0].operation_counters)
+
+    def instance(self, n, index):
+        generator = InstanceGenerator(n, False, False, True, True, True)
+        generator.generate_index(index)
+        return generator.af, generator.extension, generator.arg
+
+
+if __name__ == '__main__':
+    unittest.main()